@@ -0,0 +1,57 @@
+"""add hot query indexes
+
+자주 실행되는 조회(대화 이력, 복용 중인 약, 오늘의 스케줄, 약별 스케줄)를 받치는 복합 인덱스.
+운영 중인 테이블을 잠그지 않도록 CREATE INDEX CONCURRENTLY로 만든다 (트랜잭션 밖에서 실행).
+
+- 테이블은 아직 앱 시작 시 Base.metadata.create_all로 생성되며, 모델에도 같은 인덱스가 선언되어 있어
+  새 DB에서는 create_all이 이미 만든 인덱스를 IF NOT EXISTS로 건너뛴다.
+- CONCURRENTLY 생성이 중간에 실패하면 INVALID 인덱스가 남으므로 먼저 삭제 후 다시 만든다.
+
+Revision ID: 3f9c2a7d1b04
+Revises:
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9c2a7d1b04'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+# (인덱스 이름, 테이블, 컬럼)
+INDEXES = [
+    ("ix_chat_histories_user_session_created", "chat_histories", ["user_id", "session_id", "created_at"]),
+    ("ix_medicines_user_active", "medicines", ["user_id", "is_active"]),
+    ("ix_schedules_user_active_dates", "schedules", ["user_id", "is_active", "start_date", "end_date"]),
+    ("ix_schedules_medicine_id", "schedules", ["medicine_id"]),
+]
+
+
+def _drop_if_invalid(name: str) -> None:
+    """이전에 실패한 CONCURRENTLY 생성이 남긴 INVALID 인덱스 삭제"""
+    if context.is_offline_mode():
+        return
+    invalid = op.get_bind().execute(sa.text(
+        "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relname = :name AND NOT i.indisvalid"
+    ), {"name": name}).first()
+    if invalid:
+        op.drop_index(name, postgresql_concurrently=True, if_exists=True)
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            _drop_if_invalid(name)
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
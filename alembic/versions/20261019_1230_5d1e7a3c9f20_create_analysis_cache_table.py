@@ -0,0 +1,55 @@
+"""create analysis cache table
+
+스캔 분석(LLM) 결과 캐시 테이블. 처음에는 앱 시작 시 create_all로만 만들어져서
+Alembic으로 올린 DB에는 테이블이 없고 다음 리비전(8b6e1c4f2a97)의 제약조건 변경이 실패했다.
+
+- 사용자별 유일 키 (user_id, cache_key) 제약조건까지 함께 생성 → 8b6e1c4f2a97은 제약조건이 있으면 건너뜀
+- create_all로 이미 만들어진 DB에서는 건너뛴다 (기존 cache_key 유일 인덱스는 8b6e1c4f2a97이 정리)
+
+Revision ID: 5d1e7a3c9f20
+Revises: 3f9c2a7d1b04
+Create Date: 2026-10-19 12:30:00.000000
+
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d1e7a3c9f20'
+down_revision = '3f9c2a7d1b04'
+branch_labels = None
+depends_on = None
+
+
+TABLE = "analysis_cache"
+
+
+def _table_exists(name: str) -> bool:
+    if context.is_offline_mode():
+        return False
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade() -> None:
+    if _table_exists(TABLE):
+        return
+    op.create_table(
+        TABLE,
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("cache_key", sa.String(length=64), nullable=False),
+        sa.Column("prompt_version", sa.String(length=50), nullable=False),
+        sa.Column("result", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id", "cache_key", name="uq_analysis_cache_user_cache_key"),
+    )
+    op.create_index("ix_analysis_cache_id", TABLE, ["id"])
+    op.create_index("ix_analysis_cache_user_id", TABLE, ["user_id"])
+
+
+def downgrade() -> None:
+    op.drop_table(TABLE, if_exists=True)
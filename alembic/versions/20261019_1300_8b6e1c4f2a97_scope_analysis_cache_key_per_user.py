@@ -0,0 +1,69 @@
+"""scope analysis cache key per user
+
+analysis_cache.cache_key는 LLM 입력 해시라 입력이 같은 다른 사용자와 값이 같을 수 있다.
+테이블 전체에서 cache_key 유일 → (user_id, cache_key) 유일로 바꿔 사용자끼리 캐시 항목을 덮어쓰지 않게 한다.
+
+- 유일 인덱스를 CREATE INDEX CONCURRENTLY로 먼저 만들고 UNIQUE USING INDEX로 제약조건에 연결한 뒤
+  기존 cache_key 유일 인덱스를 삭제한다 (운영 중인 테이블을 오래 잠그지 않음).
+- 새 DB에서는 5d1e7a3c9f20(또는 create_all)이 제약조건까지 이미 만들었으므로 건너뛴다.
+
+Revision ID: 8b6e1c4f2a97
+Revises: 5d1e7a3c9f20
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b6e1c4f2a97'
+down_revision = '5d1e7a3c9f20'
+branch_labels = None
+depends_on = None
+
+
+TABLE = "analysis_cache"
+CONSTRAINT = "uq_analysis_cache_user_cache_key"
+OLD_INDEX = "ix_analysis_cache_cache_key"
+
+
+def _drop_if_invalid(name: str) -> None:
+    """이전에 실패한 CONCURRENTLY 생성이 남긴 INVALID 인덱스 삭제"""
+    if context.is_offline_mode():
+        return
+    invalid = op.get_bind().execute(sa.text(
+        "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relname = :name AND NOT i.indisvalid"
+    ), {"name": name}).first()
+    if invalid:
+        op.drop_index(name, postgresql_concurrently=True, if_exists=True)
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        _drop_if_invalid(CONSTRAINT)
+        op.create_index(
+            CONSTRAINT, TABLE, ["user_id", "cache_key"],
+            unique=True, postgresql_concurrently=True, if_not_exists=True,
+        )
+        # 제약조건이 이미 있으면(5d1e7a3c9f20/create_all) 건너뜀 - 오프라인(--sql) 스크립트에서도 같은 동작
+        op.execute(
+            "DO $$ BEGIN "
+            f"IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = '{CONSTRAINT}') THEN "
+            f"ALTER TABLE {TABLE} ADD CONSTRAINT {CONSTRAINT} UNIQUE USING INDEX {CONSTRAINT}; "
+            "END IF; END $$"
+        )
+        op.drop_index(OLD_INDEX, table_name=TABLE, postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    # 캐시 테이블이므로 사용자 간에 겹치는 키는 하나만 남기고 삭제 (cache_key 단독 유일 인덱스 복구용)
+    op.execute(
+        f"DELETE FROM {TABLE} a USING {TABLE} b "
+        "WHERE a.cache_key = b.cache_key AND a.id > b.id"
+    )
+    with op.get_context().autocommit_block():
+        _drop_if_invalid(OLD_INDEX)
+        op.create_index(OLD_INDEX, TABLE, ["cache_key"], unique=True, postgresql_concurrently=True, if_not_exists=True)
+        op.execute(f"ALTER TABLE {TABLE} DROP CONSTRAINT IF EXISTS {CONSTRAINT}")
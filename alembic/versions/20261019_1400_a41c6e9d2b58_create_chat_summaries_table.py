@@ -0,0 +1,67 @@
+"""create chat summaries table
+
+대화 세션의 누적 요약 테이블. 앱 시작 시 create_all로만 만들어져서 Alembic으로 올린 DB에는 테이블이 없었다.
+
+- chat_sessions.session_id를 참조하는 외래 키(세션 삭제 시 요약도 삭제)와 session_id 유일 인덱스를 함께 생성
+- create_all로 이미 만들어진 DB에서는 세션이 없는 요약 행을 지우고 외래 키만 추가한다
+  (요약은 대화 이력에서 다시 만들 수 있으므로 삭제해도 된다)
+
+Revision ID: a41c6e9d2b58
+Revises: 8b6e1c4f2a97
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a41c6e9d2b58'
+down_revision = '8b6e1c4f2a97'
+branch_labels = None
+depends_on = None
+
+
+TABLE = "chat_summaries"
+FOREIGN_KEY = "fk_chat_summaries_session_id"
+
+
+def _table_exists(name: str) -> bool:
+    if context.is_offline_mode():
+        return False
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def _foreign_key_exists(table: str, name: str) -> bool:
+    return any(fk["name"] == name for fk in sa.inspect(op.get_bind()).get_foreign_keys(table))
+
+
+def upgrade() -> None:
+    if _table_exists(TABLE):
+        if _foreign_key_exists(TABLE, FOREIGN_KEY):
+            return
+        op.execute(
+            f"DELETE FROM {TABLE} s WHERE NOT EXISTS "
+            "(SELECT 1 FROM chat_sessions c WHERE c.session_id = s.session_id)"
+        )
+        op.create_foreign_key(
+            FOREIGN_KEY, TABLE, "chat_sessions", ["session_id"], ["session_id"], ondelete="CASCADE"
+        )
+        return
+
+    op.create_table(
+        TABLE,
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("session_id", sa.String(length=100), nullable=False),
+        sa.Column("summary", sa.Text(), nullable=False),
+        sa.Column("last_message_id", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["session_id"], ["chat_sessions.session_id"], name=FOREIGN_KEY, ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_chat_summaries_id", TABLE, ["id"])
+    op.create_index("ix_chat_summaries_session_id", TABLE, ["session_id"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_table(TABLE, if_exists=True)
@@ -16,13 +16,64 @@ class Settings(BaseSettings):
     db_name: str = "pillmate_db"
     db_user: str = "postgres"
     db_password: str
+    db_pool_size: int = 10  # API용 비동기 엔진 연결 풀 크기 (동기 엔진은 Alembic/스크립트용)
+    db_max_overflow: int = 20  # 풀 크기를 넘어 추가로 여는 연결 수
     
     # OpenAI
     openai_api_key: str = ""
+    openai_base_url: str = ""  # OpenAI 호환 서버 주소 (비우면 공식 API, 부하 테스트: scripts/openai_stub_server.py)
+    openai_timeout_seconds: float = 30.0  # 요청 1건 전체 타임아웃
+    openai_connect_timeout_seconds: float = 5.0  # 연결 타임아웃
+    openai_max_retries: int = 2  # 연결 오류/5xx 재시도 횟수 (LLM 스케줄러가 지수 백오프로 재시도, SDK 재시도 없음)
+    openai_max_connections: int = 100  # httpx 연결 풀 최대 연결 수
+    openai_max_keepalive_connections: int = 20  # 재사용 대기 연결 수
+    openai_keepalive_expiry_seconds: float = 30.0  # 유휴 연결 유지 시간
+    llm_max_concurrency: int = 16  # 동시에 실행하는 LLM 요청 수 (우선순위: 채팅 > 스캔 > 제목/요약)
+    llm_tokens_per_minute: int = 0  # 분당 토큰 예산 (0: 제한 없음)
+    llm_budget_workers: int = 1  # 위 예산을 나눠 쓰는 워커 프로세스 수 (uvicorn --workers)
+    llm_rate_limit_retries: int = 2  # 429 재시도 횟수 (스케줄러가 전체를 멈췄다가 재시도, SDK는 429를 재시도하지 않음)
+    llm_rate_limit_backoff_seconds: float = 1.0  # 429 백오프 기본 대기 (Retry-After 없을 때, 지수 증가)
+    llm_metrics_window_seconds: int = 300  # /metrics LLM 지연 시간 백분위수를 계산할 최근 구간
+    llm_metrics_max_samples: int = 2000  # 엔드포인트별 보관할 최근 지연 시간 표본 수
+    llm_slow_call_seconds: float = 20.0  # 이보다 오래 걸린 LLM 응답은 회로 차단기에서 실패로 집계 (0: 지연 무시)
+    
+    # Circuit breaker (OpenAI, Google Vision)
+    circuit_breaker_enabled: bool = True
+    circuit_breaker_failure_threshold: int = 5  # 연속 실패(오류/느린 응답) 횟수 → 회로 열림
+    circuit_breaker_open_seconds: float = 30.0  # 회로가 열린 뒤 시험 호출까지 대기 (그동안 바로 대체 경로)
+    
+    # Chat
+    chat_title_workers: int = 2  # 대화 제목 생성 동시 실행 수 (백그라운드)
+    chat_title_queue_size: int = 100  # 대기 가능한 제목 생성 작업 수 (초과 시 임시 제목 유지)
+    chat_semantic_cache_enabled: bool = False  # 비슷한 첫 질문(사용자 정보 없음)에 이전 답변 재사용
+    chat_semantic_cache_threshold: float = 0.95  # 캐시 히트 코사인 유사도 하한
+    chat_semantic_cache_max_entries: int = 1000  # 최대 캐시 답변 수 (초과 시 LRU 제거)
+    chat_semantic_cache_ttl_seconds: int = 86400  # 캐시 답변 유효 시간
+    chat_history_token_budget: int = 1500  # 프롬프트에 원문으로 넣는 대화 이력 토큰 상한 (넘는 부분은 요약)
+    chat_summary_model: str = "gpt-4o-mini"  # 대화 요약 모델
+    chat_summary_max_tokens: int = 300  # 누적 요약 길이 상한
+    chat_summary_workers: int = 1  # 대화 요약 동시 실행 수 (백그라운드)
+    chat_summary_queue_size: int = 100  # 대기 가능한 요약 작업 수
+    
+    # Analysis
+    analysis_cache_enabled: bool = True  # 같은 입력의 스캔 분석 결과 재사용 (analysis_cache 테이블)
+    analysis_cache_ttl_seconds: int = 86400  # 분석 캐시 유효 시간
+    analysis_rule_fast_path: bool = True  # 규칙 기반 사전 분석에서 위험 요소가 없으면 LLM 호출 생략
+    analysis_batch_max_images: int = 10  # /analysis/scan/batch 요청당 최대 이미지 수
+    
+    # RAG
+    rag_backend: str = "chroma"  # chroma | numpy
+    rag_search_mode: str = "vector"  # vector | hybrid
+    rag_server_socket: str = ""  # 공유 검색 서버 Unix 소켓 경로 (비우면 in-process)
+    rag_embed_batching: bool = False  # 동시 쿼리 임베딩 마이크로 배치 (in-process)
+    rag_embed_max_batch_size: int = 32  # 임베딩 마이크로 배치 최대 크기
+    rag_embed_max_wait_ms: float = 5.0  # 임베딩 마이크로 배치 최대 대기 시간
     
     # OCR
     tesseract_cmd: str = "/usr/local/bin/tesseract"
     google_application_credentials: str = ""
+    vision_timeout_seconds: float = 10.0  # Google Vision API 요청 타임아웃 (넘으면 Tesseract)
+    vision_slow_call_seconds: float = 5.0  # 이보다 오래 걸린 Vision 응답은 회로 차단기에서 실패로 집계
     
     # CORS
     allowed_origins: str = "http://localhost:3000,http://localhost:5173,http://localhost:8082"
@@ -1,4 +1,12 @@
+"""
+DB 엔진/세션
+
+- 비동기 엔진 (psycopg 3 async): API 라우트용 - DB 왕복 중에도 이벤트 루프가 다른 요청을 처리
+- 동기 엔진: Alembic 마이그레이션, 스크립트(scripts/, tests/), 테이블 생성용
+"""
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import get_settings
@@ -17,6 +25,33 @@ engine = create_engine(
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def async_database_url(database_url: str):
+    """DATABASE_URL → 비동기 드라이버 URL (postgresql은 psycopg 3 async)"""
+    url = make_url(database_url)
+    if url.get_backend_name() == "postgresql":
+        url = url.set(drivername="postgresql+psycopg_async")
+    return url
+
+
+# Create async SQLAlchemy engine (API 라우트용)
+async_engine = create_async_engine(
+    async_database_url(settings.database_url),
+    echo=settings.debug,
+    pool_pre_ping=True,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow
+)
+
+# commit 후에도 응답 직렬화에서 속성을 읽을 수 있도록 expire_on_commit=False
+# (비동기 세션은 만료된 속성을 지연 로딩할 수 없음)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Create Base class for models
 Base = declarative_base()
 
@@ -28,3 +63,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Dependency to get async DB session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
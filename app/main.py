@@ -1,21 +1,42 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import get_settings
-from app.database import engine, Base
+from app.database import engine, async_engine, Base
 from app.routes import medicines, schedules, ocr, analysis, chat, users
+from app.services.rag_service import get_embedding_batch_stats, get_index_version
+from app.services.llm_client import init_llm_client, close_llm_client
+from app.services.analysis_cache import get_analysis_cache_stats
+from app.services.semantic_cache import get_answer_cache_stats
+from app.services.llm_scheduler import get_llm_scheduler
+from app.services.llm_metrics import get_llm_metrics
+from app.services.circuit_breaker import get_circuit_breaker_stats
 
 settings = get_settings()
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 공유 OpenAI 클라이언트 (연결 풀) 생성 / 종료 시 정리
+    await init_llm_client()
+    yield
+    await chat.title_worker.stop()
+    await chat.summary_worker.stop()
+    await close_llm_client()
+    await async_engine.dispose()
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title=settings.app_name,
     version=settings.app_version,
     description="필메이트 API",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -48,6 +69,27 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get(
+    "/metrics",
+    tags=["시스템"],
+    summary="내부 성능 지표",
+)
+async def metrics():
+    # 검색 서버 통계는 Unix 소켓 호출(블로킹)이라 스레드풀에서 조회
+    rag_embedding = await run_in_threadpool(get_embedding_batch_stats)
+    return {
+        "rag_embedding": rag_embedding,
+        "rag_index": get_index_version(),
+        "llm_scheduler": get_llm_scheduler().stats(),
+        "llm_usage": get_llm_metrics().stats(),
+        "circuit_breakers": get_circuit_breaker_stats(),
+        "db_pool": async_engine.pool.status(),
+        "chat_title": chat.title_worker.stats(),
+        "chat_summary": chat.summary_worker.stats(),
+        "analysis_cache": get_analysis_cache_stats(),
+        "chat_semantic_cache": get_answer_cache_stats(),
+    }
+
 # Include routers (No Authentication Required)
 app.include_router(users.router, prefix=f"{settings.api_v1_prefix}/users", tags=["사용자"])
 app.include_router(medicines.router, prefix=f"{settings.api_v1_prefix}/medicines", tags=["약"])
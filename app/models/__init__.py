@@ -4,7 +4,8 @@ from app.models.medicine import Medicine
 from app.models.schedule import Schedule, FrequencyType, TimeOfDay
 from app.models.chat_history import ChatHistory, MessageRole
 from app.models.chat_session import ChatSession
-from app.models.analysis import AnalysisResult, RiskLevel
+from app.models.chat_summary import ChatSummary
+from app.models.analysis import AnalysisResult, AnalysisCache, RiskLevel
 
 __all__ = [
     "User",
@@ -15,6 +16,8 @@ __all__ = [
     "ChatHistory",
     "MessageRole",
     "ChatSession",
+    "ChatSummary",
     "AnalysisResult",
+    "AnalysisCache",
     "RiskLevel",
 ]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Float, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Float, UniqueConstraint, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from enum import Enum
@@ -36,3 +36,29 @@ class AnalysisResult(Base):
 
     # Relationships
     user = relationship("User")
+
+
+class AnalysisCache(Base):
+    """
+    스캔 분석(LLM) 결과 캐시
+
+    cache_key: 스캔한 약 + 복용 약/스케줄 + 지병 + 프롬프트 버전 + DUR 인덱스 버전의 정규화 해시
+    (입력이 같은 다른 사용자와 키가 같을 수 있으므로 user_id + cache_key로 유일)
+    약/스케줄/지병이 바뀌면 해당 사용자의 캐시를 삭제한다.
+    """
+    __tablename__ = "analysis_cache"
+    __table_args__ = (
+        # 사용자별 캐시 조회/저장 (user_id + cache_key)
+        UniqueConstraint("user_id", "cache_key", name="uq_analysis_cache_user_cache_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    
+    cache_key = Column(String(64), nullable=False)  # sha256 hex
+    prompt_version = Column(String(50), nullable=False)
+    result = Column(Text, nullable=False)  # analyze_with_ai 결과 JSON
+    
+    # 메타 정보
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from enum import Enum
@@ -13,6 +13,10 @@ class MessageRole(str, Enum):
 
 class ChatHistory(Base):
     __tablename__ = "chat_histories"
+    __table_args__ = (
+        # 세션 대화 이력 조회 (user_id + session_id, created_at 순)
+        Index("ix_chat_histories_user_session_created", "user_id", "session_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey
+from datetime import datetime
+from app.database import Base
+
+
+class ChatSummary(Base):
+    """
+    대화 세션의 누적 요약 (토큰 예산을 넘는 오래된 대화를 접어 둔 것)
+
+    last_message_id 이하의 ChatHistory는 summary에 반영되어 있으므로 프롬프트에 원문을 넣지 않는다.
+    """
+    __tablename__ = "chat_summaries"
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(
+        String(100),
+        ForeignKey("chat_sessions.session_id", ondelete="CASCADE", name="fk_chat_summaries_session_id"),
+        unique=True, index=True, nullable=False
+    )
+    
+    summary = Column(Text, nullable=False)
+    last_message_id = Column(Integer, nullable=False)  # 요약에 반영된 마지막 ChatHistory.id
+    
+    # 메타 정보
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Time, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Time, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from enum import Enum
@@ -23,10 +23,14 @@ class TimeOfDay(str, Enum):
 
 class Schedule(Base):
     __tablename__ = "schedules"
+    __table_args__ = (
+        # 오늘의 스케줄 (user_id + is_active, 복용 기간)
+        Index("ix_schedules_user_active_dates", "user_id", "is_active", "start_date", "end_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    medicine_id = Column(Integer, ForeignKey("medicines.id"), nullable=False)
+    medicine_id = Column(Integer, ForeignKey("medicines.id"), nullable=False, index=True)  # 약별 스케줄 (selectinload)
     
     # 약 이름 (중복 저장 - 빠른 조회용)
     medicine_name = Column(String(255), nullable=False)
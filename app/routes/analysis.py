@@ -1,10 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import Dict, List, Optional, Tuple
+import asyncio
 import json
 import base64
 from datetime import datetime
-from app.database import get_db
+from app.database import get_async_db
 from app.models.medicine import Medicine
 from app.models.analysis import AnalysisResult, RiskLevel
 from app.models.schedule import Schedule
@@ -12,6 +16,9 @@ from app.schemas.analysis import (
     AnalysisRequest, 
     AnalysisResponse, 
     ScanAnalysisRequest, 
+    BatchScanAnalysisRequest,
+    BatchScanAnalysisResponse,
+    BatchScanItem,
     MedicationAnalysisResponse,
     ScannedMedication,
     RiskItem,
@@ -19,6 +26,13 @@ from app.schemas.analysis import (
 )
 from app.config import get_settings
 from app.services.rag_service import search_all_safety_info
+from app.services.rule_analysis import (
+    RuleFindings, build_rule_based_result, can_skip_llm, findings_context, pre_analyze
+)
+from app.services.llm_client import get_scheduled_llm_client
+from app.services.llm_scheduler import Priority, estimate_request_tokens, get_llm_scheduler
+from app.services.llm_metrics import record_cache_hit, track_llm_call
+from app.services.analysis_cache import analysis_cache_key, get_cached_analysis, save_analysis
 
 router = APIRouter()
 settings = get_settings()
@@ -27,103 +41,128 @@ settings = get_settings()
 MVP_USER_ID = 1
 
 
-# 기존 엔드포인트들은 /api/v1/analysis/scan으로 통합됨
+# 분석 프롬프트/모델/파라미터를 바꾸면 올릴 것 (분석 캐시 키에 포함)
+ANALYSIS_PROMPT_VERSION = "2"
 
+# 분석 실패 시 기본 안전 응답 (캐시하지 않음)
+ANALYSIS_ERROR_RESULT = {
+    "overallRiskScore": 0,
+    "riskLevel": "low",
+    "riskItems": [],
+    "warnings": ["AI 분석 중 오류가 발생했습니다. 약사와 상담을 권장합니다."],
+    "summary": "분석을 완료할 수 없습니다. 약사와 상담하시기 바랍니다.",
+    "sections": [
+        {
+            "icon": "alert-circle",
+            "title": "안내",
+            "content": "일시적인 오류로 정확한 분석이 어렵습니다.\n약사 또는 의사와 상담하시기 바랍니다."
+        }
+    ]
+}
 
-async def analyze_with_ai(scanned_med: dict, user_medicines: List[dict], medical_conditions: List[str] = None) -> dict:
-    """
-    OpenAI를 사용한 약물 상호작용 분석 (RAG 통합)
-    
-    Args:
-        scanned_med: 촬영한 약물 정보 (name, ingredient, amount)
-        user_medicines: 사용자의 현재 복용 중인 약물 목록
-        medical_conditions: 사용자의 지병 목록
-    
-    Returns:
-        dict: 분석 결과 (overallRiskScore, riskLevel, riskItems, warnings)
-    """
-    try:
-        from openai import OpenAI
-        
-        client = OpenAI(api_key=settings.openai_api_key)
-        
-        # RAG: 스캔한 약과 복용 중인 약들의 DUR 안전 정보 검색
-        all_drug_names = [scanned_med['ingredient']]
-        for med in user_medicines:
-            if 'ingredient' in med:
-                all_drug_names.append(med['ingredient'])
-        
-        try:
-            rag_safety_info = search_all_safety_info(all_drug_names)
-            
-            # RAG 컨텍스트 생성
-            rag_context = "\n\n**참고할 의약품 안전 정보 (DUR 데이터):**\n"
-            
-            # 병용금기
-            if rag_safety_info['contraindications']:
-                rag_context += "\n[병용금기 정보]\n"
-                for i, item in enumerate(rag_safety_info['contraindications'][:3], 1):
-                    rag_context += f"{i}. {item['drug_a']} + {item['drug_b']}: {item['detail']}\n"
-            
-            # 연령금기
-            if rag_safety_info['age_restrictions']:
-                rag_context += "\n[연령금기 정보]\n"
-                for i, item in enumerate(rag_safety_info['age_restrictions'][:2], 1):
-                    rag_context += f"{i}. {item['drug']}: {item['detail']}\n"
-            
-            # 임부금기
-            if rag_safety_info['pregnancy_restrictions']:
-                rag_context += "\n[임부금기 정보]\n"
-                for i, item in enumerate(rag_safety_info['pregnancy_restrictions'][:2], 1):
-                    rag_context += f"{i}. {item['drug']}: {item['detail']}\n"
-            
-            # 노인주의
-            if rag_safety_info['elderly_cautions']:
-                rag_context += "\n[노인주의 정보]\n"
-                for i, item in enumerate(rag_safety_info['elderly_cautions'][:2], 1):
-                    rag_context += f"{i}. {item['drug']}: {item['detail']}\n"
-        
-        except Exception as e:
-            print(f"RAG 검색 오류 (무시하고 계속): {e}")
-            rag_context = ""
-        
-        # 지병 정보 추가
-        medical_conditions_text = ""
-        if medical_conditions:
-            medical_conditions_text = f"\n\n**중요: 사용자의 지병**\n사용자는 다음 질환을 앓고 있습니다: {', '.join(medical_conditions)}\n이 지병들을 고려하여 약물의 적합성과 위험성을 평가하세요."
-        
-        # AI 분석을 위한 프롬프트
-        system_prompt = f"""당신은 약물 상호작용 분석 전문가입니다.
-촬영한 약물과 사용자가 현재 복용 중인 약물들을 비교하여 위험성을 분석하세요.{medical_conditions_text}
 
-**중요**: 위에 제공된 "참고할 의약품 안전 정보 (DUR 데이터)"를 우선적으로 참고하여 정확한 분석을 수행하세요.
+# 기존 엔드포인트들은 /api/v1/analysis/scan으로 통합됨
 
-다음 3가지 위험 유형을 확인하세요:
-1. duplicate: 성분 중복 (같은 성분이 여러 약에 포함)
-2. interaction: 약물 상호작용 (특정 약 조합 시 부작용 발생 가능)
-3. timing: 복용 시간 충돌 (같은 시간에 복용하면 안 되는 약)
 
-분석 결과는 다음 JSON 형식으로 반환하세요:
-{{"overallRiskScore": 0-10 사이 정수 (0=안전, 10=매우 위험),
+# 분석 결과 JSON 형식 (단건: 이 객체 1개, 일괄: items 배열의 각 항목)
+ANALYSIS_RESULT_FORMAT = """{"overallRiskScore": 0-10 사이 정수 (0=안전, 10=매우 위험),
   "riskLevel": "low" | "medium" | "high",
   "riskItems": [
-    {{"id": "고유ID (예: duplicate-1, interaction-1)",
+    {"id": "고유ID (예: duplicate-1, interaction-1)",
       "type": "duplicate | interaction | timing",
       "severity": "low | medium | high",
       "title": "위험 항목 제목",
       "description": "상세 설명 (DUR 데이터 기반)",
       "percentage": 0-100 사이 정수
-    }}
+    }
   ],
   "warnings": ["경고 메시지 배열"],
   "summary": "분석 결과 요약 (강조할 부분은 **텍스트** 형식으로)",
   "sections": [
-    {{"icon": "Ionicons 아이콘 이름 (time, alert-circle, swap-horizontal, flask, fitness, restaurant, water, moon 등)",
+    {"icon": "Ionicons 아이콘 이름 (time, alert-circle, swap-horizontal, flask, fitness, restaurant, water, moon 등)",
       "title": "섹션 제목",
       "content": "섹션 본문 (강조: **텍스트**, 줄바꿈: \\n으로 구분, 목록 형식 권장)"
-    }}
+    }
   ]
-}}
+}"""
+
+# 분석 LLM 응답 최대 토큰 (단건 / 일괄 분석은 약 1개당, 전체 상한)
+ANALYSIS_MAX_TOKENS = 1500  # summary와 sections 추가로 토큰 증가
+BATCH_ITEM_MAX_TOKENS = 1000
+BATCH_MAX_TOKENS = 6000
+
+RISK_LEVEL_ORDER = {"low": 0, "medium": 1, "high": 2}
+
+
+async def build_rag_context(drug_names: List[str]) -> str:
+    """성분 목록의 DUR 안전 정보 검색 → 프롬프트 컨텍스트 (검색 오류 시 빈 문자열)"""
+    try:
+        # 스레드풀에서 실행: 이벤트 루프를 막지 않고, 동시 요청의 임베딩이 한 배치로 묶이도록
+        rag_safety_info = await run_in_threadpool(search_all_safety_info, drug_names)
+        
+        # RAG 컨텍스트 생성
+        rag_context = "\n\n**참고할 의약품 안전 정보 (DUR 데이터):**\n"
+        
+        # 병용금기
+        if rag_safety_info['contraindications']:
+            rag_context += "\n[병용금기 정보]\n"
+            for i, item in enumerate(rag_safety_info['contraindications'][:3], 1):
+                rag_context += f"{i}. {item['drug_a']} + {item['drug_b']}: {item['detail']}\n"
+        
+        # 연령금기
+        if rag_safety_info['age_restrictions']:
+            rag_context += "\n[연령금기 정보]\n"
+            for i, item in enumerate(rag_safety_info['age_restrictions'][:2], 1):
+                rag_context += f"{i}. {item['drug']}: {item['detail']}\n"
+        
+        # 임부금기
+        if rag_safety_info['pregnancy_restrictions']:
+            rag_context += "\n[임부금기 정보]\n"
+            for i, item in enumerate(rag_safety_info['pregnancy_restrictions'][:2], 1):
+                rag_context += f"{i}. {item['drug']}: {item['detail']}\n"
+        
+        # 노인주의
+        if rag_safety_info['elderly_cautions']:
+            rag_context += "\n[노인주의 정보]\n"
+            for i, item in enumerate(rag_safety_info['elderly_cautions'][:2], 1):
+                rag_context += f"{i}. {item['drug']}: {item['detail']}\n"
+        
+        return rag_context
+    
+    except Exception as e:
+        print(f"RAG 검색 오류 (무시하고 계속): {e}")
+        return ""
+
+
+def analysis_system_prompt(medical_conditions: List[str] = None, batch: bool = False) -> str:
+    """분석 시스템 프롬프트 (batch: 촬영한 약 여러 개를 items 배열로 한 번에 분석)"""
+    # 지병 정보 추가
+    medical_conditions_text = ""
+    if medical_conditions:
+        medical_conditions_text = f"\n\n**중요: 사용자의 지병**\n사용자는 다음 질환을 앓고 있습니다: {', '.join(medical_conditions)}\n이 지병들을 고려하여 약물의 적합성과 위험성을 평가하세요."
+    
+    if batch:
+        task = "촬영한 여러 약물 각각을 사용자가 현재 복용 중인 약물, 함께 촬영한 다른 약물들과 비교하여 위험성을 분석하세요."
+        output_format = (
+            '분석 결과는 {"items": [...]} 형식으로 반환하세요. '
+            'items에는 분석을 요청한 촬영 번호마다 항목 1개를 넣고, 각 항목은 "index"(촬영 번호 정수)와 다음 JSON 형식의 필드를 가집니다:\n'
+            f"{ANALYSIS_RESULT_FORMAT}"
+        )
+    else:
+        task = "촬영한 약물과 사용자가 현재 복용 중인 약물들을 비교하여 위험성을 분석하세요."
+        output_format = f"분석 결과는 다음 JSON 형식으로 반환하세요:\n{ANALYSIS_RESULT_FORMAT}"
+    
+    return f"""당신은 약물 상호작용 분석 전문가입니다.
+{task}{medical_conditions_text}
+
+**중요**: 위에 제공된 "참고할 의약품 안전 정보 (DUR 데이터)"를 우선적으로 참고하여 정확한 분석을 수행하세요.
+
+다음 3가지 위험 유형을 확인하세요:
+1. duplicate: 성분 중복 (같은 성분이 여러 약에 포함)
+2. interaction: 약물 상호작용 (특정 약 조합 시 부작용 발생 가능)
+3. timing: 복용 시간 충돌 (같은 시간에 복용하면 안 되는 약)
+
+{output_format}
 
 **중요 규칙:**
 - sections 배열은 최소 1개 이상 (권장: 복용 방법, 주의사항, 대체 방안 등)
@@ -135,6 +174,54 @@ async def analyze_with_ai(scanned_med: dict, user_medicines: List[dict], medical
 
 반드시 위 JSON 형식만 출력하고, 다른 텍스트는 포함하지 마세요."""
 
+
+async def request_analysis_json(endpoint: str, messages: List[dict], max_tokens: int, cache: Optional[str] = None) -> dict:
+    """분석 LLM 호출 (JSON 모드, LLM 스케줄러 - 채팅보다 낮은 우선순위) → 파싱된 결과"""
+    client = get_scheduled_llm_client()
+    with track_llm_call(endpoint, ANALYSIS_PROMPT_VERSION, cache=cache) as call:
+        response = await get_llm_scheduler().run(
+            Priority.SCAN,
+            lambda: client.chat.completions.create(
+                model="gpt-4o",
+                messages=messages,
+                temperature=0.3,  # 낮은 온도로 일관된 분석
+                max_tokens=max_tokens,
+                response_format={"type": "json_object"}  # JSON 모드
+            ),
+            estimate_request_tokens(messages, max_tokens),
+        )
+        call.set_usage(response.model, response.usage)
+        
+        # JSON 파싱 (파싱 실패도 이 호출의 오류로 집계)
+        return json.loads(response.choices[0].message.content)
+
+
+async def analyze_with_ai(scanned_med: dict, user_medicines: List[dict], medical_conditions: List[str] = None, findings: Optional[RuleFindings] = None) -> dict:
+    """
+    OpenAI를 사용한 약물 상호작용 분석 (RAG 통합)
+
+    Args:
+        scanned_med: 촬영한 약물 정보 (name, ingredient, amount)
+        user_medicines: 사용자의 현재 복용 중인 약물 목록
+        medical_conditions: 사용자의 지병 목록
+        findings: 규칙 기반 사전 분석 결과 (없으면 여기서 계산)
+
+    Returns:
+        dict: 분석 결과 (overallRiskScore, riskLevel, riskItems, warnings)
+    """
+    try:
+        # RAG: 스캔한 약과 복용 중인 약들의 DUR 안전 정보 검색
+        all_drug_names = [scanned_med['ingredient']]
+        for med in user_medicines:
+            if 'ingredient' in med:
+                all_drug_names.append(med['ingredient'])
+        rag_context = await build_rag_context(all_drug_names)
+        
+        # 규칙 기반 확정 사항: 성분 중복(표기가 달라도 같은 성분), DUR 병용금기 쌍, 복용 시간 충돌
+        if findings is None:
+            findings = pre_analyze(scanned_med, user_medicines)
+        rule_context = findings_context(findings)
+        
         user_message = f"""촬영한 약물:
 - 이름: {scanned_med['name']}
 - 성분: {scanned_med['ingredient']}
@@ -142,45 +229,223 @@ async def analyze_with_ai(scanned_med: dict, user_medicines: List[dict], medical
 
 현재 복용 중인 약물:
 {json.dumps(user_medicines, ensure_ascii=False, indent=2)}
-{rag_context if rag_context else ""}
+{rag_context if rag_context else ""}{rule_context}
 
 위험성을 분석해주세요."""
 
         messages = [
-            {"role": "system", "content": system_prompt},
+            {"role": "system", "content": analysis_system_prompt(medical_conditions)},
             {"role": "user", "content": user_message}
         ]
         
-        # OpenAI API 호출
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=messages,
-            temperature=0.3,  # 낮은 온도로 일관된 분석
-            max_tokens=1500,  # summary와 sections 추가로 토큰 증가
-            response_format={"type": "json_object"}  # JSON 모드
+        cache_state = "miss" if settings.analysis_cache_enabled else None
+        return await request_analysis_json("analysis_scan", messages, ANALYSIS_MAX_TOKENS, cache=cache_state)
+    
+    except Exception as e:
+        print(f"AI Analysis Error: {e}")
+        # 오류 시 기본 안전 응답
+        return ANALYSIS_ERROR_RESULT
+
+
+async def analyze_batch_with_ai(
+    scanned_meds: Dict[int, dict],
+    targets: List[int],
+    user_medicines: List[dict],
+    medical_conditions: List[str] = None,
+    findings: Dict[int, RuleFindings] = None,
+) -> Dict[int, dict]:
+    """
+    촬영한 약 여러 개를 LLM 1회로 분석 (RAG 검색도 전체 성분으로 1회)
+
+    Args:
+        scanned_meds: 인식된 촬영 약물 전체 (촬영 번호 → 약물 정보) - 서로 비교 대상
+        targets: 분석 결과가 필요한 촬영 번호 (규칙 기반 결과로 끝난 약은 제외)
+        user_medicines: 사용자의 현재 복용 중인 약물 목록
+        medical_conditions: 사용자의 지병 목록
+        findings: 촬영 번호 → 규칙 기반 사전 분석 결과
+
+    Returns:
+        dict: 촬영 번호 → 분석 결과 (응답에 빠졌거나 오류면 ANALYSIS_ERROR_RESULT)
+    """
+    results = {index: ANALYSIS_ERROR_RESULT for index in targets}
+    findings = findings or {}
+    try:
+        all_drug_names = [med['ingredient'] for med in scanned_meds.values()]
+        all_drug_names += [med['ingredient'] for med in user_medicines if 'ingredient' in med]
+        rag_context = await build_rag_context(list(dict.fromkeys(all_drug_names)))
+        
+        scanned_text = "\n".join(
+            f"[{index}] 이름: {med['name']} / 성분: {med['ingredient']} / 함량: {med['amount']}"
+            for index, med in sorted(scanned_meds.items())
+        )
+        rule_context = "".join(
+            f"\n\n[{index}] {scanned_meds[index]['name']}{findings_context(findings[index])}"
+            for index in targets
+            if index in findings and findings_context(findings[index])
         )
         
-        # JSON 파싱
-        result = json.loads(response.choices[0].message.content)
-        return result
+        user_message = f"""촬영한 약물 (촬영 번호):
+{scanned_text}
+
+현재 복용 중인 약물:
+{json.dumps(user_medicines, ensure_ascii=False, indent=2)}
+{rag_context}{rule_context}
+
+다음 촬영 번호의 위험성을 각각 분석해주세요: {', '.join(str(index) for index in targets)}"""
+
+        messages = [
+            {"role": "system", "content": analysis_system_prompt(medical_conditions, batch=True)},
+            {"role": "user", "content": user_message}
+        ]
+        
+        max_tokens = min(BATCH_ITEM_MAX_TOKENS * len(targets), BATCH_MAX_TOKENS)
+        data = await request_analysis_json("analysis_scan_batch", messages, max_tokens)
         
+        for item in data.get("items", []):
+            index = item.get("index") if isinstance(item, dict) else None
+            if index in results:
+                results[index] = {key: value for key, value in item.items() if key != "index"}
+    
     except Exception as e:
-        print(f"AI Analysis Error: {e}")
-        # 오류 시 기본 안전 응답
-        return {
-            "overallRiskScore": 0,
-            "riskLevel": "low",
-            "riskItems": [],
-            "warnings": ["AI 분석 중 오류가 발생했습니다. 약사와 상담을 권장합니다."],
-            "summary": "분석을 완료할 수 없습니다. 약사와 상담하시기 바랍니다.",
-            "sections": [
+        print(f"AI Batch Analysis Error: {e}")
+    
+    return results
+
+
+def recognize_scanned_medicine(image_base64: str) -> dict:
+    """
+    약 사진 → 촬영한 약물 정보 (OCR + AI Hub 데이터셋 매칭)
+
+    OCR(Vision API)은 동기 호출이므로 스레드풀에서 실행할 것
+
+    Raises:
+        HTTPException: 텍스트 인식 실패(400), 매칭 약물 없음(404)
+    """
+    from app.routes.ocr import extract_text_from_image, search_medicine_in_aihub_data
+    from app.utils.aihub_loader import get_aihub_loader
+    
+    # OCR로 텍스트 추출
+    extracted_text = extract_text_from_image(image_base64)
+    print(f"[SCAN DEBUG] OCR 추출 텍스트: {extracted_text}")
+    
+    if not extracted_text or len(extracted_text.strip()) < 2:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="약물 텍스트를 인식할 수 없습니다. 더 선명한 사진으로 다시 시도해주세요."
+        )
+    
+    # AI Hub 데이터셋에서 약 검색
+    matched_medicines = search_medicine_in_aihub_data(extracted_text)
+    print(f"[SCAN DEBUG] 매칭된 약물 개수: {len(matched_medicines) if matched_medicines else 0}")
+    if matched_medicines:
+        print(f"[SCAN DEBUG] 최고 매칭: {matched_medicines[0].drug_name} (신뢰도: {matched_medicines[0].confidence})")
+    
+    if not matched_medicines:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"매칭되는 약물을 찾을 수 없습니다. OCR 텍스트: '{extracted_text}'"
+        )
+    
+    # 가장 높은 매칭 점수의 약물 선택 (MedicineMatch 객체)
+    best_match = matched_medicines[0]
+    med_name = best_match.drug_name  # 객체 속성으로 접근
+    
+    # AI Hub 데이터셋에서 약물 상세 정보 조회
+    loader = get_aihub_loader()
+    
+    scanned_medicine_data = next(
+        (m for m in loader.medicine_data if m.get("dl_name") == med_name),
+        None
+    )
+    
+    if not scanned_medicine_data:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="약물 상세 정보를 찾을 수 없습니다."
+        )
+    
+    # 촬영한 약물 정보 구성
+    return {
+        "name": scanned_medicine_data.get("dl_name", ""),
+        "ingredient": scanned_medicine_data.get("dl_material", "정보 없음"),
+        "amount": scanned_medicine_data.get("dl_name", "").split()[-1] if scanned_medicine_data.get("dl_name") else "정보 없음"
+    }
+
+
+async def load_user_context(db: AsyncSession, user_id: int) -> Tuple[List[str], List[dict]]:
+    """
+    사용자의 지병 + 현재 복용 약물 (복용 시간 정보 포함)
+    
+    삭제(is_active=False)된 약/스케줄은 제외, 스케줄은 selectinload로 함께 조회
+    → 약 개수와 관계없이 쿼리 3회 (사용자, 약, 스케줄)
+    """
+    from app.models.user import User
+    user = await db.get(User, user_id)
+    user_medical_conditions = user.medical_conditions if user and user.medical_conditions else []
+    
+    user_medicines = (await db.scalars(
+        select(Medicine)
+        .where(
+            Medicine.user_id == user_id,
+            Medicine.is_active == True
+        )
+        .options(selectinload(Medicine.schedules.and_(Schedule.is_active == True)))
+        .order_by(Medicine.id)
+    )).all()
+    
+    user_med_with_schedule = []
+    for med in user_medicines:
+        schedules = sorted(med.schedules, key=lambda s: s.id)
+        
+        user_med_with_schedule.append({
+            "id": med.id,
+            "name": med.name,
+            "ingredient": med.ingredient or "정보 없음",
+            "amount": med.amount or "정보 없음",
+            "schedules": [
                 {
-                    "icon": "alert-circle",
-                    "title": "안내",
-                    "content": "일시적인 오류로 정확한 분석이 어렵습니다.\n약사 또는 의사와 상담하시기 바랍니다."
+                    "time": s.dose_time.strftime("%H:%M") if s.dose_time else None,
+                    "dose_count": s.dose_count
                 }
+                for s in schedules
             ]
-        }
+        })
+    
+    return user_medical_conditions, user_med_with_schedule
+
+
+def build_analysis_response(scanned_med: dict, ai_result: dict) -> MedicationAnalysisResponse:
+    """촬영한 약물 정보 + 분석 결과 → 응답 스키마"""
+    return MedicationAnalysisResponse(
+        scannedMedication=ScannedMedication(
+            name=scanned_med["name"],
+            ingredient=scanned_med["ingredient"],
+            amount=scanned_med["amount"]
+        ),
+        overallRiskScore=ai_result.get("overallRiskScore", 0),
+        riskLevel=ai_result.get("riskLevel", "low"),
+        riskItems=[
+            RiskItem(
+                id=item["id"],
+                type=item["type"],
+                severity=item["severity"],
+                title=item["title"],
+                description=item["description"],
+                percentage=item["percentage"]
+            )
+            for item in ai_result.get("riskItems", [])
+        ],
+        warnings=ai_result.get("warnings", []),
+        summary=ai_result.get("summary", "분석이 완료되었습니다."),
+        sections=[
+            CommentSection(
+                icon=section["icon"],
+                title=section["title"],
+                content=section["content"]
+            )
+            for section in ai_result.get("sections", [])
+        ]
+    )
 
 
 @router.post(
@@ -190,143 +455,163 @@ async def analyze_with_ai(scanned_med: dict, user_medicines: List[dict], medical
 )
 async def analyze_scanned_medication(
     request: ScanAnalysisRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     약 사진을 OCR로 인식하고 사용자의 현재 복용 약과 비교 분석
-    
+
     1. 이미지에서 OCR로 약물명 추출
     2. 데이터베이스에서 약물 정보 매칭
     3. 사용자의 현재 복용 중인 약물 조회
     4. AI로 성분 중복, 약물 상호작용, 복용 시간 충돌 분석
     5. 위험도 점수 및 경고 메시지 반환
     """
-    
-    # 1. OCR 처리 - OCR 라우터의 함수 재사용
-    from app.routes.ocr import extract_text_from_image, search_medicine_in_aihub_data
-    from app.utils.aihub_loader import get_aihub_loader
-    
     try:
-        # OCR로 텍스트 추출
-        extracted_text = extract_text_from_image(request.image_base64)
-        print(f"[SCAN DEBUG] OCR 추출 텍스트: {extracted_text}")
+        # 1~2. OCR + AI Hub 데이터셋 매칭 (스레드풀 - OCR 동안 이벤트 루프를 막지 않음)
+        scanned_med = await run_in_threadpool(recognize_scanned_medicine, request.image_base64)
         
-        if not extracted_text or len(extracted_text.strip()) < 2:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="약물 텍스트를 인식할 수 없습니다. 더 선명한 사진으로 다시 시도해주세요."
-            )
+        # 3~4. 사용자 지병 + 현재 복용 약물(스케줄 포함) 조회
+        user_medical_conditions, user_med_with_schedule = await load_user_context(db, request.user_id)
         
-        # AI Hub 데이터셋에서 약 검색
-        matched_medicines = search_medicine_in_aihub_data(extracted_text)
-        print(f"[SCAN DEBUG] 매칭된 약물 개수: {len(matched_medicines) if matched_medicines else 0}")
-        if matched_medicines:
-            print(f"[SCAN DEBUG] 최고 매칭: {matched_medicines[0].drug_name} (신뢰도: {matched_medicines[0].confidence})")
-        
-        if not matched_medicines:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"매칭되는 약물을 찾을 수 없습니다. OCR 텍스트: '{extracted_text}'"
+        # 5. 규칙 기반 사전 분석 - 위험 요소가 없고 판정 불가 요소도 없으면 LLM 없이 결과 생성
+        findings = pre_analyze(scanned_med, user_med_with_schedule)
+        cache_key = None
+        ai_result = None
+        if settings.analysis_rule_fast_path and can_skip_llm(findings, user_medical_conditions):
+            ai_result = build_rule_based_result(scanned_med, user_med_with_schedule, findings)
+        elif settings.analysis_cache_enabled:
+            # 입력이 같으면 캐시된 AI 분석 결과 재사용
+            cache_key = analysis_cache_key(
+                scanned_med, user_med_with_schedule, user_medical_conditions, ANALYSIS_PROMPT_VERSION
             )
+            ai_result = await get_cached_analysis(db, request.user_id, cache_key)
+            if ai_result is not None:
+                record_cache_hit("analysis_scan", ANALYSIS_PROMPT_VERSION)
         
-        # 가장 높은 매칭 점수의 약물 선택 (MedicineMatch 객체)
-        best_match = matched_medicines[0]
-        med_name = best_match.drug_name  # 객체 속성으로 접근
-        
-        # 2. AI Hub 데이터셋에서 약물 상세 정보 조회
-        loader = get_aihub_loader()
+        # 6. AI 분석 수행 (지병 정보 + 규칙 기반 확정 사항 포함)
+        if ai_result is None:
+            ai_result = await analyze_with_ai(scanned_med, user_med_with_schedule, user_medical_conditions, findings)
+            if cache_key and ai_result is not ANALYSIS_ERROR_RESULT:
+                try:
+                    await save_analysis(db, request.user_id, cache_key, ANALYSIS_PROMPT_VERSION, ai_result)
+                except Exception as e:
+                    await db.rollback()
+                    print(f"분석 캐시 저장 오류 (무시하고 계속): {e}")
         
-        scanned_medicine_data = next(
-            (m for m in loader.medicine_data if m.get("dl_name") == med_name),
-            None
+        # 7. 응답 구성
+        return build_analysis_response(scanned_med, ai_result)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Scan Analysis Error: {e}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"약물 분석 중 오류가 발생했습니다: {str(e)}"
+        )
+
+
+@router.post(
+    "/scan/batch",
+    response_model=BatchScanAnalysisResponse,
+    summary="약 사진 여러 장 일괄 스캔 및 통합 위험성 분석"
+)
+async def analyze_scanned_medications_batch(
+    request: BatchScanAnalysisRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    약 사진 여러 장(처방약 봉투 등)을 한 번에 인식하고 통합 분석
+
+    1. 모든 이미지 OCR + 약물 매칭을 동시에 수행 (실패한 이미지는 해당 항목에 오류로 표시)
+    2. 사용자 지병/복용 약물은 1회만 조회
+    3. 촬영한 약마다 규칙 기반 사전 분석 (복용 중인 약 + 함께 촬영한 다른 약과 비교)
+    4. 위험 요소가 없는 약은 규칙 기반 결과, 나머지는 LLM 1회 호출로 함께 분석
+    5. 촬영 순서대로 약별 분석 결과 + 전체 위험도 반환
+    """
+    if len(request.images_base64) > settings.analysis_batch_max_images:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"한 번에 최대 {settings.analysis_batch_max_images}장까지 분석할 수 있습니다."
+        )
+    
+    try:
+        # 1. OCR + 약물 매칭 동시 수행
+        outcomes = await asyncio.gather(
+            *(run_in_threadpool(recognize_scanned_medicine, image) for image in request.images_base64),
+            return_exceptions=True,
         )
         
-        if not scanned_medicine_data:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="약물 상세 정보를 찾을 수 없습니다."
-            )
-        
-        # 3. 사용자 정보 및 지병 조회
-        from app.models.user import User
-        user = db.query(User).filter(User.id == request.user_id).first()
-        user_medical_conditions = user.medical_conditions if user and user.medical_conditions else []
-        
-        # 4. 사용자의 현재 복용 약물 조회
-        user_medicines = db.query(Medicine).filter(
-            Medicine.user_id == request.user_id
-        ).all()
+        scanned_meds: Dict[int, dict] = {}
+        errors: Dict[int, str] = {}
+        for index, outcome in enumerate(outcomes):
+            if isinstance(outcome, HTTPException):
+                errors[index] = outcome.detail
+            elif isinstance(outcome, Exception):
+                print(f"Batch Scan OCR Error [{index}]: {outcome}")
+                errors[index] = "이미지를 처리하는 중 오류가 발생했습니다."
+            else:
+                scanned_meds[index] = outcome
         
-        # 약물 스케줄도 조회하여 복용 시간 정보 포함
-        user_med_with_schedule = []
-        for med in user_medicines:
-            schedules = db.query(Schedule).filter(
-                Schedule.medicine_id == med.id
-            ).all()
+        results: Dict[int, dict] = {}
+        if scanned_meds:
+            # 2. 사용자 지병 + 현재 복용 약물(스케줄 포함) 1회 조회
+            user_medical_conditions, user_med_with_schedule = await load_user_context(db, request.user_id)
             
-            user_med_with_schedule.append({
-                "id": med.id,
-                "name": med.name,
-                "ingredient": med.ingredient or "정보 없음",
-                "amount": med.amount or "정보 없음",
-                "schedules": [
-                    {
-                        "time": s.dose_time.strftime("%H:%M") if s.dose_time else None,
-                        "dose_count": s.dose_count
-                    }
-                    for s in schedules
+            # 3. 규칙 기반 사전 분석 - 함께 촬영한 다른 약도 비교 대상 (복용 시간 정보 없음)
+            findings: Dict[int, RuleFindings] = {}
+            targets: List[int] = []
+            for index, scanned_med in scanned_meds.items():
+                others = [
+                    {"name": med["name"], "ingredient": med["ingredient"], "amount": med["amount"], "schedules": []}
+                    for other, med in scanned_meds.items()
+                    if other != index
                 ]
-            })
-        
-        # 4. 촬영한 약물 정보 구성
-        scanned_med = {
-            "name": scanned_medicine_data.get("dl_name", ""),
-            "ingredient": scanned_medicine_data.get("dl_material", "정보 없음"),
-            "amount": scanned_medicine_data.get("dl_name", "").split()[-1] if scanned_medicine_data.get("dl_name") else "정보 없음"
-        }
+                findings[index] = pre_analyze(scanned_med, user_med_with_schedule + others)
+                if settings.analysis_rule_fast_path and can_skip_llm(findings[index], user_medical_conditions):
+                    results[index] = build_rule_based_result(scanned_med, user_med_with_schedule + others, findings[index])
+                else:
+                    targets.append(index)
+            
+            # 4. 나머지 약은 LLM 1회로 함께 분석
+            if targets:
+                results.update(await analyze_batch_with_ai(
+                    scanned_meds, targets, user_med_with_schedule, user_medical_conditions, findings
+                ))
         
-        # 5. AI 분석 수행 (지병 정보 포함)
-        ai_result = await analyze_with_ai(scanned_med, user_med_with_schedule, user_medical_conditions)
+        # 5. 응답 구성 (LLM 결과 형식이 잘못된 항목은 기본 안전 응답으로 대체)
+        items = []
+        for index in range(len(request.images_base64)):
+            if index in errors:
+                items.append(BatchScanItem(index=index, error=errors[index]))
+                continue
+            try:
+                analysis = build_analysis_response(scanned_meds[index], results[index])
+            except Exception as e:
+                print(f"Batch Scan Result Error [{index}]: {e}")
+                analysis = build_analysis_response(scanned_meds[index], ANALYSIS_ERROR_RESULT)
+            items.append(BatchScanItem(index=index, analysis=analysis))
         
-        # 6. 응답 구성
-        return MedicationAnalysisResponse(
-            scannedMedication=ScannedMedication(
-                name=scanned_med["name"],
-                ingredient=scanned_med["ingredient"],
-                amount=scanned_med["amount"]
+        analyses = [item.analysis for item in items if item.analysis is not None]
+        return BatchScanAnalysisResponse(
+            items=items,
+            overallRiskScore=max((analysis.overallRiskScore for analysis in analyses), default=0),
+            riskLevel=max(
+                (analysis.riskLevel for analysis in analyses), key=RISK_LEVEL_ORDER.get, default="low"
             ),
-            overallRiskScore=ai_result.get("overallRiskScore", 0),
-            riskLevel=ai_result.get("riskLevel", "low"),
-            riskItems=[
-                RiskItem(
-                    id=item["id"],
-                    type=item["type"],
-                    severity=item["severity"],
-                    title=item["title"],
-                    description=item["description"],
-                    percentage=item["percentage"]
-                )
-                for item in ai_result.get("riskItems", [])
-            ],
-            warnings=ai_result.get("warnings", []),
-            summary=ai_result.get("summary", "분석이 완료되었습니다."),
-            sections=[
-                CommentSection(
-                    icon=section["icon"],
-                    title=section["title"],
-                    content=section["content"]
-                )
-                for section in ai_result.get("sections", [])
-            ]
+            analyzedCount=len(analyses),
+            failedCount=len(errors),
         )
-        
+    
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Scan Analysis Error: {e}")
+        print(f"Batch Scan Analysis Error: {e}")
         import traceback
         traceback.print_exc()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"약물 분석 중 오류가 발생했습니다: {str(e)}"
+            detail=f"약물 일괄 분석 중 오류가 발생했습니다: {str(e)}"
         )
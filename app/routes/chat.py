@@ -1,14 +1,27 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Any, AsyncIterator
+import json
 import uuid
 from datetime import datetime
-from app.database import get_db
+from app.database import get_async_db, AsyncSessionLocal
 from app.models.chat_history import ChatHistory, MessageRole
 from app.models.chat_session import ChatSession
+from app.models.chat_summary import ChatSummary
 from app.schemas.chat import ChatRequest, ChatResponse, ChatHistoryResponse
 from app.config import get_settings
-from app.services.rag_service import search_by_question
+from app.services.rag_service import search_by_question, resolve_search_mode, embed_text, get_index_version, CHAT_CONTEXT_K
+from app.services.semantic_cache import SemanticAnswerCache, get_answer_cache
+from app.services.llm_client import get_scheduled_llm_client
+from app.services.background_worker import BackgroundWorker
+from app.services.llm_scheduler import Priority, estimate_request_tokens, get_llm_scheduler
+from app.services.llm_metrics import record_cache_hit, track_llm_call
+from app.services.chat_context import (
+    fit_history, history_tokens, split_history, summarize_history, summary_message
+)
 
 router = APIRouter()
 settings = get_settings()
@@ -16,55 +29,24 @@ settings = get_settings()
 # MVP: 고정 사용자 ID (인증 없음)
 MVP_USER_ID = 1
 
+# 대화 제목 생성 백그라운드 워커 (동시 LLM 호출 수 / 대기 작업 수 제한)
+title_worker = BackgroundWorker(
+    "chat-title",
+    workers=settings.chat_title_workers,
+    queue_size=settings.chat_title_queue_size,
+)
 
-async def get_ai_response(message: str, chat_history: List[dict] = None, user_medicines: List[dict] = None, medical_conditions: List[str] = None) -> tuple[str, dict]:
-    """
-    AI 약사 필메이트 응답 생성 (RAG 통합 + 사용자 정보)
-    OpenAI GPT-4o API + DUR 데이터 검색 + 사용자 복용 약물 및 지병
-    
-    Args:
-        message: 사용자 질문
-        chat_history: 이전 대화 이력
-        user_medicines: 사용자가 복용 중인 약물 목록
-        medical_conditions: 사용자의 지병 목록
-    
-    Returns:
-        tuple: (response_text, metadata)
-            - response_text: AI 응답 텍스트
-            - metadata: 토큰 사용량, 모델 정보 등
-    """
-    try:
-        from openai import OpenAI
-        
-        client = OpenAI(api_key=settings.openai_api_key)
-        
-        # RAG: 사용자 질문과 관련된 DUR 안전 정보 검색
-        try:
-            rag_results = search_by_question(message, k=3)
-            
-            # RAG 컨텍스트 생성
-            rag_context = ""
-            if rag_results:
-                rag_context = "\n\n**참고할 의약품 안전 정보 (DUR 데이터):**\n"
-                for i, result in enumerate(rag_results, 1):
-                    rag_context += f"\n{i}. {result['content']}\n"
-        except Exception as e:
-            print(f"RAG 검색 오류 (무시하고 계속): {e}")
-            rag_context = ""
-        
-        # 사용자 정보 컨텍스트 생성
-        user_context = ""
-        
-        if medical_conditions:
-            user_context += f"\n\n**사용자의 지병**: {', '.join(medical_conditions)}"
-        
-        if user_medicines:
-            user_context += "\n\n**사용자가 현재 복용 중인 약물**:\n"
-            for med in user_medicines:
-                user_context += f"- {med.get('name', '알 수 없음')} ({med.get('ingredient', '성분 미상')})\n"
-        
-        # 시스템 프롬프트: AI 약사 필메이트의 역할과 규칙
-        system_prompt = """당신은 '필메이트'라는 이름의 AI 약사 챗봇입니다. 약국에서 약사가 간단명료하게 설명하듯이 답변하세요.
+# 대화 요약 갱신 백그라운드 워커 (세션당 대기 작업 1개)
+summary_worker = BackgroundWorker(
+    "chat-summary",
+    workers=settings.chat_summary_workers,
+    queue_size=settings.chat_summary_queue_size,
+)
+_summary_pending: set = set()
+
+
+# 시스템 프롬프트: AI 약사 필메이트의 역할과 규칙
+CHAT_SYSTEM_PROMPT = """당신은 '필메이트'라는 이름의 AI 약사 챗봇입니다. 약국에서 약사가 간단명료하게 설명하듯이 답변하세요.
 
 핵심 규칙:
 
@@ -94,40 +76,171 @@ async def get_ai_response(message: str, chat_history: List[dict] = None, user_me
 
 """
 
-        # 메시지 구성
-        messages = [{"role": "system", "content": system_prompt}]
-        
-        # 이전 대화 이력 추가
-        if chat_history:
-            messages.extend(chat_history[-10:])  # 최근 10개만 사용
-        
-        # 현재 사용자 메시지 추가 (RAG 컨텍스트 + 사용자 정보 포함)
-        user_message = message
-        if rag_context or user_context:
-            user_message = f"{message}\n{user_context}\n{rag_context}"
-        
-        messages.append({"role": "user", "content": user_message})
-        
-        # OpenAI API 호출
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=messages,
-            temperature=0.7,
-            max_tokens=300,  # 더 간결한 답변을 위해 제한
-            top_p=1.0,
-            frequency_penalty=0.3,
-            presence_penalty=0.3
+# 챗봇/제목 프롬프트나 파라미터를 바꾸면 올릴 것 (LLM 호출 집계에 포함)
+CHAT_PROMPT_VERSION = "1"
+TITLE_PROMPT_VERSION = "1"
+
+# 챗봇 응답 생성 파라미터 (일반 / 스트리밍 공통)
+CHAT_COMPLETION_PARAMS = {
+    "model": "gpt-4o",
+    "temperature": 0.7,
+    "max_tokens": 300,  # 더 간결한 답변을 위해 제한
+    "top_p": 1.0,
+    "frequency_penalty": 0.3,
+    "presence_penalty": 0.3,
+}
+
+CHAT_ERROR_MESSAGE = "죄송합니다. 일시적인 오류가 발생했습니다. 잠시 후 다시 시도해 주세요."
+
+
+async def build_chat_messages(message: str, chat_history: List[dict] = None, user_medicines: List[dict] = None, medical_conditions: List[str] = None) -> List[dict]:
+    """
+    챗봇 프롬프트 메시지 구성 (RAG 컨텍스트 + 사용자 정보 + 대화 이력)
+    
+    Args:
+        message: 사용자 질문
+        chat_history: 이전 대화 이력
+        user_medicines: 사용자가 복용 중인 약물 목록
+        medical_conditions: 사용자의 지병 목록
+    
+    Returns:
+        List[dict]: OpenAI chat messages
+    """
+    # RAG: 사용자 질문과 관련된 DUR 안전 정보 검색
+    try:
+        # 스레드풀에서 실행: 이벤트 루프를 막지 않고, 동시 요청의 임베딩이 한 배치로 묶이도록
+        rag_results = await run_in_threadpool(
+            search_by_question, message, k=CHAT_CONTEXT_K[resolve_search_mode()]
         )
         
-        # 메타데이터 추출
-        metadata = {
-            "model": response.model,
-            "tokens_used": response.usage.total_tokens if response.usage else None,
-            "prompt_tokens": response.usage.prompt_tokens if response.usage else None,
-            "completion_tokens": response.usage.completion_tokens if response.usage else None,
-        }
+        # RAG 컨텍스트 생성
+        rag_context = ""
+        if rag_results:
+            rag_context = "\n\n**참고할 의약품 안전 정보 (DUR 데이터):**\n"
+            for i, result in enumerate(rag_results, 1):
+                rag_context += f"\n{i}. {result['content']}\n"
+    except Exception as e:
+        print(f"RAG 검색 오류 (무시하고 계속): {e}")
+        rag_context = ""
+    
+    # 사용자 정보 컨텍스트 생성
+    user_context = ""
+    
+    if medical_conditions:
+        user_context += f"\n\n**사용자의 지병**: {', '.join(medical_conditions)}"
+    
+    if user_medicines:
+        user_context += "\n\n**사용자가 현재 복용 중인 약물**:\n"
+        for med in user_medicines:
+            user_context += f"- {med.get('name', '알 수 없음')} ({med.get('ingredient', '성분 미상')})\n"
+    
+    # 메시지 구성
+    messages = [{"role": "system", "content": CHAT_SYSTEM_PROMPT}]
+    
+    # 이전 대화 이력 추가 (요약 + 토큰 예산 안의 최근 메시지)
+    messages.extend(fit_history(chat_history))
+    
+    # 현재 사용자 메시지 추가 (RAG 컨텍스트 + 사용자 정보 포함)
+    user_message = message
+    if rag_context or user_context:
+        user_message = f"{message}\n{user_context}\n{rag_context}"
+    
+    messages.append({"role": "user", "content": user_message})
+    return messages
+
+
+def usage_metadata(model: str, usage) -> dict:
+    """토큰 사용량 메타데이터"""
+    return {
+        "model": model,
+        "tokens_used": usage.total_tokens if usage else None,
+        "prompt_tokens": usage.prompt_tokens if usage else None,
+        "completion_tokens": usage.completion_tokens if usage else None,
+    }
+
+
+def answer_cache_for(chat_history: List[dict] = None, user_medicines: List[dict] = None, medical_conditions: List[str] = None) -> Optional[SemanticAnswerCache]:
+    """시맨틱 답변 캐시 (첫 질문이고 사용자별 정보가 없을 때만, 비활성화 시 None)"""
+    if chat_history or user_medicines or medical_conditions:
+        return None
+    return get_answer_cache()
+
+
+async def find_cached_answer(cache: SemanticAnswerCache, message: str) -> tuple[Optional[tuple], Optional[tuple[str, dict]]]:
+    """
+    질문 임베딩으로 캐시 조회
+    
+    Returns:
+        tuple: (저장용 키 (임베딩, DUR 버전) - 임베딩 실패 시 None, 캐시 히트 시 (response_text, metadata))
+    """
+    try:
+        embedding = await run_in_threadpool(embed_text, message)
+        version = get_index_version()["version"]
+    except Exception as e:
+        print(f"시맨틱 캐시 임베딩 오류 (무시하고 계속): {e}")
+        return None, None
+    
+    hit = cache.lookup(embedding, version)
+    if hit is None:
+        return (embedding, version), None
+    
+    answer, metadata, similarity = hit
+    return (embedding, version), (answer, {
+        "model": metadata.get("model"),
+        "tokens_used": 0,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "cache_hit": True,
+        "similarity": round(similarity, 4),
+    })
+
+
+async def get_ai_response(message: str, chat_history: List[dict] = None, user_medicines: List[dict] = None, medical_conditions: List[str] = None) -> tuple[str, dict]:
+    """
+    AI 약사 필메이트 응답 생성 (RAG 통합 + 사용자 정보)
+    OpenAI GPT-4o API + DUR 데이터 검색 + 사용자 복용 약물 및 지병
+    
+    Args:
+        message: 사용자 질문
+        chat_history: 이전 대화 이력
+        user_medicines: 사용자가 복용 중인 약물 목록
+        medical_conditions: 사용자의 지병 목록
+    
+    Returns:
+        tuple: (response_text, metadata)
+            - response_text: AI 응답 텍스트
+            - metadata: 토큰 사용량, 모델 정보 등
+    """
+    # 시맨틱 캐시: 비슷한 첫 질문의 이전 답변 재사용
+    cache = answer_cache_for(chat_history, user_medicines, medical_conditions)
+    cache_key = None
+    if cache is not None:
+        cache_key, cached = await find_cached_answer(cache, message)
+        if cached is not None:
+            record_cache_hit("chat", CHAT_PROMPT_VERSION)
+            return cached
+    
+    try:
+        client = get_scheduled_llm_client()
+        messages = await build_chat_messages(message, chat_history, user_medicines, medical_conditions)
         
-        return response.choices[0].message.content, metadata
+        # OpenAI API 호출 (LLM 스케줄러 - 대화형 우선순위)
+        with track_llm_call("chat", CHAT_PROMPT_VERSION, cache="miss" if cache_key else None) as call:
+            response = await get_llm_scheduler().run(
+                Priority.CHAT,
+                lambda: client.chat.completions.create(
+                    messages=messages,
+                    **CHAT_COMPLETION_PARAMS
+                ),
+                estimate_request_tokens(messages, CHAT_COMPLETION_PARAMS["max_tokens"]),
+            )
+            call.set_usage(response.model, response.usage)
+        
+        response_text = response.choices[0].message.content
+        metadata = usage_metadata(response.model, response.usage)
+        if cache_key is not None and response_text:
+            cache.store(message, cache_key[0], response_text, metadata, version=cache_key[1])
+        return response_text, metadata
         
     except Exception as e:
         # API 오류 시 기본 응답
@@ -137,24 +250,83 @@ async def get_ai_response(message: str, chat_history: List[dict] = None, user_me
             "tokens_used": 0,
             "error": str(e)
         }
-        return "죄송합니다. 일시적인 오류가 발생했습니다. 잠시 후 다시 시도해 주세요.", error_metadata
+        return CHAT_ERROR_MESSAGE, error_metadata
 
 
-async def generate_chat_title(messages: List[dict], db: Session) -> str:
+async def stream_ai_response(message: str, chat_history: List[dict] = None, user_medicines: List[dict] = None, medical_conditions: List[str] = None) -> AsyncIterator[tuple[str, Any]]:
+    """
+    AI 약사 필메이트 응답 스트리밍 (get_ai_response의 스트리밍 버전)
+    
+    Yields:
+        ("delta", str): 생성된 텍스트 조각 (도착하는 대로)
+        ("metadata", dict): 스트림 종료 시 토큰 사용량, 모델 정보
+    
+    오류는 호출한 쪽에서 처리 (이미 전송한 조각이 있을 수 있으므로)
+    """
+    # 시맨틱 캐시 히트 시 이전 답변을 한 조각으로 전송
+    cache = answer_cache_for(chat_history, user_medicines, medical_conditions)
+    cache_key = None
+    if cache is not None:
+        cache_key, cached = await find_cached_answer(cache, message)
+        if cached is not None:
+            record_cache_hit("chat_stream", CHAT_PROMPT_VERSION)
+            yield "delta", cached[0]
+            yield "metadata", cached[1]
+            return
+    
+    client = get_scheduled_llm_client()
+    messages = await build_chat_messages(message, chat_history, user_medicines, medical_conditions)
+    
+    model, usage = CHAT_COMPLETION_PARAMS["model"], None
+    parts: List[str] = []
+    
+    # 스트림 열기는 스케줄러가 재시도 (429/연결 오류, 첫 토큰 전), 스트림이 끝날 때까지 슬롯 유지 (대화형 우선순위)
+    with track_llm_call("chat_stream", CHAT_PROMPT_VERSION, cache="miss" if cache_key else None) as call:
+        async with get_llm_scheduler().slot(
+            Priority.CHAT,
+            lambda: client.chat.completions.create(
+                messages=messages,
+                stream=True,
+                stream_options={"include_usage": True},  # 마지막 청크에 토큰 사용량 포함
+                **CHAT_COMPLETION_PARAMS
+            ),
+            estimate_request_tokens(messages, CHAT_COMPLETION_PARAMS["max_tokens"])
+        ) as slot:
+            stream = slot.result
+            
+            try:
+                async for chunk in stream:
+                    model = chunk.model or model
+                    if chunk.usage:
+                        usage = chunk.usage
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        call.mark_first_token()
+                        parts.append(chunk.choices[0].delta.content)
+                        yield "delta", chunk.choices[0].delta.content
+            finally:
+                await stream.close()
+                call.set_usage(model, usage)
+                if usage:
+                    slot.tokens = usage.total_tokens
+    
+    metadata = usage_metadata(model, usage)
+    if cache_key is not None and parts:
+        cache.store(message, cache_key[0], "".join(parts), metadata, version=cache_key[1])
+    yield "metadata", metadata
+
+
+async def generate_chat_title(messages: List[dict]) -> str:
     """
     대화 내용을 바탕으로 제목 생성 (GPT-4o 사용)
     
     Args:
         messages: 대화 메시지 리스트 (최근 3개 정도)
-        db: Database session
     
     Returns:
         str: 생성된 제목 (최대 30자)
     """
     try:
-        from openai import OpenAI
-        
-        client = OpenAI(api_key=settings.openai_api_key)
+        client = get_scheduled_llm_client()
         
         # 대화 내용 요약을 위한 프롬프트
         conversation_text = "\n".join([
@@ -176,14 +348,21 @@ async def generate_chat_title(messages: List[dict], db: Session) -> str:
 
 제목:"""
         
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=50
-        )
+        messages = [{"role": "user", "content": prompt}]
+        
+        # 백그라운드 우선순위 (채팅/스캔 요청이 먼저)
+        with track_llm_call("chat_title", TITLE_PROMPT_VERSION) as call:
+            response = await get_llm_scheduler().run(
+                Priority.BACKGROUND,
+                lambda: client.chat.completions.create(
+                    model="gpt-4o",
+                    messages=messages,
+                    temperature=0.7,
+                    max_tokens=50
+                ),
+                estimate_request_tokens(messages, 50),
+            )
+            call.set_usage(response.model, response.usage)
         
         title = response.choices[0].message.content.strip()
         return title[:30]  # 최대 30자로 제한
@@ -194,45 +373,44 @@ async def generate_chat_title(messages: List[dict], db: Session) -> str:
         return f"약물 상담 {datetime.now().strftime('%m/%d %H:%M')}"
 
 
-@router.post(
-    "/",
-    response_model=ChatResponse,
-    summary="AI 약사 상담",
-)
-async def chat(
-    chat_data: ChatRequest,
-    db: Session = Depends(get_db)
-):
-    """AI 약사 상담"""
-    
-    # 세션 ID 생성 (새로운 대화인 경우)
-    session_id = chat_data.session_id or str(uuid.uuid4())
+async def load_chat_context(db: AsyncSession, session_id: Optional[str]) -> tuple[List[dict], List[dict], List[str]]:
+    """
+    AI 응답 생성에 필요한 컨텍스트 조회
     
-    # 이전 대화 이력 조회 (컨텍스트용)
-    if chat_data.session_id:
-        chat_history = db.query(ChatHistory).filter(
+    Returns:
+        tuple: (대화 이력, 복용 중인 약물 목록, 지병 목록)
+            - 대화 이력: 세션 요약이 있으면 맨 앞에 요약 system 메시지 + 요약 이후 메시지
+    """
+    # 이전 대화 이력 조회 (컨텍스트용) - 요약에 반영된 메시지는 제외
+    history_for_ai = []
+    if session_id:
+        summary = await db.scalar(select(ChatSummary).where(ChatSummary.session_id == session_id).limit(1))
+        
+        query = select(ChatHistory).where(
             ChatHistory.user_id == MVP_USER_ID,
             ChatHistory.session_id == session_id
-        ).order_by(ChatHistory.created_at).all()
+        )
+        if summary:
+            query = query.where(ChatHistory.id > summary.last_message_id)
+            history_for_ai.append(summary_message(summary.summary))
+        chat_history = (await db.scalars(query.order_by(ChatHistory.created_at, ChatHistory.id))).all()
         
-        history_for_ai = [
+        history_for_ai.extend(
             {"role": msg.role.value, "content": msg.content}
             for msg in chat_history
-        ]
-    else:
-        history_for_ai = []
+        )
     
     # 사용자의 복용 중인 약물 및 지병 정보 조회
     from app.models.medicine import Medicine
     from app.models.user import User
     
-    user = db.query(User).filter(User.id == MVP_USER_ID).first()
+    user = await db.get(User, MVP_USER_ID)
     medical_conditions = user.medical_conditions if user and user.medical_conditions else []
     
-    medicines = db.query(Medicine).filter(
+    medicines = (await db.scalars(select(Medicine).where(
         Medicine.user_id == MVP_USER_ID,
         Medicine.is_active == True
-    ).all()
+    ))).all()
     
     user_medicines = [
         {
@@ -243,53 +421,151 @@ async def chat(
         for med in medicines
     ]
     
+    return history_for_ai, user_medicines, medical_conditions
+
+
+async def save_chat_turn(db: AsyncSession, session_id: str, user_text: str, ai_text: str) -> ChatHistory:
+    """사용자 메시지 + AI 응답 저장 후 AI 응답 레코드 반환"""
     # 사용자 메시지 저장
     user_message = ChatHistory(
         user_id=MVP_USER_ID,
         role=MessageRole.USER,
-        content=chat_data.message,
+        content=user_text,
         session_id=session_id
     )
     db.add(user_message)
     
-    # AI 응답 생성 (사용자 정보 포함)
-    ai_response_text, metadata = await get_ai_response(
-        chat_data.message, 
-        history_for_ai,
-        user_medicines=user_medicines,
-        medical_conditions=medical_conditions
-    )
-    
     # AI 응답 저장
     ai_message = ChatHistory(
         user_id=MVP_USER_ID,
         role=MessageRole.ASSISTANT,
-        content=ai_response_text,
+        content=ai_text,
         session_id=session_id
     )
     db.add(ai_message)
     
-    db.commit()
-    db.refresh(ai_message)
+    await db.commit()
+    await db.refresh(ai_message)
+    return ai_message
+
+
+async def update_chat_summary(session_id: str) -> None:
+    """
+    토큰 예산 밖으로 밀려난 오래된 대화를 세션 요약에 접기 (summary_worker에서 실행)
     
-    # 새 세션인 경우 제목 자동 생성
-    if not chat_data.session_id:
-        # ChatSession 생성
-        chat_session = ChatSession(
-            user_id=MVP_USER_ID,
-            session_id=session_id
-        )
-        db.add(chat_session)
-        db.commit()
+    예산의 절반만 원문으로 남기고 나머지를 접어서 매 턴마다 요약하지 않도록 한다.
+    """
+    try:
+        async with AsyncSessionLocal() as db:
+            summary = await db.scalar(select(ChatSummary).where(ChatSummary.session_id == session_id).limit(1))
+            previous_summary = summary.summary if summary else None
+            
+            query = select(ChatHistory).where(
+                ChatHistory.user_id == MVP_USER_ID,
+                ChatHistory.session_id == session_id
+            )
+            if summary:
+                query = query.where(ChatHistory.id > summary.last_message_id)
+            rows = (await db.scalars(query.order_by(ChatHistory.created_at, ChatHistory.id))).all()
+            history = [{"role": msg.role.value, "content": msg.content} for msg in rows]
         
-        # 제목 생성 (비동기로 첫 대화 기반)
-        title = await generate_chat_title([
-            {"role": "user", "content": chat_data.message},
-            {"role": "assistant", "content": ai_response_text}
-        ], db)
+        older, _ = split_history(history, settings.chat_history_token_budget // 2)
+        if not older:
+            return
         
-        chat_session.title = title
-        db.commit()
+        new_summary = await summarize_history(previous_summary, older)
+        
+        async with AsyncSessionLocal() as db:
+            summary = await db.scalar(select(ChatSummary).where(ChatSummary.session_id == session_id).limit(1))
+            if summary is None:
+                summary = ChatSummary(session_id=session_id)
+                db.add(summary)
+            summary.summary = new_summary
+            summary.last_message_id = rows[len(older) - 1].id
+            await db.commit()
+    finally:
+        _summary_pending.discard(session_id)
+
+
+def schedule_chat_summary(session_id: str, chat_history: List[dict], user_text: str, ai_text: str) -> None:
+    """요약 이후 대화가 토큰 예산을 넘으면 요약 갱신 예약"""
+    if session_id in _summary_pending:
+        return
+    
+    recent = [msg for msg in chat_history if msg.get("role") != "system"]
+    recent += [{"role": "user", "content": user_text}, {"role": "assistant", "content": ai_text}]
+    if history_tokens(recent) <= settings.chat_history_token_budget:
+        return
+    
+    if summary_worker.submit(update_chat_summary, session_id):
+        _summary_pending.add(session_id)
+
+
+def placeholder_chat_title(user_text: str) -> str:
+    """제목 생성 전 임시 제목 (첫 질문 앞부분)"""
+    title = " ".join(user_text.split())
+    return title[:27] + "..." if len(title) > 30 else title or "새 대화"
+
+
+async def update_chat_title(session_id: str, messages: List[dict]) -> None:
+    """제목 생성 후 ChatSession.title 갱신 (title_worker에서 실행)"""
+    title = await generate_chat_title(messages)
+    
+    async with AsyncSessionLocal() as db:
+        await db.execute(update(ChatSession).where(
+            ChatSession.session_id == session_id
+        ).values(title=title).execution_options(synchronize_session=False))
+        await db.commit()
+
+
+async def create_chat_session(db: AsyncSession, session_id: str, user_text: str, ai_text: str) -> None:
+    """새 세션 생성 (임시 제목) + 첫 대화 기반 제목 생성은 백그라운드로"""
+    chat_session = ChatSession(
+        user_id=MVP_USER_ID,
+        session_id=session_id,
+        title=placeholder_chat_title(user_text)
+    )
+    db.add(chat_session)
+    await db.commit()
+    
+    # 제목 생성 LLM 호출은 응답 경로 밖에서 (큐가 가득 차면 임시 제목 유지)
+    title_worker.submit(update_chat_title, session_id, [
+        {"role": "user", "content": user_text},
+        {"role": "assistant", "content": ai_text}
+    ])
+
+
+@router.post(
+    "/",
+    response_model=ChatResponse,
+    summary="AI 약사 상담",
+)
+async def chat(
+    chat_data: ChatRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """AI 약사 상담"""
+    
+    # 세션 ID 생성 (새로운 대화인 경우)
+    session_id = chat_data.session_id or str(uuid.uuid4())
+    
+    history_for_ai, user_medicines, medical_conditions = await load_chat_context(db, chat_data.session_id)
+    
+    # AI 응답 생성 (사용자 정보 포함)
+    ai_response_text, metadata = await get_ai_response(
+        chat_data.message, 
+        history_for_ai,
+        user_medicines=user_medicines,
+        medical_conditions=medical_conditions
+    )
+    
+    ai_message = await save_chat_turn(db, session_id, chat_data.message, ai_response_text)
+    
+    # 새 세션인 경우 세션 생성 (제목은 백그라운드 생성)
+    if not chat_data.session_id:
+        await create_chat_session(db, session_id, chat_data.message, ai_response_text)
+    else:
+        schedule_chat_summary(session_id, history_for_ai, chat_data.message, ai_response_text)
     
     return ChatResponse(
         message=ai_response_text,
@@ -300,21 +576,107 @@ async def chat(
     )
 
 
+def _sse(event: str, data: dict) -> str:
+    """Server-Sent Events 메시지 1건"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+@router.post(
+    "/stream",
+    summary="AI 약사 상담 (스트리밍)",
+    response_class=StreamingResponse,
+)
+async def chat_stream(
+    chat_data: ChatRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    AI 약사 상담 - 생성되는 대로 Server-Sent Events로 전송
+    
+    이벤트 (data는 JSON):
+    - session: {"session_id"} - 요청 직후
+    - token: {"content"} - 응답 텍스트 조각 (이어 붙이면 전체 응답)
+    - error: {"message"} - 생성 중 오류 (이후 done으로 종료)
+    - done: {"message_id", "session_id", "created_at", "tokens_used", "prompt_tokens", "completion_tokens", "model"}
+    
+    스트림이 끝나면 전체 응답을 ChatHistory에 저장한 뒤 done을 보낸다.
+    (클라이언트가 중간에 연결을 끊으면 저장하지 않음)
+    """
+    session_id = chat_data.session_id or str(uuid.uuid4())
+    history_for_ai, user_medicines, medical_conditions = await load_chat_context(db, chat_data.session_id)
+    
+    async def event_stream():
+        yield _sse("session", {"session_id": session_id})
+        
+        parts: List[str] = []
+        metadata: dict = {}
+        try:
+            async for kind, value in stream_ai_response(
+                chat_data.message,
+                history_for_ai,
+                user_medicines=user_medicines,
+                medical_conditions=medical_conditions
+            ):
+                if kind == "delta":
+                    parts.append(value)
+                    yield _sse("token", {"content": value})
+                else:
+                    metadata = value
+        except Exception as e:
+            print(f"OpenAI API Error: {e}")
+            metadata = {"model": "error", "tokens_used": 0, "error": str(e)}
+            if not parts:
+                parts.append(CHAT_ERROR_MESSAGE)
+                yield _sse("token", {"content": CHAT_ERROR_MESSAGE})
+            yield _sse("error", {"message": CHAT_ERROR_MESSAGE})
+        
+        ai_response_text = "".join(parts)
+        
+        # 응답 본문 전송 중에는 요청 의존성(db)이 이미 정리되었을 수 있으므로 별도 세션 사용
+        async with AsyncSessionLocal() as stream_db:
+            ai_message = await save_chat_turn(stream_db, session_id, chat_data.message, ai_response_text)
+            
+            # 새 세션인 경우 세션 생성 (제목은 백그라운드 생성)
+            if not chat_data.session_id:
+                await create_chat_session(stream_db, session_id, chat_data.message, ai_response_text)
+            else:
+                schedule_chat_summary(session_id, history_for_ai, chat_data.message, ai_response_text)
+            
+            yield _sse("done", {
+                "message_id": ai_message.id,
+                "session_id": session_id,
+                "created_at": ai_message.created_at.isoformat(),
+                "tokens_used": metadata.get("tokens_used"),
+                "prompt_tokens": metadata.get("prompt_tokens"),
+                "completion_tokens": metadata.get("completion_tokens"),
+                "model": metadata.get("model"),
+            })
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # nginx 프록시 버퍼링 해제
+        },
+    )
+
+
 @router.get("/history",
             response_model=List[ChatHistoryResponse],
             summary="채팅 이력 조회"
 )
 async def get_chat_history(
     session_id: str = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """채팅 이력 조회 (MVP)"""
-    query = db.query(ChatHistory).filter(ChatHistory.user_id == MVP_USER_ID)
+    query = select(ChatHistory).where(ChatHistory.user_id == MVP_USER_ID)
     
     if session_id:
-        query = query.filter(ChatHistory.session_id == session_id)
+        query = query.where(ChatHistory.session_id == session_id)
     
-    history = query.order_by(ChatHistory.created_at).all()
+    history = (await db.scalars(query.order_by(ChatHistory.created_at))).all()
     
     return history
 
@@ -325,15 +687,16 @@ async def get_chat_history(
 )
 async def delete_chat_session(
     session_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """특정 세션의 채팅 이력 삭제 (MVP)"""
-    db.query(ChatHistory).filter(
+    await db.execute(delete(ChatHistory).where(
         ChatHistory.user_id == MVP_USER_ID,
         ChatHistory.session_id == session_id
-    ).delete()
+    ))
+    await db.execute(delete(ChatSummary).where(ChatSummary.session_id == session_id))
     
-    db.commit()
+    await db.commit()
     
     return None
 
@@ -342,12 +705,12 @@ async def delete_chat_session(
             summary="대화 세션 목록 조회"
 )
 async def get_chat_sessions(
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """사용자의 모든 대화 세션 목록 조회 (제목 포함)"""
-    sessions = db.query(ChatSession).filter(
+    sessions = (await db.scalars(select(ChatSession).where(
         ChatSession.user_id == MVP_USER_ID
-    ).order_by(ChatSession.updated_at.desc()).all()
+    ).order_by(ChatSession.updated_at.desc()))).all()
     
     return [
         {
@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 import json
-from app.database import get_db
+from app.database import get_async_db
 from app.models.medicine import Medicine
 from app.schemas.medicine import MedicineCreate, MedicineResponse, MedicineDetailResponse
+from app.services.analysis_cache import invalidate_analysis_cache
 
 router = APIRouter()
 
@@ -18,13 +20,13 @@ MVP_USER_ID = 1
     summary="내 약 목록 조회"
 )
 async def get_medicines(
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """내 약 목록 조회"""
-    medicines = db.query(Medicine).filter(
+    medicines = (await db.scalars(select(Medicine).where(
         Medicine.user_id == MVP_USER_ID,
         Medicine.is_active == True
-    ).all()
+    ))).all()
     return medicines
 
 
@@ -36,13 +38,13 @@ async def get_medicines(
 )
 async def get_medicine(
     medicine_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """약 상세 조회 - 스캔 보고서 포함"""
-    medicine = db.query(Medicine).filter(
+    medicine = await db.scalar(select(Medicine).where(
         Medicine.id == medicine_id,
         Medicine.user_id == MVP_USER_ID
-    ).first()
+    ).limit(1))
     
     if not medicine:
         raise HTTPException(
@@ -75,7 +77,7 @@ async def get_medicine(
 )
 async def create_medicine(
     medicine_data: MedicineCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """약 등록"""
     # scan_report를 JSON 문자열로 변환
@@ -90,8 +92,9 @@ async def create_medicine(
     )
     
     db.add(db_medicine)
-    db.commit()
-    db.refresh(db_medicine)
+    await invalidate_analysis_cache(db, MVP_USER_ID)
+    await db.commit()
+    await db.refresh(db_medicine)
     
     return db_medicine
 
@@ -104,13 +107,13 @@ async def create_medicine(
 )
 async def delete_medicine(
     medicine_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """약 삭제 (소프트 삭제)"""
-    medicine = db.query(Medicine).filter(
+    medicine = await db.scalar(select(Medicine).where(
         Medicine.id == medicine_id,
         Medicine.user_id == MVP_USER_ID
-    ).first()
+    ).limit(1))
     
     if not medicine:
         raise HTTPException(
@@ -119,6 +122,7 @@ async def delete_medicine(
         )
     
     medicine.is_active = False
-    db.commit()
+    await invalidate_analysis_cache(db, MVP_USER_ID)
+    await db.commit()
     
     return None
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 import base64
 import io
 import json
+import time
 from typing import List
 from PIL import Image
 from rapidfuzz import fuzz
@@ -10,6 +11,7 @@ from app.database import get_db
 from app.schemas.ocr import OCRRequest, OCRResponse, MedicineMatch
 from app.config import get_settings
 from app.utils.aihub_loader import get_aihub_loader
+from app.services.circuit_breaker import VISION_BREAKER, get_circuit_breaker
 
 router = APIRouter()
 settings = get_settings()
@@ -22,27 +24,45 @@ def extract_text_from_image(image_base64: str) -> str:
     """
     이미지에서 텍스트 추출
     
-    1순위: Google Cloud Vision API (설정된 경우)
+    1순위: Google Cloud Vision API (설정된 경우, 회로가 열려 있으면 건너뜀)
     2순위: Tesseract OCR (로컬)
     """
+    breaker = get_circuit_breaker(VISION_BREAKER)
     try:
         # Google Cloud Vision API 사용 (GOOGLE_APPLICATION_CREDENTIALS 설정 시)
         import os
         google_creds = os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
-        if google_creds:
-            print(f"🔑 Google Vision API 키 파일: {google_creds}")
+        if not google_creds:
+            print("⚠️ GOOGLE_APPLICATION_CREDENTIALS 환경 변수 없음")
+        else:
+            # import/이미지 디코딩 오류는 Vision 호출 실패가 아니므로 회로 확인(반열림 시험 요청 할당) 전에 처리
             from google.cloud import vision
-            client = vision.ImageAnnotatorClient()
             image = vision.Image(content=base64.b64decode(image_base64))
-            response = client.text_detection(image=image)
-            if response.text_annotations:
-                text = response.text_annotations[0].description
-                print(f"✅ Google Vision API 텍스트 추출 성공: {len(text)} 글자")
-                return text
+            if not breaker.allow():
+                print(f"⚠️ Google Vision API 회로 차단 중 - {breaker.retry_after():.0f}초 후 재시도")
             else:
-                print("⚠️ Google Vision API: 텍스트를 찾지 못함")
-        else:
-            print("⚠️ GOOGLE_APPLICATION_CREDENTIALS 환경 변수 없음")
+                print(f"🔑 Google Vision API 키 파일: {google_creds}")
+                try:
+                    client = vision.ImageAnnotatorClient()
+                    started = time.monotonic()
+                    response = client.text_detection(image=image, timeout=settings.vision_timeout_seconds)
+                except BaseException as e:
+                    if isinstance(e, Exception):
+                        breaker.record_failure(type(e).__name__)
+                    else:  # 취소 등
+                        breaker.release()
+                    raise
+                if response.error.message:
+                    # 응답은 받았지만 API 오류 (할당량 초과, 인증 실패 등)
+                    breaker.record_failure(f"response.error: {response.error.code}")
+                    raise RuntimeError(response.error.message)
+                breaker.record_success(time.monotonic() - started)
+                if response.text_annotations:
+                    text = response.text_annotations[0].description
+                    print(f"✅ Google Vision API 텍스트 추출 성공: {len(text)} 글자")
+                    return text
+                else:
+                    print("⚠️ Google Vision API: 텍스트를 찾지 못함")
     except Exception as e:
         print(f"❌ Google Vision API 사용 실패: {e}")
     
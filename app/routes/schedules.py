@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from datetime import datetime, date
-from app.database import get_db
+from app.database import get_async_db
 from app.models.schedule import Schedule
 from app.models.medicine import Medicine
 from app.schemas.schedule import ScheduleCreate, ScheduleUpdate, ScheduleResponse, TodayScheduleResponse
+from app.services.analysis_cache import invalidate_analysis_cache
 
 router = APIRouter()
 
@@ -19,17 +21,17 @@ MVP_USER_ID = 1
     summary="오늘의 복용 스케줄",
 )
 async def get_today_schedules(
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """오늘 복용 스케줄 조회"""
     today = datetime.now()
     
-    schedules = db.query(Schedule).filter(
+    schedules = (await db.scalars(select(Schedule).where(
         Schedule.user_id == MVP_USER_ID,
         Schedule.is_active == True,
         Schedule.start_date <= today,
         Schedule.end_date >= today
-    ).all()
+    ))).all()
     
     return schedules
 
@@ -40,13 +42,13 @@ async def get_today_schedules(
     summary="전체 복용 스케줄 조회",
 )
 async def get_schedules(
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """스케줄 목록 조회"""
-    schedules = db.query(Schedule).filter(
+    schedules = (await db.scalars(select(Schedule).where(
         Schedule.user_id == MVP_USER_ID,
         Schedule.is_active == True
-    ).all()
+    ))).all()
     
     return schedules
 
@@ -58,13 +60,13 @@ async def get_schedules(
 )
 async def get_schedule(
     schedule_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """스케줄 상세 조회"""
-    schedule = db.query(Schedule).filter(
+    schedule = await db.scalar(select(Schedule).where(
         Schedule.id == schedule_id,
         Schedule.user_id == MVP_USER_ID
-    ).first()
+    ).limit(1))
     
     if not schedule:
         raise HTTPException(
@@ -84,14 +86,14 @@ async def get_schedule(
 )
 async def create_schedule(
     schedule_data: ScheduleCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """스케줄 등록"""
     # Verify medicine exists and belongs to user
-    medicine = db.query(Medicine).filter(
+    medicine = await db.scalar(select(Medicine).where(
         Medicine.id == schedule_data.medicine_id,
         Medicine.user_id == MVP_USER_ID
-    ).first()
+    ).limit(1))
     
     if not medicine:
         raise HTTPException(
@@ -105,8 +107,9 @@ async def create_schedule(
     )
     
     db.add(db_schedule)
-    db.commit()
-    db.refresh(db_schedule)
+    await invalidate_analysis_cache(db, MVP_USER_ID)
+    await db.commit()
+    await db.refresh(db_schedule)
     
     return db_schedule
 
@@ -118,13 +121,13 @@ async def create_schedule(
 async def update_schedule(
     schedule_id: int,
     schedule_data: ScheduleUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """스케줄 수정"""
-    schedule = db.query(Schedule).filter(
+    schedule = await db.scalar(select(Schedule).where(
         Schedule.id == schedule_id,
         Schedule.user_id == MVP_USER_ID
-    ).first()
+    ).limit(1))
     
     if not schedule:
         raise HTTPException(
@@ -137,8 +140,9 @@ async def update_schedule(
     for field, value in update_data.items():
         setattr(schedule, field, value)
     
-    db.commit()
-    db.refresh(schedule)
+    await invalidate_analysis_cache(db, MVP_USER_ID)
+    await db.commit()
+    await db.refresh(schedule)
     
     return schedule
 
@@ -149,13 +153,13 @@ async def update_schedule(
 )
 async def delete_schedule(
     schedule_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """스케줄 삭제"""
-    schedule = db.query(Schedule).filter(
+    schedule = await db.scalar(select(Schedule).where(
         Schedule.id == schedule_id,
         Schedule.user_id == MVP_USER_ID
-    ).first()
+    ).limit(1))
     
     if not schedule:
         raise HTTPException(
@@ -164,6 +168,7 @@ async def delete_schedule(
         )
     
     schedule.is_active = False
-    db.commit()
+    await invalidate_analysis_cache(db, MVP_USER_ID)
+    await db.commit()
     
     return None
\ No newline at end of file
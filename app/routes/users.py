@@ -2,10 +2,11 @@
 사용자 지병 관리 API (MVP)
 """
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from app.database import get_db
+from app.database import get_async_db
 from app.models.user import User
+from app.services.analysis_cache import invalidate_analysis_cache
 
 router = APIRouter()
 
@@ -18,9 +19,9 @@ MVP_USER_ID = 1
     response_model=List[str],
     summary="지병 정보 조회"
 )
-async def get_medical_conditions(db: Session = Depends(get_db)):
+async def get_medical_conditions(db: AsyncSession = Depends(get_async_db)):
     """현재 사용자의 지병 정보 조회 (MVP)"""
-    user = db.query(User).filter(User.id == MVP_USER_ID).first()
+    user = await db.get(User, MVP_USER_ID)
     
     if not user:
         raise HTTPException(
@@ -38,7 +39,7 @@ async def get_medical_conditions(db: Session = Depends(get_db)):
 )
 async def update_medical_conditions(
     medical_conditions: List[str],
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     지병 정보 업데이트 (MVP)
@@ -48,7 +49,7 @@ async def update_medical_conditions(
     ["고혈압", "당뇨병", "고지혈증"]
     ```
     """
-    user = db.query(User).filter(User.id == MVP_USER_ID).first()
+    user = await db.get(User, MVP_USER_ID)
     
     if not user:
         raise HTTPException(
@@ -57,7 +58,8 @@ async def update_medical_conditions(
         )
     
     user.medical_conditions = medical_conditions
-    db.commit()
-    db.refresh(user)
+    await invalidate_analysis_cache(db, MVP_USER_ID)
+    await db.commit()
+    await db.refresh(user)
     
     return user.medical_conditions or []
@@ -90,3 +90,24 @@ class ScanAnalysisRequest(BaseModel):
     image_base64: str = Field(..., description="Base64로 인코딩된 약 이미지")
     user_id: int = Field(default=1, description="사용자 ID (MVP: 고정값 1)")
 
+
+class BatchScanAnalysisRequest(BaseModel):
+    """약 여러 장 일괄 스캔 분석 요청 (최대 장수: ANALYSIS_BATCH_MAX_IMAGES)"""
+    images_base64: List[str] = Field(..., min_length=1, description="Base64로 인코딩된 약 이미지 배열 (촬영 순서)")
+    user_id: int = Field(default=1, description="사용자 ID (MVP: 고정값 1)")
+
+
+class BatchScanItem(BaseModel):
+    """일괄 스캔의 이미지 1장 결과 (analysis 또는 error 중 하나)"""
+    index: int = Field(..., description="images_base64 내 순서 (0부터)")
+    analysis: Optional[MedicationAnalysisResponse] = Field(default=None, description="분석 결과")
+    error: Optional[str] = Field(default=None, description="인식 실패 사유 (텍스트 인식 실패, 매칭 약물 없음 등)")
+
+
+class BatchScanAnalysisResponse(BaseModel):
+    """약 여러 장 일괄 스캔 분석 응답"""
+    items: List[BatchScanItem] = Field(..., description="이미지별 결과 (요청 순서)")
+    overallRiskScore: int = Field(..., ge=0, le=10, description="분석된 약 중 가장 높은 위험도 점수")
+    riskLevel: Literal["high", "medium", "low"] = Field(..., description="분석된 약 중 가장 높은 위험 등급")
+    analyzedCount: int = Field(..., description="분석된 이미지 수")
+    failedCount: int = Field(..., description="인식에 실패한 이미지 수")
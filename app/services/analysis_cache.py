@@ -0,0 +1,134 @@
+"""
+스캔 분석 결과 캐시
+
+같은 약을 다시 스캔하면, 복용 약/스케줄/지병이 그대로인 한 analyze_with_ai 결과는 (temperature 0.3) 사실상 같다.
+LLM 입력을 정규화한 해시를 키로 analysis_cache 테이블에 결과 JSON을 저장해 두고 TTL 동안 재사용한다.
+
+- 키: 스캔한 약 + 복용 약/스케줄 스냅샷 + 지병 + 프롬프트 버전 + 활성 DUR 인덱스 버전
+  (목록 순서, 지병 중복 등 결과에 영향 없는 차이는 정규화)
+- 저장/조회는 사용자별 (user_id + cache_key 유일) - 입력이 같은 다른 사용자의 항목을 덮어쓰지 않음
+- 무효화: 약/스케줄/지병 변경 시 해당 사용자 캐시 삭제 (키에도 스냅샷이 들어 있어 삭제 전에도 다른 키가 됨)
+- DUR 인덱스 버전이 바뀌면 키가 달라져 자연히 새로 분석
+"""
+import hashlib
+import json
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.analysis import AnalysisCache
+from app.services.rag_service import get_index_version
+
+settings = get_settings()
+
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "stores": 0}
+
+
+def _count(name: str) -> None:
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def _canonical_medicine(med: dict) -> dict:
+    med = dict(med)
+    if "schedules" in med:
+        med["schedules"] = sorted(
+            med["schedules"],
+            key=lambda s: json.dumps(s, sort_keys=True, ensure_ascii=False, default=str)
+        )
+    return med
+
+
+def analysis_cache_key(
+    scanned_med: dict,
+    user_medicines: List[dict],
+    medical_conditions: Optional[List[str]],
+    prompt_version: str,
+) -> str:
+    """LLM 입력을 정규화한 sha256 키"""
+    medicines = sorted(
+        (_canonical_medicine(med) for med in user_medicines),
+        key=lambda med: (med.get("id") or 0, med.get("name") or "")
+    )
+    payload = {
+        "prompt_version": prompt_version,
+        "dur_version": get_index_version()["version"],
+        "scanned": scanned_med,
+        "medicines": medicines,
+        "conditions": sorted({c.strip() for c in medical_conditions or [] if c and c.strip()}),
+    }
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+async def get_cached_analysis(db: AsyncSession, user_id: int, cache_key: str) -> Optional[Dict[str, Any]]:
+    """유효한 캐시 결과 (없거나 만료되면 None)"""
+    entry = await db.scalar(select(AnalysisCache).where(
+        AnalysisCache.cache_key == cache_key,
+        AnalysisCache.user_id == user_id,
+        AnalysisCache.expires_at > datetime.utcnow()
+    ).limit(1))
+
+    if entry is None:
+        _count("misses")
+        return None
+    _count("hits")
+    return json.loads(entry.result)
+
+
+async def save_analysis(
+    db: AsyncSession, user_id: int, cache_key: str, prompt_version: str, result: Dict[str, Any]
+) -> None:
+    """분석 결과 저장 (사용자의 같은 키 항목은 갱신, 사용자의 만료 항목 정리)"""
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=settings.analysis_cache_ttl_seconds)
+
+    await db.execute(delete(AnalysisCache).where(
+        AnalysisCache.user_id == user_id,
+        AnalysisCache.expires_at <= now,
+        AnalysisCache.cache_key != cache_key
+    ).execution_options(synchronize_session=False))
+
+    entry = await db.scalar(select(AnalysisCache).where(
+        AnalysisCache.user_id == user_id,
+        AnalysisCache.cache_key == cache_key
+    ).limit(1))
+    if entry is None:
+        entry = AnalysisCache(user_id=user_id, cache_key=cache_key)
+        db.add(entry)
+    entry.prompt_version = prompt_version
+    entry.result = json.dumps(result, ensure_ascii=False)
+    entry.created_at = now
+    entry.expires_at = expires_at
+
+    try:
+        await db.commit()
+        _count("stores")
+    except IntegrityError:
+        # 동시 요청이 같은 키를 먼저 저장한 경우
+        await db.rollback()
+
+
+async def invalidate_analysis_cache(db: AsyncSession, user_id: int) -> int:
+    """사용자의 분석 캐시 삭제 (호출 측 트랜잭션에서 함께 commit)"""
+    result = await db.execute(delete(AnalysisCache).where(
+        AnalysisCache.user_id == user_id
+    ).execution_options(synchronize_session=False))
+    return result.rowcount
+
+
+def get_analysis_cache_stats() -> Dict[str, Any]:
+    """히트율 통계 (프로세스 시작 이후)"""
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats["hits"] + stats["misses"]
+    stats["enabled"] = settings.analysis_cache_enabled
+    stats["ttl_seconds"] = settings.analysis_cache_ttl_seconds
+    stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+    return stats
@@ -0,0 +1,91 @@
+"""
+제한된 백그라운드 작업 실행기 (asyncio)
+
+응답에 꼭 필요하지 않은 LLM 호출(대화 제목 생성 등)을 요청 처리 경로 밖에서 실행한다.
+고정된 수의 워커 태스크가 크기 제한 큐에서 작업을 꺼내 실행하므로,
+새 세션이 몰려도 동시에 나가는 LLM 호출은 workers개를 넘지 않는다.
+큐가 가득 차면 작업을 버리고(dropped) 호출 측은 자리표시자 결과를 그대로 사용한다.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+class BackgroundWorker:
+    """크기 제한 큐 + 워커 태스크 N개 (첫 submit 시 현재 이벤트 루프에서 시작)"""
+
+    def __init__(self, name: str, workers: int = 2, queue_size: int = 100):
+        self.name = name
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._dropped = 0
+        self._running = 0
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._tasks:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [
+            loop.create_task(self._run(), name=f"{self.name}-{i}")
+            for i in range(self.workers)
+        ]
+
+    def submit(self, func: Callable[..., Awaitable[Any]], *args: Any) -> bool:
+        """작업 등록 (이벤트 루프 안에서 호출). 큐가 가득 차면 False"""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((func, args))
+        except asyncio.QueueFull:
+            self._dropped += 1
+            print(f"⚠️  {self.name}: 작업 큐가 가득 차 작업을 건너뜁니다 (대기 {self.queue_size}건)")
+            return False
+        self._submitted += 1
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            func, args = await self._queue.get()
+            self._running += 1
+            try:
+                await func(*args)
+                self._completed += 1
+            except Exception as e:
+                self._failed += 1
+                print(f"❌ {self.name} 작업 실패: {e}")
+            finally:
+                self._running -= 1
+                self._queue.task_done()
+
+    async def join(self) -> None:
+        """대기 중인 작업이 모두 끝날 때까지 대기 (테스트/종료용)"""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def stop(self) -> None:
+        """워커 종료 (대기 중인 작업은 버림 - 자리표시자 유지)"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        self._loop = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+            "running": self._running,
+            "submitted": self._submitted,
+            "completed": self._completed,
+            "failed": self._failed,
+            "dropped": self._dropped,
+        }
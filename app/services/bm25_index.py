@@ -0,0 +1,154 @@
+"""
+BM25 어휘(lexical) 인덱스
+
+DUR 문서 page_content에 대한 역색인. load_dur_data.py 적재 시 생성되어
+rag_service의 hybrid 검색 모드에서 벡터 검색 결과와 융합된다.
+
+성분명("아세트아미노펜", "acetaminophen")처럼 정확히 일치해야 하는 토큰은
+다국어 MiniLM 임베딩보다 어휘 검색이 훨씬 정확하다.
+"""
+import json
+import math
+import os
+import re
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+
+from langchain.schema import Document
+
+_WORD_PATTERN = re.compile(r"[0-9a-z]+|[가-힣]+")
+
+# 전체 문서의 이 비율 이상에 등장하는 쿼리 토큰은 무시 ("상세정보", "제품명" 같은 템플릿 단어)
+MAX_DF_RATIO = 0.3
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    토큰화: 영문/숫자 단어 + 한글 단어 + 한글 2-gram
+
+    한글은 형태소 분석기 없이 2-gram을 함께 색인하여
+    "타이레놀이랑" 같은 조사 결합형도 "타이레놀"과 매칭되도록 한다.
+    """
+    tokens = []
+    for word in _WORD_PATTERN.findall((text or "").lower()):
+        tokens.append(word)
+        if "가" <= word[0] <= "힣" and len(word) > 2:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+class BM25Index:
+    """Okapi BM25 역색인 (type 메타데이터 필터 지원)"""
+
+    def __init__(
+        self,
+        ids: List[str],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+        postings: Dict[str, List[List[int]]],
+        doc_lengths: List[int],
+        k1: float = 1.5,
+        b: float = 0.75,
+    ):
+        self.ids = ids
+        self.documents = documents
+        self.metadatas = metadatas
+        self.types = [metadata.get("type") for metadata in metadatas]
+        self.postings = postings  # term -> [[문서 번호, tf], ...]
+        self.doc_lengths = doc_lengths
+        self.avgdl = (sum(doc_lengths) / len(doc_lengths)) if doc_lengths else 0.0
+        self.k1 = k1
+        self.b = b
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]]) -> "BM25Index":
+        postings: Dict[str, List[List[int]]] = defaultdict(list)
+        doc_lengths = []
+
+        for doc_index, text in enumerate(documents):
+            tokens = tokenize(text)
+            doc_lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                postings[term].append([doc_index, tf])
+
+        return cls(ids, documents, metadatas, dict(postings), doc_lengths)
+
+    def save(self, path: Path) -> None:
+        """JSON으로 저장 (임시 파일 → rename)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "k1": self.k1,
+                "b": self.b,
+                "ids": self.ids,
+                "documents": self.documents,
+                "metadatas": self.metadatas,
+                "doc_lengths": self.doc_lengths,
+                "postings": self.postings,
+            }, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "BM25Index":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(
+            data["ids"],
+            data["documents"],
+            data["metadatas"],
+            data["postings"],
+            data["doc_lengths"],
+            k1=data.get("k1", 1.5),
+            b=data.get("b", 0.75),
+        )
+
+    def search(
+        self,
+        query: str,
+        k: int = 10,
+        filter: Optional[Dict[str, Any]] = None,
+    ) -> List[Tuple[int, float]]:
+        """(문서 번호, BM25 점수) top-k - 점수 내림차순"""
+        if filter:
+            unsupported = set(filter) - {"type"}
+            if unsupported:
+                raise ValueError(f"BM25Index는 type 필터만 지원합니다: {sorted(unsupported)}")
+        doc_type = filter.get("type") if filter else None
+
+        n_docs = len(self)
+        max_df = max(1, int(n_docs * MAX_DF_RATIO))
+        scores: Dict[int, float] = defaultdict(float)
+
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings or len(postings) > max_df:
+                continue
+
+            df = len(postings)
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            for doc_index, tf in postings:
+                if doc_type is not None and self.types[doc_index] != doc_type:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_index] / self.avgdl)
+                scores[doc_index] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        top = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return top[:k]
+
+    def to_document(self, doc_index: int) -> Document:
+        return Document(page_content=self.documents[doc_index], metadata=self.metadatas[doc_index])
+
+    def similarity_search(
+        self,
+        query: str,
+        k: int = 4,
+        filter: Optional[Dict[str, Any]] = None,
+        **kwargs,
+    ) -> List[Document]:
+        return [self.to_document(doc_index) for doc_index, _ in self.search(query, k=k, filter=filter)]
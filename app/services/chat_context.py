@@ -0,0 +1,149 @@
+"""
+토큰 예산 기반 챗봇 대화 컨텍스트
+
+최근 N개 메시지를 그대로 넣으면 긴 답변이 이어질 때 프롬프트가 커지고, 짧은 대화에서는 창을 낭비한다.
+로컬 토크나이저(tiktoken)로 메시지 토큰 수를 세어 최신 메시지부터 예산(chat_history_token_budget)까지만 넣고,
+예산 밖으로 밀려난 오래된 대화는 세션별 누적 요약(ChatSummary)에 접어 system 메시지 1개로 넣는다.
+
+요약 갱신은 응답 후 백그라운드에서 수행한다 (chat 라우트의 summary_worker).
+"""
+import threading
+from typing import List, Optional, Tuple
+
+from app.config import get_settings
+from app.services.llm_client import get_scheduled_llm_client
+from app.services.llm_metrics import track_llm_call
+
+settings = get_settings()
+
+# 메시지 1개당 형식 토큰 (role, 구분자) - OpenAI chat 포맷 기준
+MESSAGE_OVERHEAD_TOKENS = 4
+
+SUMMARY_PREFIX = "이전 대화 요약:\n"
+
+# 요약 프롬프트/파라미터를 바꾸면 올릴 것 (LLM 호출 집계에 포함)
+SUMMARY_PROMPT_VERSION = "1"
+
+SUMMARY_PROMPT = """다음은 AI 약사 필메이트와 사용자의 약물 상담 대화입니다.
+이전 요약과 이어지는 대화를 합쳐 하나의 요약으로 갱신하세요.
+
+요약 규칙:
+- 사용자가 언급한 약 이름, 성분, 증상, 복용 상황을 빠짐없이 유지
+- 필메이트가 안내한 복용법, 주의사항, 권고를 핵심만 유지
+- 인사말, 반복된 내용은 제외
+- 한국어 평서문, {max_tokens}토큰 이내
+
+이전 요약:
+{previous}
+
+이어지는 대화:
+{conversation}
+
+갱신된 요약:"""
+
+_encoding = None
+_encoding_failed = False
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    """gpt-4o 토크나이저 (tiktoken 미설치/인코딩 파일 다운로드 실패 시 None → 근사치 사용)"""
+    global _encoding, _encoding_failed
+    if _encoding is not None or _encoding_failed:
+        return _encoding
+    with _encoding_lock:
+        if _encoding is None and not _encoding_failed:
+            try:
+                import tiktoken
+                _encoding = tiktoken.encoding_for_model("gpt-4o")
+            except Exception as e:
+                print(f"⚠️  tiktoken을 사용할 수 없어 토큰 수를 근사합니다: {e}")
+                _encoding_failed = True
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """텍스트 토큰 수"""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    # 근사: 영문/숫자 약 4자당 1토큰, 한글 등 비ASCII 문자는 1자당 1토큰 (넉넉하게)
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return ascii_chars // 4 + 1 + (len(text) - ascii_chars)
+
+
+def message_tokens(message: dict) -> int:
+    return count_tokens(message.get("content") or "") + MESSAGE_OVERHEAD_TOKENS
+
+
+def summary_message(summary: str) -> dict:
+    """누적 요약을 대화 이력 맨 앞에 넣을 system 메시지"""
+    return {"role": "system", "content": SUMMARY_PREFIX + summary}
+
+
+def split_history(history: List[dict], budget: int) -> Tuple[List[dict], List[dict]]:
+    """
+    대화 이력을 (예산 밖의 오래된 메시지, 예산 안의 최근 메시지)로 분리
+
+    최신 메시지부터 토큰 수를 더해 budget을 넘기 직전까지 유지한다.
+    """
+    used = 0
+    start = len(history)
+    for i in range(len(history) - 1, -1, -1):
+        used += message_tokens(history[i])
+        if used > budget:
+            break
+        start = i
+    return history[:start], history[start:]
+
+
+def fit_history(chat_history: Optional[List[dict]], budget: Optional[int] = None) -> List[dict]:
+    """
+    프롬프트에 넣을 대화 이력 (앞쪽 요약 system 메시지 + 예산 안의 최근 메시지)
+
+    요약 메시지는 예산과 별도로 항상 유지한다 (요약 길이는 chat_summary_max_tokens로 제한).
+    """
+    if not chat_history:
+        return []
+    budget = settings.chat_history_token_budget if budget is None else budget
+
+    head = [msg for msg in chat_history[:1] if msg.get("role") == "system"]
+    _, recent = split_history(chat_history[len(head):], budget)
+    return head + recent
+
+
+def history_tokens(history: List[dict]) -> int:
+    return sum(message_tokens(msg) for msg in history)
+
+
+async def summarize_history(previous_summary: Optional[str], messages: List[dict]) -> str:
+    """이전 요약 + 오래된 메시지 → 갱신된 요약"""
+    conversation = "\n".join(
+        f"{'사용자' if msg['role'] == 'user' else '필메이트'}: {msg['content']}"
+        for msg in messages
+    )
+    prompt = SUMMARY_PROMPT.format(
+        max_tokens=settings.chat_summary_max_tokens,
+        previous=previous_summary or "(없음)",
+        conversation=conversation,
+    )
+
+    from app.services.llm_scheduler import Priority, estimate_request_tokens, get_llm_scheduler  # 순환 import 방지
+
+    client = get_scheduled_llm_client()
+    messages = [{"role": "user", "content": prompt}]
+    with track_llm_call("chat_summary", SUMMARY_PROMPT_VERSION) as call:
+        response = await get_llm_scheduler().run(
+            Priority.BACKGROUND,
+            lambda: client.chat.completions.create(
+                model=settings.chat_summary_model,
+                messages=messages,
+                temperature=0.2,
+                max_tokens=settings.chat_summary_max_tokens,
+            ),
+            estimate_request_tokens(messages, settings.chat_summary_max_tokens),
+        )
+        call.set_usage(response.model, response.usage)
+    return response.choices[0].message.content.strip()
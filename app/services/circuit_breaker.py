@@ -0,0 +1,198 @@
+"""
+외부 AI 의존성(OpenAI, Google Vision) 회로 차단기
+
+OpenAI나 Vision API가 느려지거나 실패하기 시작하면 모든 요청이 타임아웃까지 기다린 뒤에야 대체 경로로 가고,
+그동안 워커 스레드와 연결이 쌓인다. 연속 실패(오류 또는 느린 호출)가 임계값에 이르면 회로를 열어
+일정 시간 동안 호출하지 않고 바로 기존 대체 경로(Tesseract OCR, "약사와 상담" 기본 분석/채팅 응답)로 보낸다.
+
+- closed: 정상 호출, 실패/느린 호출이 circuit_breaker_failure_threshold회 연속이면 open
+- open: circuit_breaker_open_seconds 동안 즉시 거부 (CircuitOpenError 또는 allow() == False)
+- half_open: 시험 호출 1건만 허용 → 성공하면 closed, 실패하면 다시 open
+- 상태는 /metrics의 circuit_breakers
+"""
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from app.config import get_settings
+
+settings = get_settings()
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# 회로 이름
+LLM_BREAKER = "openai"
+VISION_BREAKER = "google_vision"
+
+
+class CircuitOpenError(Exception):
+    """회로가 열려 있어 호출하지 않음"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} 회로 차단 중 ({retry_after:.0f}초 후 재시도)")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """연속 실패 기반 회로 차단기 (스레드 안전 - 이벤트 루프/스레드풀 양쪽에서 사용)"""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        open_seconds: float = 30.0,
+        slow_call_seconds: Optional[float] = None,
+        enabled: bool = True,
+    ):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.open_seconds = open_seconds
+        self.slow_call_seconds = slow_call_seconds  # 이보다 오래 걸린 성공도 실패로 집계 (None: 지연 무시)
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_started_at: Optional[float] = None
+
+        self._calls = 0
+        self._failures = 0
+        self._slow_calls = 0
+        self._rejected = 0
+        self._opened = 0
+        self._last_failure: Optional[str] = None
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def _current_state(self, now: float) -> str:
+        if self._state == OPEN and now - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._probe_started_at = None
+        return self._state
+
+    def _open(self, now: float) -> None:
+        if self._state != OPEN:
+            self._opened += 1
+            print(f"⚠️  {self.name} 회로 열림 - {self.open_seconds:.0f}초 동안 대체 경로 사용 (최근 실패: {self._last_failure})")
+        self._state = OPEN
+        self._opened_at = now
+        self._probe_started_at = None
+
+    def retry_after(self) -> float:
+        with self._lock:
+            if self._state != OPEN:
+                return 0.0
+            return max(self.open_seconds - (time.monotonic() - self._opened_at), 0.0)
+
+    def allow(self) -> bool:
+        """호출해도 되는지 (허용된 호출은 반드시 record_success/record_failure/release 중 하나로 끝낼 것)"""
+        if not self.enabled:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            state = self._current_state(now)
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN:
+                # 시험 호출은 1건만 (결과 없이 오래 걸리면 새 시험 호출 허용)
+                if self._probe_started_at is None or now - self._probe_started_at >= self.open_seconds:
+                    self._probe_started_at = now
+                    return True
+            self._rejected += 1
+            return False
+
+    def check(self) -> None:
+        """allow()가 False이면 CircuitOpenError"""
+        if not self.allow():
+            raise CircuitOpenError(self.name, self.retry_after())
+
+    def record_success(self, elapsed: Optional[float] = None) -> None:
+        """응답 수신 (elapsed가 slow_call_seconds보다 길면 실패로 집계)"""
+        if not self.enabled:
+            return
+        if elapsed is not None and self.slow_call_seconds and elapsed > self.slow_call_seconds:
+            with self._lock:
+                self._slow_calls += 1
+            self.record_failure(f"느린 응답 {elapsed:.1f}초")
+            return
+        with self._lock:
+            self._calls += 1
+            self._consecutive_failures = 0
+            if self._state != CLOSED:
+                print(f"✅ {self.name} 회로 닫힘 - 정상 호출 재개")
+            self._state = CLOSED
+            self._probe_started_at = None
+
+    def record_failure(self, reason: str = "") -> None:
+        """호출 실패 (연결 오류, 타임아웃, 5xx, 느린 응답)"""
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._calls += 1
+            self._failures += 1
+            self._consecutive_failures += 1
+            self._last_failure = reason or None
+            state = self._current_state(now)
+            # 이미 open이면 (열리기 전에 시작한 호출의 실패) 열린 시간을 늘리지 않음
+            if state == HALF_OPEN or (state == CLOSED and self._consecutive_failures >= self.failure_threshold):
+                self._open(now)
+
+    def release(self) -> None:
+        """결과를 판단할 수 없이 끝난 호출 (취소 등) - 시험 호출이었다면 다음 시험 호출 허용"""
+        with self._lock:
+            self._probe_started_at = None
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            state = self._current_state(now)
+            return {
+                "enabled": self.enabled,
+                "state": state,
+                "consecutive_failures": self._consecutive_failures,
+                "failure_threshold": self.failure_threshold,
+                "slow_call_seconds": self.slow_call_seconds,
+                "open_remaining_seconds": round(max(self.open_seconds - (now - self._opened_at), 0.0), 1) if state == OPEN else 0.0,
+                "calls": self._calls,
+                "failures": self._failures,
+                "slow_calls": self._slow_calls,
+                "rejected": self._rejected,
+                "opened": self._opened,
+                "last_failure": self._last_failure,
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+_SLOW_CALL_SECONDS = {
+    LLM_BREAKER: settings.llm_slow_call_seconds,
+    VISION_BREAKER: settings.vision_slow_call_seconds,
+}
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """이름별 회로 차단기 (프로세스 전역)"""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(
+                name,
+                failure_threshold=settings.circuit_breaker_failure_threshold,
+                open_seconds=settings.circuit_breaker_open_seconds,
+                slow_call_seconds=_SLOW_CALL_SECONDS.get(name) or None,
+                enabled=settings.circuit_breaker_enabled,
+            )
+        return breaker
+
+
+def get_circuit_breaker_stats() -> Dict[str, Any]:
+    return {name: get_circuit_breaker(name).stats() for name in (LLM_BREAKER, VISION_BREAKER)}
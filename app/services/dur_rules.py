@@ -0,0 +1,137 @@
+"""
+DUR 규칙 테이블 (정확 조회)
+
+벡터/BM25 검색은 "관련 있어 보이는" DUR 문서를 찾지만, 두 성분이 병용금기인지는 확정하지 못한다.
+load_dur_data.py가 적재한 컬렉션의 메타데이터를 정규 성분 ID(성분 정규화 사전) 기준으로 다시 묶어
+버전별 rules.json으로 저장하고, 규칙 기반 분석(rule_analysis)이 dict 조회만으로 판정한다.
+
+- contraindications: "성분ID A\\t성분ID B"(정렬) → 상세정보 목록
+  (A == B: 병용금기인 두 성분이 정규화로 합쳐진 경우 - 규칙 기반 판정에서 제외하고 LLM 사용)
+- restrictions: 종류(age/pregnancy/elderly) → 성분 ID → 상세정보 목록
+"""
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.services.dur_versions import ActiveVersionWatcher
+from app.services.ingredient_normalizer import IngredientTable, split_ingredients
+
+# 문서 type → 제한 종류
+RESTRICTION_TYPES = {
+    "age_contraindication": "age",
+    "pregnancy_contraindication": "pregnancy",
+    "elderly_caution": "elderly",
+}
+RESTRICTION_LABELS = {"age": "연령금기", "pregnancy": "임부금기", "elderly": "노인주의"}
+
+# 성분(쌍)당 보관할 상세정보 수
+MAX_DETAILS = 3
+
+
+def _pair_key(a: str, b: str) -> str:
+    return "\t".join(sorted((a, b)))
+
+
+def _add_detail(details: List[str], detail: str) -> None:
+    detail = " ".join((detail or "").split())
+    if detail and detail not in details and len(details) < MAX_DETAILS:
+        details.append(detail)
+
+
+class DurRuleTable:
+    """정규 성분 ID 기준 병용금기 쌍 / 성분별 사용 제한"""
+
+    def __init__(self, contraindications: Dict[str, List[str]], restrictions: Dict[str, Dict[str, List[str]]]):
+        self.contraindications = contraindications
+        self.restrictions = restrictions
+
+    def __len__(self) -> int:
+        return len(self.contraindications) + sum(len(ids) for ids in self.restrictions.values())
+
+    @classmethod
+    def build(cls, metadatas: Iterable[Dict[str, Any]], table: IngredientTable) -> "DurRuleTable":
+        """DUR 문서 메타데이터 → 규칙 테이블"""
+        def ids(names: str) -> List[str]:
+            return [ingredient_id for ingredient_id in (table.normalize(name) for name in split_ingredients(names)) if ingredient_id]
+
+        contraindications: Dict[str, List[str]] = {}
+        restrictions: Dict[str, Dict[str, List[str]]] = {kind: {} for kind in RESTRICTION_TYPES.values()}
+
+        for meta in metadatas:
+            doc_type = meta.get("type")
+            if doc_type == "contraindication":
+                for a in ids(meta.get("drug_a") or ""):
+                    for b in ids(meta.get("drug_b") or ""):
+                        # a == b: 서로 다른 DUR 성분이 같은 ID로 합쳐진 경우 → 버리지 않고 자기 쌍으로 기록 (is_ambiguous)
+                        _add_detail(contraindications.setdefault(_pair_key(a, b), []), meta.get("detail") or "병용금기")
+            elif doc_type in RESTRICTION_TYPES:
+                kind = RESTRICTION_TYPES[doc_type]
+                detail = meta.get("detail") or RESTRICTION_LABELS[kind]
+                if kind == "age" and meta.get("age_restriction"):
+                    detail = f"{meta['age_restriction']}: {detail}"
+                for ingredient_id in ids(meta.get("drug") or ""):
+                    _add_detail(restrictions[kind].setdefault(ingredient_id, []), detail)
+
+        return cls(contraindications, restrictions)
+
+    def contraindication(self, a: str, b: str) -> Optional[List[str]]:
+        """두 성분 ID가 병용금기이면 상세정보 목록"""
+        return self.contraindications.get(_pair_key(a, b))
+
+    def is_ambiguous(self, ingredient_id: str) -> bool:
+        """병용금기인 서로 다른 DUR 성분이 이 ID 하나로 합쳐졌는지 (규칙으로 판정 불가)"""
+        return _pair_key(ingredient_id, ingredient_id) in self.contraindications
+
+    def restrictions_for(self, ingredient_id: str) -> Dict[str, List[str]]:
+        """성분 ID의 사용 제한 (종류 → 상세정보 목록)"""
+        return {
+            kind: by_id[ingredient_id]
+            for kind, by_id in self.restrictions.items()
+            if ingredient_id in by_id
+        }
+
+    def save(self, path: Path) -> None:
+        """JSON으로 저장 (임시 파일 → rename)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"contraindications": self.contraindications, "restrictions": self.restrictions}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "DurRuleTable":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["contraindications"], data["restrictions"])
+
+
+# ============================================================
+# 활성 DUR 버전의 규칙 테이블
+# ============================================================
+
+_rules_lock = threading.Lock()
+_version_watcher = ActiveVersionWatcher()
+_rules: Optional[DurRuleTable] = None
+_rules_version = None
+
+
+def get_dur_rules() -> Optional[DurRuleTable]:
+    """활성 DUR 버전의 규칙 테이블 (버전이 바뀌면 다시 로드, 파일이 없으면 None → 규칙 기반 판정 불가)"""
+    global _rules, _rules_version
+    version = _version_watcher.current()
+    if _rules_version == version:
+        return _rules
+
+    with _rules_lock:
+        if _rules_version != version:
+            path = version.dur_rules_path
+            if path.exists():
+                _rules = DurRuleTable.load(path)
+            else:
+                print(f"⚠️  DUR 규칙 테이블이 없어 규칙 기반 분석을 사용하지 않습니다: {path}")
+                _rules = None
+            _rules_version = version
+    return _rules
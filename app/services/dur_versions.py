@@ -0,0 +1,128 @@
+"""
+DUR 인덱스 버전 관리 (blue/green)
+
+load_dur_data.py는 매 적재마다 새 버전(dur_safety_v{N} 컬렉션 + 버전별 NumPy/BM25 인덱스 + 성분 사전 + DUR 규칙 테이블)을
+서비스와 무관하게 만든 뒤, "활성 버전" 포인터 파일을 원자적으로 교체한다.
+rag_service는 포인터 파일의 수정 시각만 주기적으로 확인(stat 1회)하여 바뀌면 새 버전을 연다.
+
+포인터 파일이 없으면 버전 도입 이전의 단일 컬렉션(dur_safety)과 기존 경로를 사용한다.
+"""
+import json
+import os
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+DATA_DIR = Path(__file__).parent.parent.parent / "data"
+
+# ChromaDB 경로
+CHROMA_DB_PATH = DATA_DIR / "chroma_db"
+
+# NumPy 인덱스 경로 (vectors.npy + metadata.json)
+NUMPY_INDEX_PATH = DATA_DIR / "dur_index"
+
+# BM25 인덱스 경로
+BM25_INDEX_PATH = DATA_DIR / "dur_bm25" / "bm25.json"
+
+# 성분 정규화 사전 경로 (표기 → 정규 성분 ID)
+INGREDIENT_TABLE_PATH = DATA_DIR / "dur_ingredients" / "ingredients.json"
+
+# DUR 규칙 테이블 경로 (정규 성분 ID 기준 병용금기 쌍 / 연령·임부·노인 주의 성분)
+DUR_RULES_PATH = DATA_DIR / "dur_rules" / "rules.json"
+
+# 컬렉션 이름 접두어 (버전 컬렉션: dur_safety_v{N})
+COLLECTION_PREFIX = "dur_safety"
+
+# 활성 버전 포인터
+ACTIVE_VERSION_PATH = CHROMA_DB_PATH / "active_version.json"
+
+_VERSIONED_COLLECTION = re.compile(rf"^{COLLECTION_PREFIX}_v(\d+)$")
+
+
+class DurIndexVersion(NamedTuple):
+    """DUR 인덱스 버전 (version=None: 버전 도입 이전 단일 컬렉션)"""
+    version: Optional[int] = None
+
+    @property
+    def collection_name(self) -> str:
+        if self.version is None:
+            return COLLECTION_PREFIX
+        return f"{COLLECTION_PREFIX}_v{self.version}"
+
+    @property
+    def numpy_index_path(self) -> Path:
+        if self.version is None:
+            return NUMPY_INDEX_PATH
+        return NUMPY_INDEX_PATH / f"v{self.version}"
+
+    @property
+    def bm25_index_path(self) -> Path:
+        if self.version is None:
+            return BM25_INDEX_PATH
+        return BM25_INDEX_PATH.parent / f"v{self.version}" / BM25_INDEX_PATH.name
+
+    @property
+    def ingredient_table_path(self) -> Path:
+        if self.version is None:
+            return INGREDIENT_TABLE_PATH
+        return INGREDIENT_TABLE_PATH.parent / f"v{self.version}" / INGREDIENT_TABLE_PATH.name
+
+    @property
+    def dur_rules_path(self) -> Path:
+        if self.version is None:
+            return DUR_RULES_PATH
+        return DUR_RULES_PATH.parent / f"v{self.version}" / DUR_RULES_PATH.name
+
+
+def parse_collection_version(collection_name: str) -> Optional[int]:
+    """컬렉션 이름에서 버전 번호 추출 (버전 컬렉션이 아니면 None)"""
+    match = _VERSIONED_COLLECTION.match(collection_name)
+    return int(match.group(1)) if match else None
+
+
+def read_active_version(path: Path = ACTIVE_VERSION_PATH) -> DurIndexVersion:
+    """활성 버전 포인터 읽기 (없으면 버전 도입 이전 단일 컬렉션)"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return DurIndexVersion(int(json.load(f)["version"]))
+    except FileNotFoundError:
+        return DurIndexVersion()
+
+
+def write_active_version(version: int, path: Path = ACTIVE_VERSION_PATH) -> None:
+    """활성 버전 포인터 교체 (임시 파일 → rename으로 원자적 교체)"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "version": version,
+            "collection": DurIndexVersion(version).collection_name,
+            "activated_at": datetime.now().isoformat(timespec="seconds"),
+        }, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+class ActiveVersionWatcher:
+    """활성 버전 포인터 감시 - interval초마다 최대 1회 stat, 수정 시각이 바뀐 경우에만 다시 읽음"""
+
+    def __init__(self, path: Path = ACTIVE_VERSION_PATH, interval: float = 1.0):
+        self.path = path
+        self.interval = interval
+        self._next_check = 0.0
+        self._mtime_ns: Optional[int] = None
+        self._version = DurIndexVersion()
+
+    def current(self) -> DurIndexVersion:
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + self.interval
+            try:
+                mtime_ns = os.stat(self.path).st_mtime_ns
+            except FileNotFoundError:
+                mtime_ns = None
+            if mtime_ns != self._mtime_ns:
+                self._mtime_ns = mtime_ns
+                self._version = read_active_version(self.path)
+        return self._version
@@ -0,0 +1,135 @@
+"""
+임베딩 마이크로 배치 스케줄러
+
+동시에 들어온 쿼리 임베딩 요청을 잠깐(max_wait_ms) 모았다가 embed_documents 1회로 처리한다.
+CPU에서는 10건을 한 번에 임베딩하는 것이 1건씩 10번 하는 것보다 훨씬 싸다.
+
+rag_service(in-process, RAG_EMBED_BATCHING=true)와 retrieval_server(사이드카)가 함께 사용한다.
+"""
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from typing import List, Dict, Any, Callable
+
+# 배치 크기 히스토그램 구간 상한 (마지막 구간은 그 이상 전부)
+HISTOGRAM_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+
+
+def _bucket_label(size: int) -> str:
+    lower = 1
+    for upper in HISTOGRAM_BUCKETS:
+        if size <= upper:
+            return str(upper) if lower == upper else f"{lower}-{upper}"
+        lower = upper + 1
+    return f"{lower}+"
+
+
+BUCKET_LABELS = [_bucket_label(upper) for upper in HISTOGRAM_BUCKETS] + [_bucket_label(HISTOGRAM_BUCKETS[-1] + 1)]
+
+
+class EmbeddingScheduler:
+    """
+    여러 스레드의 임베딩 요청을 모아 embed_documents 1회로 처리
+
+    첫 요청이 도착한 뒤 max_wait_ms 동안(또는 max_batch_size개가 모일 때까지) 기다렸다가
+    한 번에 임베딩하고 각 요청의 Future를 완료한다.
+    """
+
+    def __init__(
+        self,
+        embed_documents: Callable[[List[str]], List[List[float]]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+    ):
+        self._embed_documents = embed_documents
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: "queue.Queue[tuple[List[str], Future]]" = queue.Queue()
+
+        self._stats_lock = threading.Lock()
+        self._batch_sizes: Counter = Counter()
+        self._requests = 0
+        self._texts = 0
+        self._errors = 0
+        self._embed_seconds = 0.0
+
+        self._thread = threading.Thread(target=self._run, name="embedding-scheduler", daemon=True)
+        self._thread.start()
+
+    def submit(self, texts: List[str]) -> Future:
+        future = Future()
+        self._queue.put((texts, future))
+        return future
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.submit(texts).result()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """배치 크기 히스토그램 및 누적 통계"""
+        with self._stats_lock:
+            batches = sum(self._batch_sizes.values())
+            histogram = Counter()
+            for size, count in self._batch_sizes.items():
+                histogram[_bucket_label(size)] += count
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "queue_depth": self._queue.qsize(),
+                "requests": self._requests,
+                "texts": self._texts,
+                "batches": batches,
+                "errors": self._errors,
+                "mean_batch_size": round(self._texts / batches, 2) if batches else 0.0,
+                "mean_embed_ms": round(self._embed_seconds / batches * 1000, 2) if batches else 0.0,
+                "batch_size_histogram": {label: histogram[label] for label in BUCKET_LABELS},
+            }
+
+    def _collect(self) -> list:
+        items = [self._queue.get()]
+        n_texts = len(items[0][0])
+        deadline = time.monotonic() + self.max_wait
+
+        while n_texts < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            items.append(item)
+            n_texts += len(item[0])
+
+        return items
+
+    def _run(self) -> None:
+        while True:
+            items = self._collect()
+            texts = [text for item_texts, _ in items for text in item_texts]
+
+            started = time.perf_counter()
+            try:
+                vectors = self._embed_documents(texts)
+            except Exception as e:
+                with self._stats_lock:
+                    self._errors += 1
+                for _, future in items:
+                    future.set_exception(e)
+                continue
+            elapsed = time.perf_counter() - started
+
+            with self._stats_lock:
+                self._batch_sizes[len(texts)] += 1
+                self._requests += len(items)
+                self._texts += len(texts)
+                self._embed_seconds += elapsed
+
+            offset = 0
+            for item_texts, future in items:
+                future.set_result(vectors[offset:offset + len(item_texts)])
+                offset += len(item_texts)
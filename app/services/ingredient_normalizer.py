@@ -0,0 +1,287 @@
+"""
+성분명 정규화 사전
+
+AI Hub dl_material("아세트아미노펜|카페인무수물"), 사용자가 입력한 Medicine.ingredient,
+DUR 성분명 컬럼은 같은 성분을 서로 다르게 표기한다 (한글/영문, 염 형태, "|" 구분 목록).
+
+load_dur_data.py가 적재 시 DUR CSV + AI Hub 데이터로 "표기 → 정규 성분 ID" 사전을 만들어
+DUR 인덱스 버전별로 저장하고, RAG 검색 / 성분 중복 판정 / 분석 코드가 같은 normalize 함수를 사용한다.
+
+- 표기 정리(clean_ingredient): 소문자, 괄호 내용/공백/기호 제거, 수화물 제거,
+  염 접미어 제거 (남는 부분이 알려진 활성 성분 어간일 때만 - 염화칼륨/탄산칼슘은 그대로)
+- 사전 조회: 정리된 표기 → 정규 성분 ID (사전에 없으면 정리된 표기 자체를 ID로 사용)
+- 대표 표기(display_name): DUR 문서에 쓰인 표기 → 검색 쿼리에 넣으면 BM25 정확 일치 + 짧은 벡터 쿼리
+"""
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+from app.services.dur_versions import ActiveVersionWatcher
+
+# 성분 목록 구분자 (AI Hub는 "|", 사용자 입력은 ","나 "+"도 사용)
+_SEPARATORS = re.compile(r"[|,/+;·]")
+_PARENTHESES = re.compile(r"\([^)]*\)|\[[^\]]*\]")
+_WORD_PATTERN = re.compile(r"[0-9a-z]+|[가-힣]+")
+
+# 수화물 표기 (같은 성분의 다른 형태 → 항상 제거)
+HYDRATE_WORDS_EN = frozenset({
+    "hydrate", "monohydrate", "dihydrate", "trihydrate", "sesquihydrate", "anhydrous",
+})
+HYDRATE_SUFFIXES_KO = ("일수화물", "이수화물", "삼수화물", "수화물", "무수물")
+
+# 염 표기 (양이온/짝이온) → 남는 부분이 알려진 활성 성분 어간일 때만 제거
+# (염화칼륨/염화나트륨, Magnesium Oxide처럼 염 자체가 성분인 경우 음이온만 남지 않도록)
+SALT_WORDS_EN = frozenset({
+    "hydrochloride", "hcl", "sodium", "potassium", "calcium", "magnesium",
+    "maleate", "mesylate", "besylate", "tartrate", "bitartrate", "hydrobromide",
+    "fumarate", "citrate", "phosphate", "acetate", "succinate", "sulfate", "nitrate",
+})
+SALT_SUFFIXES_KO = (
+    "염산염", "황산염", "인산염", "질산염", "아세트산염", "시트르산염", "숙신산염",
+    "말레산염", "메실산염", "베실산염", "타르타르산염", "푸마르산염", "브롬화수소산염",
+    "나트륨", "칼륨", "칼슘", "마그네슘",
+)
+
+# 염 형태로 흔히 쓰이는 활성 성분 어간 (INN 어간, 끝부분 일치)
+ACTIVE_STEMS_EN = (
+    "mycin", "micin", "cillin", "floxacin", "cycline", "azole", "pril", "sartan", "olol", "alol",
+    "dipine", "tidine", "statin", "profen", "proxen", "fenac", "coxib", "lukast", "semide",
+    "thiazide", "triptan", "setron", "tinib", "gliptin", "gliflozin", "formin", "parin",
+    "dronate", "azepam", "zolam", "oxetine", "pramine", "triptyline", "peridol", "apine", "idone",
+)
+# 한글은 "졸"/"롤" 한 글자만으로는 이미다졸/글리세롤 같은 비활성 성분까지 걸리므로 계열별 어미로 한정
+ACTIVE_STEMS_KO = (
+    "마이신", "미신", "실린", "플록사신", "사이클린", "프릴", "사르탄",
+    "프라졸", "코나졸", "니다졸", "벤다졸", "놀롤", "프롤롤", "탈롤", "딜롤", "볼롤", "몰롤",
+    "디핀", "티딘", "스타틴", "프로펜", "프록센", "페낙", "콕시브", "루카스트", "세미드",
+    "티아지드", "트립탄", "세트론", "티닙", "글립틴", "글리플로진", "포르민", "파린",
+    "드로네이트", "아제팜", "졸람", "옥세틴", "프라민", "트립틸린", "페리돌", "아핀", "리돈",
+)
+
+# 사용자 입력/화면 표시용 자리표시자 (성분이 아님)
+PLACEHOLDERS = frozenset({"", "정보 없음", "성분 미상", "n/a", "none", "-"})
+
+
+def _is_active_moiety(text: str) -> bool:
+    """염 표기를 뗀 나머지가 알려진 활성 성분인지 (염화/탄산/chloride 같은 음이온만 남으면 False)"""
+    return text.endswith(ACTIVE_STEMS_EN) or text.endswith(ACTIVE_STEMS_KO)
+
+
+def _strip_suffixes(word: str, suffixes: tuple, moiety_only: bool = False) -> str:
+    """한글 접미어 반복 제거 (2글자 이상 남는 경우에만, moiety_only면 활성 성분 어간이 남는 경우에만)"""
+    stripped = True
+    while stripped:
+        stripped = False
+        for suffix in suffixes:
+            if not word.endswith(suffix) or len(word) - len(suffix) < 2:
+                continue
+            rest = word[:-len(suffix)]
+            if moiety_only and not _is_active_moiety(rest):
+                continue
+            word = rest
+            stripped = True
+            break
+    return word
+
+
+@lru_cache(maxsize=8192)
+def clean_ingredient(name: str) -> str:
+    """
+    성분 표기 정리 (사전 키)
+
+    예: "Loxoprofen Sodium Hydrate" → "loxoprofen", "록소프로펜나트륨수화물" → "록소프로펜",
+        "염화칼륨" → "염화칼륨", "Potassium Chloride" → "potassiumchloride" (염 자체가 성분이면 유지)
+    """
+    text = unicodedata.normalize("NFKC", name or "").lower()
+    text = _PARENTHESES.sub(" ", text)
+    words = _WORD_PATTERN.findall(text)
+
+    # 수화물 제거 (성분 단어가 남는 경우에만)
+    kept = [word for word in words if word not in HYDRATE_WORDS_EN and word not in HYDRATE_SUFFIXES_KO]
+    if kept:
+        words = kept
+    words = [_strip_suffixes(word, HYDRATE_SUFFIXES_KO) for word in words]
+
+    # 염 단어 제거 (남는 부분이 활성 성분 어간인 경우에만)
+    kept = [word for word in words if word not in SALT_WORDS_EN and word not in SALT_SUFFIXES_KO]
+    if kept and len(kept) < len(words) and _is_active_moiety("".join(kept)):
+        words = kept
+    words = [_strip_suffixes(word, SALT_SUFFIXES_KO, moiety_only=True) for word in words]
+
+    return "".join(words)
+
+
+def split_ingredients(text: str) -> List[str]:
+    """성분 목록 문자열 분리 ("A|B", "A, B", "A+B")"""
+    return [
+        part.strip()
+        for part in _SEPARATORS.split(text or "")
+        if part.strip().lower() not in PLACEHOLDERS
+    ]
+
+
+class IngredientTable:
+    """정리된 표기 → 정규 성분 ID 사전"""
+
+    def __init__(self, aliases: Dict[str, str], names: Dict[str, str]):
+        self.aliases = aliases  # clean_ingredient(표기) → 성분 ID
+        self.names = names  # 성분 ID → 대표 표기
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def normalize(self, name: str) -> str:
+        key = clean_ingredient(name)
+        return self.aliases.get(key, key)
+
+    def display_name(self, ingredient_id: str) -> str:
+        return self.names.get(ingredient_id, ingredient_id)
+
+    def save(self, path: Path) -> None:
+        """JSON으로 저장 (임시 파일 → rename)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"aliases": self.aliases, "names": self.names}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "IngredientTable":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["aliases"], data["names"])
+
+
+class IngredientTableBuilder:
+    """
+    표기 간 동일 성분 관계를 모아 IngredientTable 생성 (union-find)
+
+    - add(표기, preferred): 표기 등록 (preferred=True: DUR 문서에 쓰인 표기 → 대표 표기 후보)
+    - link(a, b): 같은 성분으로 연결 (한글↔영문, 같은 성분코드)
+    """
+
+    def __init__(self):
+        self._parent: Dict[str, str] = {}
+        self._spellings: Dict[str, Counter] = {}  # 키 → 원래 표기 빈도
+        self._preferred: Dict[str, Counter] = {}
+
+    def _find(self, key: str) -> str:
+        parent = self._parent.setdefault(key, key)
+        if parent != key:
+            parent = self._parent[key] = self._find(parent)
+        return parent
+
+    def add(self, name: str, preferred: bool = False) -> Optional[str]:
+        key = clean_ingredient(name)
+        if not key:
+            return None
+        self._find(key)
+        spelling = " ".join(name.split())
+        self._spellings.setdefault(key, Counter())[spelling] += 1
+        if preferred:
+            self._preferred.setdefault(key, Counter())[spelling] += 1
+        return key
+
+    def link(self, a: Optional[str], b: Optional[str]) -> None:
+        """두 키(add 반환값 또는 "code:..." 같은 연결용 키)를 같은 성분으로 연결"""
+        if not a or not b:
+            return
+        root_a, root_b = self._find(a), self._find(b)
+        if root_a != root_b:
+            self._parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    def build(self) -> IngredientTable:
+        groups: Dict[str, List[str]] = {}
+        for key in self._parent:
+            groups.setdefault(self._find(key), []).append(key)
+
+        aliases, names = {}, {}
+        for keys in groups.values():
+            keys = [key for key in keys if key in self._spellings]  # 연결용 키(성분코드 등) 제외
+            if not keys:
+                continue
+
+            # 성분 ID: 영문 표기 우선 (짧은 것 → 사전순), 없으면 한글 표기
+            ascii_keys = [key for key in keys if key.isascii()]
+            ingredient_id = min(ascii_keys or keys, key=lambda key: (len(key), key))
+
+            # 대표 표기: DUR 문서에 가장 많이 쓰인 표기, 없으면 가장 많이 쓰인 표기
+            preferred, spellings = Counter(), Counter()
+            for key in keys:
+                preferred.update(self._preferred.get(key, {}))
+                spellings.update(self._spellings[key])
+            names[ingredient_id] = (preferred or spellings).most_common(1)[0][0]
+
+            for key in keys:
+                aliases[key] = ingredient_id
+
+        return IngredientTable(aliases, names)
+
+
+# ============================================================
+# 공유 정규화 함수 (활성 DUR 버전의 사전 사용)
+# ============================================================
+
+_table_lock = threading.Lock()
+_version_watcher = ActiveVersionWatcher()
+_table: Optional[IngredientTable] = None
+_table_version = None
+
+
+def get_ingredient_table() -> IngredientTable:
+    """활성 DUR 버전의 성분 사전 (버전이 바뀌면 다시 로드, 사전 파일이 없으면 빈 사전)"""
+    global _table, _table_version
+    version = _version_watcher.current()
+    if _table is not None and _table_version == version:
+        return _table
+
+    with _table_lock:
+        if _table is None or _table_version != version:
+            path = version.ingredient_table_path
+            if path.exists():
+                _table = IngredientTable.load(path)
+            else:
+                print(f"⚠️  성분 정규화 사전이 없어 표기 정리만 사용합니다: {path}")
+                _table = IngredientTable({}, {})
+            _table_version = version
+    return _table
+
+
+def normalize_ingredient(name: str) -> str:
+    """성분 표기 1개 → 정규 성분 ID"""
+    return get_ingredient_table().normalize(name)
+
+
+def normalize_ingredients(names: Union[str, Iterable[str]]) -> List[str]:
+    """성분 목록(문자열 또는 리스트, "|" 구분 포함) → 중복 제거된 정규 성분 ID 목록 (순서 유지)"""
+    if isinstance(names, str):
+        names = [names]
+
+    table = get_ingredient_table()
+    ids: Dict[str, None] = {}
+    for text in names:
+        for part in split_ingredients(text):
+            ingredient_id = table.normalize(part)
+            if ingredient_id:
+                ids[ingredient_id] = None
+    return list(ids)
+
+
+def ingredient_query_names(names: Union[str, Iterable[str]]) -> List[str]:
+    """검색 쿼리용 성분명: 정규화 후 DUR 대표 표기로 변환 (중복/염 표기 제거)"""
+    table = get_ingredient_table()
+    return [table.display_name(ingredient_id) for ingredient_id in normalize_ingredients(names)]
+
+
+def shared_ingredients(a: Union[str, Iterable[str]], b: Union[str, Iterable[str]]) -> List[str]:
+    """두 약의 공통 성분 (대표 표기) - 성분 중복 판정용"""
+    table = get_ingredient_table()
+    b_ids = set(normalize_ingredients(b))
+    return [table.display_name(ingredient_id) for ingredient_id in normalize_ingredients(a) if ingredient_id in b_ids]
@@ -0,0 +1,79 @@
+"""
+OpenAI 비동기 클라이언트 (싱글톤)
+
+요청마다 동기 OpenAI(...) 클라이언트를 만들면 완료(수 초) 동안 이벤트 루프가 멈추고
+매번 HTTP 연결 풀을 새로 만든다. 앱 시작 시 AsyncOpenAI 1개를 만들어 모든 LLM 호출이 await로 공유한다.
+
+- 연결 풀: settings.openai_max_connections / openai_max_keepalive_connections (keep-alive 재사용)
+- 타임아웃: 연결 openai_connect_timeout_seconds, 전체 openai_timeout_seconds
+- 재시도: openai_max_retries (SDK 기본 정책 - 연결 오류/408/409/429/5xx에 지수 백오프)
+  LLMScheduler.run/slot으로 실행하는 호출은 get_scheduled_llm_client (SDK 재시도 없음 - 재시도는 스케줄러가 담당)
+- 주소: openai_base_url (비우면 공식 API, 부하 테스트 시 scripts/openai_stub_server.py)
+"""
+from typing import Optional
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+from app.config import get_settings
+
+settings = get_settings()
+
+_client: Optional[AsyncOpenAI] = None
+_scheduled_client: Optional[AsyncOpenAI] = None
+
+
+def create_llm_client() -> AsyncOpenAI:
+    """설정값으로 튜닝된 httpx 연결 풀을 가진 AsyncOpenAI 생성"""
+    http_client = DefaultAsyncHttpxClient(
+        limits=httpx.Limits(
+            max_connections=settings.openai_max_connections,
+            max_keepalive_connections=settings.openai_max_keepalive_connections,
+            keepalive_expiry=settings.openai_keepalive_expiry_seconds,
+        ),
+        timeout=httpx.Timeout(
+            settings.openai_timeout_seconds,
+            connect=settings.openai_connect_timeout_seconds,
+        ),
+    )
+    return AsyncOpenAI(
+        api_key=settings.openai_api_key,
+        base_url=settings.openai_base_url or None,
+        max_retries=settings.openai_max_retries,
+        http_client=http_client,
+    )
+
+
+def get_llm_client() -> AsyncOpenAI:
+    """공유 AsyncOpenAI 클라이언트 (앱 시작 전 호출되면 그 자리에서 생성 - 스크립트/테스트용)"""
+    global _client
+    if _client is None:
+        _client = create_llm_client()
+    return _client
+
+
+def get_scheduled_llm_client() -> AsyncOpenAI:
+    """
+    LLMScheduler.run/slot 안에서 쓰는 클라이언트 (같은 연결 풀, SDK 재시도 없음)
+
+    SDK가 429를 재시도하면 슬롯을 쥔 채 대기하고 스케줄러 재시도와 겹쳐 시도 횟수가 곱해지므로,
+    429/연결 오류/5xx 재시도는 스케줄러가 슬롯을 반납한 상태로 처리한다.
+    """
+    global _scheduled_client
+    if _scheduled_client is None:
+        _scheduled_client = get_llm_client().with_options(max_retries=0)
+    return _scheduled_client
+
+
+async def init_llm_client() -> None:
+    """앱 시작 시 클라이언트 생성"""
+    get_llm_client()
+
+
+async def close_llm_client() -> None:
+    """앱 종료 시 연결 풀 정리"""
+    global _client, _scheduled_client
+    if _client is not None:
+        await _client.close()
+        _client = None
+    _scheduled_client = None
@@ -0,0 +1,254 @@
+"""
+LLM 호출 토큰/지연 시간 집계 (프로세스 메모리)
+
+응답에 tokens_used를 넣기만 해서는 어떤 흐름(채팅/스캔 분석/제목/요약)이 비용과 지연을 주도하는지 알 수 없다.
+모든 LLM 호출을 엔드포인트 + 프롬프트 버전별로 기록하고 /metrics에서 누적 토큰, 예상 비용,
+최근 window 동안의 지연 시간 백분위수를 보여준다.
+
+- 기록: 모델, prompt/completion 토큰, 지연 시간(스케줄러 대기 포함), 스트리밍 첫 토큰 시간, 캐시 hit/miss, 오류 클래스
+- 캐시 히트는 LLM 호출이 아니므로 횟수만 세고 지연 시간 표본에는 넣지 않는다
+- 비용: MODEL_PRICES(USD / 100만 토큰) 기준 추정치, 가격표에 없는 모델은 비용 미집계
+"""
+import math
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.config import get_settings
+
+settings = get_settings()
+
+# (입력, 출력) USD / 100만 토큰 - OpenAI 공개 가격 기준, 가격이 바뀌면 갱신
+# 응답의 모델명(gpt-4o-2024-08-06 등)은 가장 긴 접두어로 찾는다
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+}
+
+PERCENTILES = (50, 95, 99)
+
+
+def model_price(model: Optional[str]) -> Optional[Tuple[float, float]]:
+    if not model:
+        return None
+    matches = [name for name in MODEL_PRICES if model.startswith(name)]
+    return MODEL_PRICES[max(matches, key=len)] if matches else None
+
+
+def estimate_cost(model: Optional[str], prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+    """예상 비용 (USD) - 가격표에 없는 모델이면 None"""
+    price = model_price(model)
+    if price is None:
+        return None
+    return (prompt_tokens * price[0] + completion_tokens * price[1]) / 1_000_000
+
+
+def _percentile(sorted_values: List[float], p: float) -> float:
+    """nearest-rank 백분위수"""
+    rank = max(math.ceil(p / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+class _FlowStats:
+    """엔드포인트 + 프롬프트 버전 1개의 누적 값 + 최근 지연 시간 표본"""
+
+    def __init__(self, max_samples: int):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost_usd = 0.0
+        self.unpriced_calls = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.models: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.latency: "deque[Tuple[float, float]]" = deque(maxlen=max_samples)  # (기록 시각, ms)
+        self.first_token: "deque[Tuple[float, float]]" = deque(maxlen=max_samples)
+
+
+class LLMMetrics:
+    """LLM 호출 기록 집계 (스레드 안전)"""
+
+    def __init__(self, window_seconds: float = 300, max_samples: int = 2000):
+        self.window_seconds = window_seconds
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._flows: Dict[Tuple[str, str], _FlowStats] = {}
+        self._started_at = time.time()
+
+    def _flow(self, endpoint: str, prompt_version: str) -> _FlowStats:
+        key = (endpoint, str(prompt_version))
+        flow = self._flows.get(key)
+        if flow is None:
+            flow = self._flows[key] = _FlowStats(self.max_samples)
+        return flow
+
+    def record(
+        self,
+        endpoint: str,
+        prompt_version: str,
+        model: Optional[str] = None,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        latency_ms: float = 0.0,
+        first_token_ms: Optional[float] = None,
+        cache: Optional[str] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """
+        LLM 호출 1건 기록
+
+        cache: "miss" (캐시를 조회했지만 없어서 호출), None (캐시 대상 아님)
+        error: 오류 클래스 이름 (예: RateLimitError, APITimeoutError)
+        """
+        cost = estimate_cost(model, prompt_tokens, completion_tokens)
+        now = time.monotonic()
+        with self._lock:
+            flow = self._flow(endpoint, prompt_version)
+            flow.calls += 1
+            flow.prompt_tokens += prompt_tokens
+            flow.completion_tokens += completion_tokens
+            if cost is None:
+                if prompt_tokens or completion_tokens:
+                    flow.unpriced_calls += 1
+            else:
+                flow.cost_usd += cost
+            if model:
+                flow.models[model] += 1
+            if error:
+                flow.errors[error] += 1
+            if cache == "miss":
+                flow.cache_misses += 1
+            flow.latency.append((now, latency_ms))
+            if first_token_ms is not None:
+                flow.first_token.append((now, first_token_ms))
+
+    def record_cache_hit(self, endpoint: str, prompt_version: str) -> None:
+        """캐시 히트로 LLM 호출을 생략한 경우"""
+        with self._lock:
+            self._flow(endpoint, prompt_version).cache_hits += 1
+
+    def _window_percentiles(self, samples, now: float) -> Dict[str, Any]:
+        values = sorted(ms for at, ms in samples if now - at <= self.window_seconds)
+        if not values:
+            return {"count": 0}
+        result = {"count": len(values)}
+        for p in PERCENTILES:
+            result[f"p{p}_ms"] = round(_percentile(values, p), 1)
+        result["max_ms"] = round(values[-1], 1)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            flows = []
+            total_cost = sum(flow.cost_usd for flow in self._flows.values())
+            for (endpoint, prompt_version), flow in sorted(self._flows.items()):
+                lookups = flow.cache_hits + flow.cache_misses
+                item = {
+                    "endpoint": endpoint,
+                    "prompt_version": prompt_version,
+                    "calls": flow.calls,
+                    "prompt_tokens": flow.prompt_tokens,
+                    "completion_tokens": flow.completion_tokens,
+                    "avg_tokens": round((flow.prompt_tokens + flow.completion_tokens) / flow.calls, 1) if flow.calls else 0.0,
+                    "cost_usd": round(flow.cost_usd, 6),
+                    "cost_share": round(flow.cost_usd / total_cost, 4) if total_cost else 0.0,
+                    "unpriced_calls": flow.unpriced_calls,
+                    "cache_hits": flow.cache_hits,
+                    "cache_misses": flow.cache_misses,
+                    "cache_hit_rate": round(flow.cache_hits / lookups, 4) if lookups else None,
+                    "errors": dict(flow.errors),
+                    "models": dict(flow.models),
+                    "latency": self._window_percentiles(flow.latency, now),
+                }
+                if flow.first_token:
+                    item["first_token"] = self._window_percentiles(flow.first_token, now)
+                flows.append(item)
+
+            return {
+                "window_seconds": self.window_seconds,
+                "since": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self._started_at)),
+                "total_calls": sum(flow.calls for flow in self._flows.values()),
+                "total_tokens": sum(flow.prompt_tokens + flow.completion_tokens for flow in self._flows.values()),
+                "total_cost_usd": round(total_cost, 6),
+                "flows": sorted(flows, key=lambda item: item["cost_usd"], reverse=True),
+            }
+
+
+class LLMCallRecord:
+    """track_llm_call 블록 안에서 응답 정보를 채우는 객체"""
+
+    def __init__(self):
+        self.model: Optional[str] = None
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.first_token_ms: Optional[float] = None
+        self._started = time.perf_counter()
+
+    def set_usage(self, model: Optional[str], usage: Any) -> None:
+        """응답(또는 스트림 마지막 청크)의 모델/usage 반영"""
+        self.model = model or self.model
+        if usage is not None:
+            self.prompt_tokens = usage.prompt_tokens or 0
+            self.completion_tokens = usage.completion_tokens or 0
+
+    def mark_first_token(self) -> None:
+        """스트리밍 첫 토큰 도착 (첫 호출만 반영)"""
+        if self.first_token_ms is None:
+            self.first_token_ms = (time.perf_counter() - self._started) * 1000
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._started) * 1000
+
+
+_metrics: Optional[LLMMetrics] = None
+_metrics_lock = threading.Lock()
+
+
+def get_llm_metrics() -> LLMMetrics:
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                _metrics = LLMMetrics(
+                    window_seconds=settings.llm_metrics_window_seconds,
+                    max_samples=settings.llm_metrics_max_samples,
+                )
+    return _metrics
+
+
+@contextmanager
+def track_llm_call(endpoint: str, prompt_version: str, cache: Optional[str] = None) -> Iterator[LLMCallRecord]:
+    """
+    블록 실행 시간을 LLM 호출 1건으로 기록 (예외가 나면 오류 클래스와 함께 기록 후 다시 발생)
+
+        with track_llm_call("chat", CHAT_PROMPT_VERSION) as call:
+            response = await ...
+            call.set_usage(response.model, response.usage)
+    """
+    call = LLMCallRecord()
+    error = None
+    try:
+        yield call
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        get_llm_metrics().record(
+            endpoint,
+            prompt_version,
+            model=call.model,
+            prompt_tokens=call.prompt_tokens,
+            completion_tokens=call.completion_tokens,
+            latency_ms=call.elapsed_ms(),
+            first_token_ms=call.first_token_ms,
+            cache=cache,
+            error=error,
+        )
+
+
+def record_cache_hit(endpoint: str, prompt_version: str) -> None:
+    get_llm_metrics().record_cache_hit(endpoint, prompt_version)
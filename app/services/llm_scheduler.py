@@ -0,0 +1,330 @@
+"""
+LLM 호출 스케줄러 (프로세스 전역)
+
+스캔이 몰리면 OpenAI 요청/토큰 한도(429)를 소진해서 진행 중인 채팅까지 "일시적인 오류"로 실패한다.
+모든 OpenAI 호출이 이 스케줄러를 거쳐 동시 실행 수와 분당 토큰(TPM) 예산 안에서 우선순위 순으로 실행된다.
+
+- 우선순위: CHAT(대화형) > SCAN(약 분석) > BACKGROUND(제목/요약 생성) - 같은 우선순위는 도착 순
+- 동시 실행 수: llm_max_concurrency
+- TPM: 최근 60초 동안 시작한 요청의 토큰 합 (시작 시 예상치로 예약 → 완료 후 실제 사용량으로 교체)
+- 429: 스케줄러 전체를 잠시 멈추고(Retry-After 또는 지수 백오프) 다시 시도
+  모든 호출(run, 스트리밍 slot)은 SDK 재시도 없는 클라이언트(get_scheduled_llm_client)를 쓰고 재시도는 스케줄러만 담당
+  (429/연결 오류/5xx 모두 슬롯을 반납하고 대기 → 시도 횟수가 SDK 재시도와 곱해지지 않음,
+  스트리밍은 스트림을 여는 요청까지만 재시도 - 첫 토큰 이후 오류는 호출한 쪽에서 처리)
+- 여러 워커 프로세스: 공유 저장소 없이 예산을 llm_budget_workers로 나눠 프로세스마다 적용
+- 회로 차단기: OpenAI 연결 오류/타임아웃/5xx/느린 응답이 이어지면 대기열에 넣지 않고 바로 CircuitOpenError
+  (호출하는 쪽의 기존 오류 처리 → 기본 응답)
+"""
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from collections import deque
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from openai import APIConnectionError, InternalServerError, RateLimitError
+
+from app.config import get_settings
+from app.services.circuit_breaker import LLM_BREAKER, CircuitBreaker, get_circuit_breaker
+from app.services.chat_context import MESSAGE_OVERHEAD_TOKENS, count_tokens
+
+settings = get_settings()
+
+T = TypeVar("T")
+
+TPM_WINDOW_SECONDS = 60.0
+
+# 429 백오프 상한
+MAX_BACKOFF_SECONDS = 30.0
+
+
+class Priority(IntEnum):
+    CHAT = 0
+    SCAN = 1
+    BACKGROUND = 2
+
+
+def estimate_request_tokens(messages: List[dict], max_tokens: int) -> int:
+    """요청 토큰 예상치 (프롬프트 토큰 + 최대 출력 토큰) - TPM 예약용"""
+    prompt_tokens = sum(count_tokens(msg.get("content") or "") + MESSAGE_OVERHEAD_TOKENS for msg in messages)
+    return prompt_tokens + max_tokens
+
+
+def _backoff_seconds(attempt: int) -> float:
+    """지수 백오프 + 지터"""
+    backoff = settings.llm_rate_limit_backoff_seconds * (2 ** attempt)
+    return min(backoff * (1 + random.random() * 0.25), MAX_BACKOFF_SECONDS)
+
+
+def _retry_after_seconds(error: RateLimitError, attempt: int) -> float:
+    """429 응답의 Retry-After (없으면 지수 백오프 + 지터)"""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    for header, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        try:
+            value = float(headers.get(header)) * scale
+        except (TypeError, ValueError):
+            continue
+        if value > 0:
+            return min(value, MAX_BACKOFF_SECONDS)
+    return _backoff_seconds(attempt)
+
+
+def _record_call(breaker: CircuitBreaker, error: Optional[BaseException], elapsed: Optional[float] = None) -> None:
+    """OpenAI 호출 결과를 회로 차단기에 반영 (연결 오류/타임아웃/5xx만 실패, 4xx/429는 응답을 받은 것)"""
+    if error is None:
+        breaker.record_success(elapsed)
+    elif isinstance(error, (APIConnectionError, InternalServerError)):
+        breaker.record_failure(type(error).__name__)
+    elif isinstance(error, Exception):
+        breaker.record_success()
+    else:  # 취소 등
+        breaker.release()
+
+
+class _Reservation:
+    __slots__ = ("started_at", "tokens")
+
+    def __init__(self, started_at: float, tokens: int):
+        self.started_at = started_at
+        self.tokens = tokens
+
+
+class _Slot:
+    """
+    async with scheduler.slot(priority, call, ...) as slot: async for chunk in slot.result: ... slot.tokens = 실제 사용량
+
+    스트리밍용: call()(스트림 열기)은 run()과 같은 정책으로 재시도하고, 스트림이 열리면 끝날 때까지 슬롯을 유지한다.
+    """
+
+    def __init__(self, scheduler: "LLMScheduler", priority: Priority, call: Callable[[], Awaitable[Any]], estimated_tokens: int):
+        self._scheduler = scheduler
+        self._priority = priority
+        self._call = call
+        self._estimated_tokens = estimated_tokens
+        self._reservation: Optional[_Reservation] = None
+        self.result: Any = None
+        self.tokens: Optional[int] = None
+
+    async def __aenter__(self) -> "_Slot":
+        breaker = get_circuit_breaker(LLM_BREAKER)
+        self._reservation, self.result, _ = await self._scheduler._call_with_retry(
+            breaker, self._priority, self._call, self._estimated_tokens
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if isinstance(exc, RateLimitError):
+            self._scheduler.note_rate_limit(_retry_after_seconds(exc, 0))
+        # 스트리밍은 응답 길이에 따라 시간이 달라지므로 지연 시간은 보지 않음
+        _record_call(get_circuit_breaker(LLM_BREAKER), exc)
+        self._scheduler.release(self._reservation, self.tokens)
+
+
+class LLMScheduler:
+    """우선순위 큐 + 동시 실행 수 + TPM 예산 (asyncio, 이벤트 루프 1개 기준)"""
+
+    def __init__(self, max_concurrency: int = 16, tokens_per_minute: int = 0):
+        self.max_concurrency = max(1, max_concurrency)
+        self.tokens_per_minute = max(0, tokens_per_minute)  # 0: 제한 없음
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._waiters: list = []  # (priority, seq, estimated_tokens, enqueued_at, future)
+        self._seq = itertools.count()
+        self._running = 0
+        self._window: "deque[_Reservation]" = deque()
+        self._paused_until = 0.0
+        self._wake_handle: Optional[asyncio.TimerHandle] = None
+
+        self._granted = {priority: 0 for priority in Priority}
+        self._wait_seconds = {priority: 0.0 for priority in Priority}
+        self._max_wait_seconds = {priority: 0.0 for priority in Priority}
+        self._rate_limited = 0
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # 새 이벤트 루프 (테스트 등) - 이전 루프의 대기/예약 상태는 버림
+            self._loop = loop
+            self._waiters = []
+            self._running = 0
+            self._wake_handle = None
+
+    def _tokens_in_window(self, now: float) -> int:
+        while self._window and now - self._window[0].started_at >= TPM_WINDOW_SECONDS:
+            self._window.popleft()
+        return sum(reservation.tokens for reservation in self._window)
+
+    def _schedule_wake(self, at: float) -> None:
+        if self._wake_handle is not None:
+            self._wake_handle.cancel()
+        self._wake_handle = self._loop.call_later(max(at - time.monotonic(), 0.0), self._dispatch)
+
+    def _dispatch(self) -> None:
+        """실행 가능한 만큼 대기 요청에 슬롯 배정 (우선순위가 높은 요청이 막히면 낮은 요청도 대기)"""
+        self._wake_handle = None
+        while self._waiters:
+            priority, _, estimated_tokens, enqueued_at, future = self._waiters[0]
+            if future.done():  # 취소된 대기
+                heapq.heappop(self._waiters)
+                continue
+            if self._running >= self.max_concurrency:
+                return
+
+            now = time.monotonic()
+            if now < self._paused_until:
+                self._schedule_wake(self._paused_until)
+                return
+            if self.tokens_per_minute:
+                used = self._tokens_in_window(now)
+                # 창이 비어 있으면 예산보다 큰 요청도 1건은 허용 (무한 대기 방지)
+                if self._window and used + estimated_tokens > self.tokens_per_minute:
+                    self._schedule_wake(self._window[0].started_at + TPM_WINDOW_SECONDS)
+                    return
+
+            heapq.heappop(self._waiters)
+            reservation = _Reservation(now, estimated_tokens)
+            self._window.append(reservation)
+            self._running += 1
+
+            waited = now - enqueued_at
+            self._granted[priority] += 1
+            self._wait_seconds[priority] += waited
+            self._max_wait_seconds[priority] = max(self._max_wait_seconds[priority], waited)
+            future.set_result(reservation)
+
+    async def acquire(self, priority: Priority, estimated_tokens: int = 0) -> _Reservation:
+        self._bind_loop()
+        future = self._loop.create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), estimated_tokens, time.monotonic(), future))
+        self._dispatch()
+        try:
+            return await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(future.result())
+            raise
+
+    def release(self, reservation: Optional[_Reservation], actual_tokens: Optional[int] = None) -> None:
+        """슬롯 반환 (actual_tokens: 실제 사용 토큰으로 TPM 예약 교체)"""
+        if reservation is None:
+            return
+        if actual_tokens is not None:
+            reservation.tokens = actual_tokens
+        self._running = max(0, self._running - 1)
+        if self._loop is not None:
+            self._dispatch()
+
+    def note_rate_limit(self, pause_seconds: float) -> None:
+        """429 수신 - pause_seconds 동안 새 요청 시작 중지"""
+        self._rate_limited += 1
+        self._paused_until = max(self._paused_until, time.monotonic() + pause_seconds)
+        print(f"⚠️  OpenAI 429 - LLM 요청 {pause_seconds:.1f}초 대기")
+
+    def slot(self, priority: Priority, call: Callable[[], Awaitable[Any]], estimated_tokens: int = 0) -> _Slot:
+        return _Slot(self, priority, call, estimated_tokens)
+
+    async def _call_with_retry(
+        self,
+        breaker: CircuitBreaker,
+        priority: Priority,
+        call: Callable[[], Awaitable[T]],
+        estimated_tokens: int,
+    ) -> Tuple[_Reservation, T, float]:
+        """
+        슬롯을 받아 call() 실행, 성공하면 슬롯을 쥔 채 (예약, 결과, 시작 시각) 반환
+
+        실패한 시도는 회로 차단기에 반영하고 슬롯을 반납한다. 성공한 시도는 호출한 쪽이 반영/반납한다.
+        - 429: 스케줄러를 멈췄다가 llm_rate_limit_retries회까지 재시도
+        - 연결 오류/타임아웃/5xx: 지수 백오프 후 openai_max_retries회까지 재시도
+        """
+        rate_limited = failed = 0
+        while True:
+            breaker.check()
+            try:
+                reservation = await self.acquire(priority, estimated_tokens)
+            except BaseException:
+                breaker.release()
+                raise
+            started = time.monotonic()
+            try:
+                return reservation, await call(), started
+            except RateLimitError as e:
+                _record_call(breaker, e)
+                self.release(reservation)
+                self.note_rate_limit(_retry_after_seconds(e, rate_limited))
+                if rate_limited >= settings.llm_rate_limit_retries:
+                    raise
+                rate_limited += 1
+            except (APIConnectionError, InternalServerError) as e:
+                _record_call(breaker, e)
+                self.release(reservation)
+                if failed >= settings.openai_max_retries:
+                    raise
+                await asyncio.sleep(_backoff_seconds(failed))
+                failed += 1
+            except BaseException as e:
+                _record_call(breaker, e)
+                self.release(reservation)
+                raise
+
+    async def run(
+        self,
+        priority: Priority,
+        call: Callable[[], Awaitable[T]],
+        estimated_tokens: int = 0,
+    ) -> T:
+        """
+        슬롯을 받아 call() 실행 (재시도는 여기서만 - call()은 get_scheduled_llm_client로 SDK 재시도 없이 호출)
+
+        429/연결 오류/5xx 재시도는 _call_with_retry, 재시도 대기 중에는 슬롯을 반납한다.
+        call()의 반환값에 usage가 있으면 실제 토큰 사용량으로 TPM 예약을 교체한다.
+        회로가 열려 있으면 대기열에 넣지 않고 바로 CircuitOpenError.
+        """
+        breaker = get_circuit_breaker(LLM_BREAKER)
+        reservation, result, started = await self._call_with_retry(breaker, priority, call, estimated_tokens)
+        _record_call(breaker, None, time.monotonic() - started)
+        usage = getattr(result, "usage", None)
+        self.release(reservation, getattr(usage, "total_tokens", None))
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        depth = {priority.name.lower(): 0 for priority in Priority}
+        for priority, _, _, _, future in self._waiters:
+            if not future.done():
+                depth[Priority(priority).name.lower()] += 1
+        return {
+            "max_concurrency": self.max_concurrency,
+            "tokens_per_minute": self.tokens_per_minute or None,
+            "running": self._running,
+            "queue_depth": depth,
+            "tokens_last_minute": self._tokens_in_window(now),
+            "paused_seconds": round(max(self._paused_until - now, 0.0), 2),
+            "rate_limited": self._rate_limited,
+            "granted": {priority.name.lower(): count for priority, count in self._granted.items()},
+            "avg_wait_ms": {
+                priority.name.lower(): round(self._wait_seconds[priority] / count * 1000, 2) if count else 0.0
+                for priority, count in self._granted.items()
+            },
+            "max_wait_ms": {
+                priority.name.lower(): round(seconds * 1000, 2)
+                for priority, seconds in self._max_wait_seconds.items()
+            },
+        }
+
+
+_scheduler: Optional[LLMScheduler] = None
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """프로세스 전역 스케줄러 (예산은 llm_budget_workers로 나눔)"""
+    global _scheduler
+    if _scheduler is None:
+        workers = max(1, settings.llm_budget_workers)
+        _scheduler = LLMScheduler(
+            max_concurrency=max(1, settings.llm_max_concurrency // workers),
+            tokens_per_minute=settings.llm_tokens_per_minute // workers,
+        )
+    return _scheduler
@@ -0,0 +1,112 @@
+"""
+NumPy 브루트포스 벡터 인덱스
+
+load_dur_data.py --export-numpy 로 내보낸 정규화 임베딩 행렬(.npy)을 메모리 맵으로 열고,
+행렬-벡터 곱 1회 + argpartition으로 top-k를 구한다.
+
+- vectors.npy: (N, dim) float32 또는 float16, type별로 정렬되어 연속된 행 범위를 가짐
+- metadata.json: ids / documents / metadatas + type별 행 범위(type_ranges)
+
+langchain Chroma와 같은 similarity_search / similarity_search_by_vector 인터페이스를 제공하므로
+rag_service의 검색 함수들은 백엔드 종류와 무관하게 동작한다.
+"""
+import json
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+from langchain.schema import Document
+
+VECTORS_FILE = "vectors.npy"
+METADATA_FILE = "metadata.json"
+
+# float16 행렬은 이 행 수 단위로 float32로 변환하여 곱셈 (BLAS 사용 + 임시 메모리 상한)
+FLOAT16_BLOCK_ROWS = 65536
+
+
+class NumpyVectorIndex:
+    """메모리 맵 기반 브루트포스 코사인 유사도 인덱스"""
+
+    def __init__(self, index_dir: Path, embedding_function):
+        self.index_dir = Path(index_dir)
+        self.embedding_function = embedding_function
+
+        self.vectors = np.load(self.index_dir / VECTORS_FILE, mmap_mode="r")
+
+        with open(self.index_dir / METADATA_FILE, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        self.ids: List[str] = meta["ids"]
+        self.documents: List[str] = meta["documents"]
+        self.metadatas: List[Dict[str, Any]] = meta["metadatas"]
+        self.type_ranges: Dict[str, Tuple[int, int]] = {
+            doc_type: (start, end) for doc_type, (start, end) in meta["type_ranges"].items()
+        }
+
+    def __len__(self) -> int:
+        return self.vectors.shape[0]
+
+    def _row_range(self, filter: Optional[Dict[str, Any]]) -> Tuple[int, int]:
+        """메타데이터 필터 → 행 범위 (type 필터만 지원)"""
+        if not filter:
+            return 0, len(self)
+        unsupported = set(filter) - {"type"}
+        if unsupported:
+            raise ValueError(f"NumpyVectorIndex는 type 필터만 지원합니다: {sorted(unsupported)}")
+        return self.type_ranges.get(filter["type"], (0, 0))
+
+    def _scores(self, query: np.ndarray, start: int, end: int) -> np.ndarray:
+        """행 범위 [start, end)에 대한 내적(= 코사인 유사도) 계산"""
+        if self.vectors.dtype == np.float32:
+            return self.vectors[start:end] @ query
+
+        scores = np.empty(end - start, dtype=np.float32)
+        for block_start in range(start, end, FLOAT16_BLOCK_ROWS):
+            block_end = min(block_start + FLOAT16_BLOCK_ROWS, end)
+            block = np.asarray(self.vectors[block_start:block_end], dtype=np.float32)
+            scores[block_start - start:block_end - start] = block @ query
+        return scores
+
+    def search_by_vector_with_scores(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        filter: Optional[Dict[str, Any]] = None,
+    ) -> List[Tuple[int, float]]:
+        """(행 번호, 유사도) top-k - 유사도 내림차순"""
+        start, end = self._row_range(filter)
+        if end <= start or k <= 0:
+            return []
+
+        query = np.asarray(embedding, dtype=np.float32)
+        scores = self._scores(query, start, end)
+
+        k = min(k, scores.shape[0])
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(start + int(i), float(scores[i])) for i in top]
+
+    def _to_document(self, row: int) -> Document:
+        return Document(page_content=self.documents[row], metadata=self.metadatas[row])
+
+    def similarity_search_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        filter: Optional[Dict[str, Any]] = None,
+        **kwargs,
+    ) -> List[Document]:
+        return [
+            self._to_document(row)
+            for row, _ in self.search_by_vector_with_scores(embedding, k=k, filter=filter)
+        ]
+
+    def similarity_search(
+        self,
+        query: str,
+        k: int = 4,
+        filter: Optional[Dict[str, Any]] = None,
+        **kwargs,
+    ) -> List[Document]:
+        embedding = self.embedding_function.embed_query(query)
+        return self.similarity_search_by_vector(embedding, k=k, filter=filter)
@@ -1,69 +1,323 @@
 """
 RAG(Retrieval-Augmented Generation) 서비스
 
-DUR 데이터를 ChromaDB에서 검색하여 약물 안전 정보 제공
+DUR 데이터를 벡터 인덱스에서 검색하여 약물 안전 정보 제공
+
+벡터 백엔드 (settings.rag_backend):
+- chroma: ChromaDB (기본)
+- numpy: load_dur_data.py --export-numpy 로 내보낸 .npy 행렬 브루트포스 검색
+
+검색 모드 (settings.rag_search_mode, 함수별 mode 인자로 덮어쓰기 가능):
+- vector: 벡터 유사도 검색만 사용 (기본)
+- hybrid: BM25 어휘 검색 + 벡터 검색을 Reciprocal Rank Fusion으로 융합
+
+임베딩 마이크로 배치 (settings.rag_embed_batching):
+- 동시에 들어온 쿼리 임베딩을 max_wait_ms 동안 모아 embed_documents 1회로 처리
+- 배치 크기 히스토그램은 get_embedding_batch_stats()로 조회 (/metrics)
+
+공유 검색 서버 (settings.rag_server_socket):
+- 설정 시 검색을 retrieval_server 사이드카(모델/인덱스 1벌 공유)에 위임
+- 서버에 연결할 수 없으면 이 프로세스에서 직접 검색 (in-process)
+
+성분 정규화 (ingredient_normalizer):
+- 카테고리 검색 쿼리의 성분명을 적재 시 생성된 사전으로 DUR 대표 표기로 바꿔 짧고 정확한 쿼리 사용
+
+인덱스 버전 (dur_versions):
+- load_dur_data.py가 새 버전(dur_safety_v{N})을 만든 뒤 활성 버전 포인터를 교체
+- 검색 시 포인터 파일을 최대 1초에 1회 stat하여 바뀌었으면 새 버전 인덱스로 전환 (재시작 불필요)
 """
-from pathlib import Path
-from typing import List, Dict, Any
+import threading
+import time
+from typing import List, Dict, Any, Optional
+from langchain.schema import Document
 from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_community.vectorstores import Chroma
+from app.config import get_settings
+from app.services.ingredient_normalizer import ingredient_query_names
+from app.services.dur_versions import (
+    ActiveVersionWatcher,
+    CHROMA_DB_PATH,
+    NUMPY_INDEX_PATH,
+    BM25_INDEX_PATH,
+)
+
+settings = get_settings()
+
+# 활성 버전 포인터 확인 주기 (초)
+ACTIVE_VERSION_CHECK_SECONDS = 1.0
+
+SEARCH_MODES = ("vector", "hybrid")
 
-# ChromaDB 경로
-CHROMA_DB_PATH = Path(__file__).parent.parent.parent / "data" / "chroma_db"
+# Reciprocal Rank Fusion 상수 (score = Σ 1 / (RRF_K + rank))
+RRF_K = 60
+
+# hybrid 모드에서 각 검색기로부터 가져올 후보 수 = max(k * 배수, 최소값)
+HYBRID_CANDIDATE_FACTOR = 4
+HYBRID_MIN_CANDIDATES = 20
+
+# 통합 검색(search_all_safety_info) 카테고리별 k
+# hybrid는 정밀도가 높으므로 분석 프롬프트에 실제로 들어가는 개수만 조회
+SAFETY_INFO_K = {
+    "vector": {"contraindications": 5, "age_restrictions": 3, "pregnancy_restrictions": 3, "elderly_cautions": 3},
+    "hybrid": {"contraindications": 3, "age_restrictions": 2, "pregnancy_restrictions": 2, "elderly_cautions": 2},
+}
+
+# 챗봇 RAG 컨텍스트에 넣을 문서 수
+CHAT_CONTEXT_K = {"vector": 3, "hybrid": 2}
+
+# 검색 서버 연결 실패 후 재시도까지 in-process 검색을 사용할 시간 (초)
+RETRIEVAL_SERVER_RETRY_SECONDS = 30
+
+# 싱글톤 초기화 락 (검색 함수가 스레드풀에서 동시에 호출되므로 모델/인덱스 중복 로드 방지)
+_init_lock = threading.RLock()
 
 # 임베딩 모델 (싱글톤)
 _embeddings = None
+
+# 벡터/BM25 인덱스 (활성 버전이 바뀌면 다시 로드)
+_version_watcher = ActiveVersionWatcher(interval=ACTIVE_VERSION_CHECK_SECONDS)
 _vectorstore = None
+_vectorstore_version = None
+_bm25_index = None
+_bm25_version = None
+
+# 임베딩 마이크로 배치 스케줄러 (싱글톤)
+_embedding_scheduler = None
+_embedding_batching = False
+
+# 검색 서버 클라이언트
+_retrieval_client = None
+_retrieval_server_disabled = False
+_retrieval_server_retry_at = 0.0
 
 
 def get_embeddings():
     """임베딩 모델 가져오기 (싱글톤)"""
     global _embeddings
-    if _embeddings is None:
-        _embeddings = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2",
-            model_kwargs={'device': 'cpu'},
-            encode_kwargs={'normalize_embeddings': True}
-        )
+    with _init_lock:
+        if _embeddings is None:
+            _embeddings = HuggingFaceEmbeddings(
+                model_name="sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2",
+                model_kwargs={'device': 'cpu'},
+                encode_kwargs={'normalize_embeddings': True}
+            )
     return _embeddings
 
 
 def get_vectorstore():
-    """ChromaDB vectorstore 가져오기 (싱글톤)"""
-    global _vectorstore
-    if _vectorstore is None:
-        _vectorstore = Chroma(
-            persist_directory=str(CHROMA_DB_PATH),
-            embedding_function=get_embeddings(),
-            collection_name="dur_safety"
-        )
+    """
+    벡터 인덱스 가져오기 (활성 버전별 싱글톤)
+
+    반환 객체는 백엔드와 무관하게 similarity_search(query, k, filter) 인터페이스를 가진다.
+    활성 버전이 바뀌면 새 버전 인덱스를 열고, 이전 객체는 진행 중인 검색이 끝나면 정리된다.
+    """
+    global _vectorstore, _vectorstore_version
+    version = _version_watcher.current()
+    if _vectorstore is not None and _vectorstore_version == version:
+        return _vectorstore
+
+    with _init_lock:
+        if _vectorstore is None or _vectorstore_version != version:
+            if settings.rag_backend == "numpy":
+                from app.services.numpy_index import NumpyVectorIndex
+                vectorstore = NumpyVectorIndex(version.numpy_index_path, get_embeddings())
+            elif settings.rag_backend == "chroma":
+                from langchain_community.vectorstores import Chroma
+                vectorstore = Chroma(
+                    persist_directory=str(CHROMA_DB_PATH),
+                    embedding_function=get_embeddings(),
+                    collection_name=version.collection_name
+                )
+            else:
+                raise ValueError(f"알 수 없는 RAG 백엔드: {settings.rag_backend}")
+
+            if _vectorstore is not None:
+                print(f"🔄 DUR 인덱스 전환: {_vectorstore_version.collection_name} → {version.collection_name}")
+            _vectorstore, _vectorstore_version = vectorstore, version
     return _vectorstore
 
 
-def search_contraindications(drug_names: List[str], k: int = 5) -> List[Dict[str, Any]]:
+def get_bm25_index():
+    """BM25 인덱스 가져오기 (활성 버전별 싱글톤, 인덱스 파일이 없으면 None)"""
+    global _bm25_index, _bm25_version
+    version = _version_watcher.current()
+    if _bm25_version == version:
+        return _bm25_index
+
+    with _init_lock:
+        if _bm25_version != version:
+            bm25_path = version.bm25_index_path
+            if bm25_path.exists():
+                from app.services.bm25_index import BM25Index
+                _bm25_index = BM25Index.load(bm25_path)
+            else:
+                print(f"⚠️  BM25 인덱스가 없어 벡터 검색만 사용합니다: {bm25_path}")
+                _bm25_index = None
+            _bm25_version = version
+    return _bm25_index
+
+
+def get_index_version() -> Dict[str, Any]:
+    """현재 활성 DUR 인덱스 버전 (/metrics)"""
+    version = _version_watcher.current()
+    return {"version": version.version, "collection": version.collection_name}
+
+
+def resolve_search_mode(mode: Optional[str] = None) -> str:
+    """검색 모드 결정 (인자 > 설정값)"""
+    mode = mode or settings.rag_search_mode
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"알 수 없는 검색 모드: {mode} (가능: {', '.join(SEARCH_MODES)})")
+    return mode
+
+
+def reciprocal_rank_fusion(rankings: List[List[Document]], k: int) -> List[Document]:
+    """여러 검색 결과 순위를 RRF로 융합하여 상위 k개 반환 (문서 본문 기준 동일 문서 판정)"""
+    scores: Dict[str, float] = {}
+    documents: Dict[str, Document] = {}
+
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, 1):
+            key = doc.page_content
+            scores[key] = scores.get(key, 0.0) + 1.0 / (RRF_K + rank)
+            documents.setdefault(key, doc)
+
+    ordered = sorted(scores, key=scores.get, reverse=True)
+    return [documents[key] for key in ordered[:k]]
+
+
+def get_embedding_scheduler():
+    """임베딩 마이크로 배치 스케줄러 가져오기 (싱글톤)"""
+    global _embedding_scheduler
+    with _init_lock:
+        if _embedding_scheduler is None:
+            from app.services.embedding_scheduler import EmbeddingScheduler
+            _embedding_scheduler = EmbeddingScheduler(
+                get_embeddings().embed_documents,
+                max_batch_size=settings.rag_embed_max_batch_size,
+                max_wait_ms=settings.rag_embed_max_wait_ms,
+            )
+    return _embedding_scheduler
+
+
+def enable_embedding_batching() -> None:
+    """설정과 무관하게 임베딩 마이크로 배치 사용 (검색 서버 프로세스에서 호출)"""
+    global _embedding_batching
+    _embedding_batching = True
+
+
+def embed_query(text: str) -> List[float]:
+    """쿼리 임베딩 (마이크로 배치 사용 시 스케줄러 경유)"""
+    if _embedding_batching or settings.rag_embed_batching:
+        return get_embedding_scheduler().embed_query(text)
+    return get_embeddings().embed_query(text)
+
+
+def get_embedding_batch_stats() -> Dict[str, Any]:
+    """임베딩 배치 통계 (이 프로세스 + 검색 서버)"""
+    stats: Dict[str, Any] = {
+        "local": _embedding_scheduler.stats() if _embedding_scheduler is not None else None,
+    }
+    client = get_retrieval_client()
+    if client is not None:
+        try:
+            stats["server"] = client.stats()["embedding"]
+        except (OSError, RuntimeError) as e:
+            stats["server"] = {"error": str(e)}
+    return stats
+
+
+def disable_retrieval_server() -> None:
+    """검색 서버 사용 안 함 (검색 서버 프로세스 자신이 호출)"""
+    global _retrieval_server_disabled
+    _retrieval_server_disabled = True
+
+
+def get_retrieval_client():
+    """검색 서버 클라이언트 (싱글톤, 설정되지 않았거나 일시적으로 사용 불가면 None)"""
+    global _retrieval_client
+    if not settings.rag_server_socket or _retrieval_server_disabled:
+        return None
+    if time.monotonic() < _retrieval_server_retry_at:
+        return None
+    if _retrieval_client is None:
+        from app.services.retrieval_server import RetrievalClient
+        _retrieval_client = RetrievalClient(settings.rag_server_socket)
+    return _retrieval_client
+
+
+def search_documents(query: str, k: int, filter: Optional[Dict[str, Any]] = None, mode: Optional[str] = None) -> List[Document]:
+    """이 프로세스의 모델/인덱스로 검색 (검색 모드에 따라 벡터 / 하이브리드)"""
+    vectorstore = get_vectorstore()
+    mode = resolve_search_mode(mode)
+    bm25_index = get_bm25_index() if mode == "hybrid" else None
+
+    embedding = embed_query(query)
+
+    if bm25_index is None:
+        return vectorstore.similarity_search_by_vector(embedding, k=k, filter=filter)
+
+    n_candidates = max(k * HYBRID_CANDIDATE_FACTOR, HYBRID_MIN_CANDIDATES)
+    vector_docs = vectorstore.similarity_search_by_vector(embedding, k=n_candidates, filter=filter)
+    lexical_docs = bm25_index.similarity_search(query, k=n_candidates, filter=filter)
+    return reciprocal_rank_fusion([vector_docs, lexical_docs], k)
+
+
+def _search(query: str, k: int, filter: Optional[Dict[str, Any]] = None, mode: Optional[str] = None) -> List[Document]:
+    """검색 서버가 설정되어 있으면 위임하고, 연결할 수 없으면 in-process 검색"""
+    global _retrieval_server_retry_at
+
+    client = get_retrieval_client()
+    if client is not None:
+        try:
+            return client.search(query, k=k, filter=filter, mode=mode)
+        except OSError as e:
+            print(f"⚠️  검색 서버 연결 실패, in-process 검색으로 대체: {e}")
+            _retrieval_server_retry_at = time.monotonic() + RETRIEVAL_SERVER_RETRY_SECONDS
+
+    return search_documents(query, k=k, filter=filter, mode=mode)
+
+
+def embed_text(text: str) -> List[float]:
+    """정규화된 텍스트 임베딩 (검색 서버가 설정되어 있으면 위임) - 시맨틱 캐시 등 검색 외 용도"""
+    global _retrieval_server_retry_at
+
+    client = get_retrieval_client()
+    if client is not None:
+        try:
+            return client.embed(text)
+        except OSError as e:
+            print(f"⚠️  검색 서버 연결 실패, in-process 임베딩으로 대체: {e}")
+            _retrieval_server_retry_at = time.monotonic() + RETRIEVAL_SERVER_RETRY_SECONDS
+
+    return embed_query(text)
+
+
+def search_contraindications(drug_names: List[str], k: int = 5, mode: Optional[str] = None) -> List[Dict[str, Any]]:
     """
     병용금기 검색
     
     Args:
         drug_names: 약물 성분명 리스트
         k: 반환할 최대 결과 수
+        mode: 검색 모드 (vector | hybrid, 기본: 설정값)
     
     Returns:
         관련 병용금기 정보 리스트
     """
+    # 성분 표기 정규화 (한글/영문, 염 형태, "|" 목록 → DUR 대표 표기, 중복 제거)
+    drug_names = ingredient_query_names(drug_names)
     if not drug_names:
         return []
     
-    vectorstore = get_vectorstore()
-    
     # 검색 쿼리 생성
     query = f"병용금기 {' '.join(drug_names)}"
     
     # 유사도 검색
-    results = vectorstore.similarity_search(
+    results = _search(
         query,
         k=k,
-        filter={"type": "contraindication"}  # 병용금기만 필터링
+        filter={"type": "contraindication"},  # 병용금기만 필터링
+        mode=mode
     )
     
     # 결과 포맷팅
@@ -82,27 +336,30 @@ def search_contraindications(drug_names: List[str], k: int = 5) -> List[Dict[str
     return contraindications
 
 
-def search_age_restrictions(drug_names: List[str], k: int = 3) -> List[Dict[str, Any]]:
+def search_age_restrictions(drug_names: List[str], k: int = 3, mode: Optional[str] = None) -> List[Dict[str, Any]]:
     """
     연령금기 검색
     
     Args:
         drug_names: 약물 성분명 리스트
         k: 반환할 최대 결과 수
+        mode: 검색 모드 (vector | hybrid, 기본: 설정값)
     
     Returns:
         관련 연령금기 정보 리스트
     """
+    # 성분 표기 정규화 (한글/영문, 염 형태, "|" 목록 → DUR 대표 표기, 중복 제거)
+    drug_names = ingredient_query_names(drug_names)
     if not drug_names:
         return []
     
-    vectorstore = get_vectorstore()
     query = f"연령금기 {' '.join(drug_names)}"
     
-    results = vectorstore.similarity_search(
+    results = _search(
         query,
         k=k,
-        filter={"type": "age_contraindication"}
+        filter={"type": "age_contraindication"},
+        mode=mode
     )
     
     restrictions = []
@@ -118,27 +375,30 @@ def search_age_restrictions(drug_names: List[str], k: int = 3) -> List[Dict[str,
     return restrictions
 
 
-def search_pregnancy_restrictions(drug_names: List[str], k: int = 3) -> List[Dict[str, Any]]:
+def search_pregnancy_restrictions(drug_names: List[str], k: int = 3, mode: Optional[str] = None) -> List[Dict[str, Any]]:
     """
     임부금기 검색
     
     Args:
         drug_names: 약물 성분명 리스트
         k: 반환할 최대 결과 수
+        mode: 검색 모드 (vector | hybrid, 기본: 설정값)
     
     Returns:
         관련 임부금기 정보 리스트
     """
+    # 성분 표기 정규화 (한글/영문, 염 형태, "|" 목록 → DUR 대표 표기, 중복 제거)
+    drug_names = ingredient_query_names(drug_names)
     if not drug_names:
         return []
     
-    vectorstore = get_vectorstore()
     query = f"임부금기 {' '.join(drug_names)}"
     
-    results = vectorstore.similarity_search(
+    results = _search(
         query,
         k=k,
-        filter={"type": "pregnancy_contraindication"}
+        filter={"type": "pregnancy_contraindication"},
+        mode=mode
     )
     
     restrictions = []
@@ -154,27 +414,30 @@ def search_pregnancy_restrictions(drug_names: List[str], k: int = 3) -> List[Dic
     return restrictions
 
 
-def search_elderly_cautions(drug_names: List[str], k: int = 3) -> List[Dict[str, Any]]:
+def search_elderly_cautions(drug_names: List[str], k: int = 3, mode: Optional[str] = None) -> List[Dict[str, Any]]:
     """
     노인주의 검색
     
     Args:
         drug_names: 약물 성분명 리스트
         k: 반환할 최대 결과 수
+        mode: 검색 모드 (vector | hybrid, 기본: 설정값)
     
     Returns:
         관련 노인주의 정보 리스트
     """
+    # 성분 표기 정규화 (한글/영문, 염 형태, "|" 목록 → DUR 대표 표기, 중복 제거)
+    drug_names = ingredient_query_names(drug_names)
     if not drug_names:
         return []
     
-    vectorstore = get_vectorstore()
     query = f"노인주의 {' '.join(drug_names)}"
     
-    results = vectorstore.similarity_search(
+    results = _search(
         query,
         k=k,
-        filter={"type": "elderly_caution"}
+        filter={"type": "elderly_caution"},
+        mode=mode
     )
     
     cautions = []
@@ -189,39 +452,42 @@ def search_elderly_cautions(drug_names: List[str], k: int = 3) -> List[Dict[str,
     return cautions
 
 
-def search_all_safety_info(drug_names: List[str]) -> Dict[str, Any]:
+def search_all_safety_info(drug_names: List[str], mode: Optional[str] = None) -> Dict[str, Any]:
     """
     모든 DUR 안전 정보 통합 검색
     
     Args:
-        drug_names: 약물 성분명 리스트
+        drug_names: 약물 성분명 리스트 (표기가 달라도 성분 사전으로 정규화하여 검색)
+        mode: 검색 모드 (vector | hybrid, 기본: 설정값)
     
     Returns:
         병용금기, 연령금기, 임부금기, 노인주의 정보 통합
     """
+    drug_names = ingredient_query_names(drug_names)
+    mode = resolve_search_mode(mode)
+    k = SAFETY_INFO_K[mode]
     return {
-        "contraindications": search_contraindications(drug_names, k=5),
-        "age_restrictions": search_age_restrictions(drug_names, k=3),
-        "pregnancy_restrictions": search_pregnancy_restrictions(drug_names, k=3),
-        "elderly_cautions": search_elderly_cautions(drug_names, k=3)
+        "contraindications": search_contraindications(drug_names, k=k["contraindications"], mode=mode),
+        "age_restrictions": search_age_restrictions(drug_names, k=k["age_restrictions"], mode=mode),
+        "pregnancy_restrictions": search_pregnancy_restrictions(drug_names, k=k["pregnancy_restrictions"], mode=mode),
+        "elderly_cautions": search_elderly_cautions(drug_names, k=k["elderly_cautions"], mode=mode)
     }
 
 
-def search_by_question(question: str, k: int = 5) -> List[Dict[str, Any]]:
+def search_by_question(question: str, k: int = 5, mode: Optional[str] = None) -> List[Dict[str, Any]]:
     """
     자연어 질문으로 DUR 정보 검색 (챗봇용)
     
     Args:
         question: 사용자 질문
         k: 반환할 최대 결과 수
+        mode: 검색 모드 (vector | hybrid, 기본: 설정값)
     
     Returns:
         관련 DUR 안전 정보 리스트
     """
-    vectorstore = get_vectorstore()
-    
     # 유사도 검색 (타입 필터 없음)
-    results = vectorstore.similarity_search(question, k=k)
+    results = _search(question, k=k, mode=mode)
     
     safety_info = []
     for doc in results:
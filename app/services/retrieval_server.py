@@ -0,0 +1,219 @@
+"""
+공유 검색(임베딩 + 벡터 검색) 사이드카 서버
+
+uvicorn 워커마다 sentence-transformers 모델과 벡터 인덱스를 따로 올리면 워커 수만큼 메모리가 든다.
+이 서버는 모델 1개 + 인덱스 1개만 올리고, 모든 워커의 검색 요청을 Unix 소켓으로 받아
+임베딩 요청을 마이크로 배치(embedding_scheduler)로 묶어 처리한다.
+
+실행:
+    python -m app.services.retrieval_server
+
+.env에 RAG_SERVER_SOCKET=/tmp/pillmate-rag.sock 를 설정하면 rag_service가 자동으로 이 서버를 사용하고,
+서버에 연결할 수 없으면 워커 내부(in-process) 검색으로 대체한다.
+
+프로토콜: 4바이트 빅엔디언 길이 + UTF-8 JSON 메시지 (요청/응답 1:1)
+- {"op": "search", "query": str, "k": int, "filter": dict | null, "mode": str | null}
+  → {"documents": [{"page_content": str, "metadata": dict}, ...]}
+- {"op": "embed", "text": str} → {"embedding": [float, ...]}
+- {"op": "stats"} → {"embedding": 임베딩 스케줄러 배치 통계}
+- {"op": "ping"} → {"ok": true}
+- 오류 시 → {"error": str}
+"""
+import asyncio
+import json
+import os
+import socket
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+
+from langchain.schema import Document
+
+_HEADER = struct.Struct(">I")
+
+# 요청 처리 스레드 수 - 동시에 대기 중인 요청이 많을수록 임베딩 배치가 커진다
+SERVER_HANDLER_THREADS = 32
+
+
+# ============================================================
+# 메시지 프레이밍
+# ============================================================
+
+def _encode(message: dict) -> bytes:
+    payload = json.dumps(message, ensure_ascii=False).encode("utf-8")
+    return _HEADER.pack(len(payload)) + payload
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            raise ConnectionError("검색 서버 연결이 끊어졌습니다.")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+async def _read_message(reader: asyncio.StreamReader) -> dict:
+    (size,) = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+    return json.loads(await reader.readexactly(size))
+
+
+# ============================================================
+# 클라이언트 (uvicorn 워커 측)
+# ============================================================
+
+class RetrievalClient:
+    """검색 서버 클라이언트 (스레드별 연결 재사용)"""
+
+    def __init__(self, socket_path: str, timeout: float = 10.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.socket_path)
+            except OSError:
+                sock.close()
+                raise
+            self._local.sock = sock
+        return sock
+
+    def _close(self) -> None:
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            sock.close()
+            self._local.sock = None
+
+    def request(self, message: dict) -> dict:
+        """요청 1건 전송 후 응답 수신 (연결 오류 시 OSError)"""
+        try:
+            sock = self._connection()
+            sock.sendall(_encode(message))
+            (size,) = _HEADER.unpack(_recv_exactly(sock, _HEADER.size))
+            response = json.loads(_recv_exactly(sock, size))
+        except OSError:
+            self._close()
+            raise
+
+        if "error" in response:
+            raise RuntimeError(f"검색 서버 오류: {response['error']}")
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        return self.request({"op": "stats"})
+
+    def embed(self, text: str) -> List[float]:
+        return self.request({"op": "embed", "text": text})["embedding"]
+
+    def search(
+        self,
+        query: str,
+        k: int,
+        filter: Optional[Dict[str, Any]] = None,
+        mode: Optional[str] = None,
+    ) -> List[Document]:
+        response = self.request({"op": "search", "query": query, "k": k, "filter": filter, "mode": mode})
+        return [
+            Document(page_content=doc["page_content"], metadata=doc["metadata"])
+            for doc in response["documents"]
+        ]
+
+
+# ============================================================
+# 서버
+# ============================================================
+
+class RetrievalServer:
+    def __init__(self, socket_path: str, handler_threads: int = SERVER_HANDLER_THREADS):
+        self.socket_path = socket_path
+        self._executor = ThreadPoolExecutor(max_workers=handler_threads, thread_name_prefix="rag-handler")
+
+    def _handle(self, message: dict) -> dict:
+        from app.services import rag_service
+
+        op = message.get("op")
+        if op == "ping":
+            return {"ok": True}
+        if op == "stats":
+            return {"embedding": rag_service.get_embedding_scheduler().stats()}
+        if op == "embed":
+            return {"embedding": rag_service.embed_query(message["text"])}
+        if op == "search":
+            docs = rag_service.search_documents(
+                message["query"],
+                k=int(message["k"]),
+                filter=message.get("filter"),
+                mode=message.get("mode"),
+            )
+            return {
+                "documents": [
+                    {"page_content": doc.page_content, "metadata": doc.metadata}
+                    for doc in docs
+                ]
+            }
+        return {"error": f"알 수 없는 요청: {op}"}
+
+    def _handle_safely(self, message: dict) -> dict:
+        try:
+            return self._handle(message)
+        except Exception as e:
+            print(f"검색 서버 요청 처리 오류: {e}")
+            return {"error": str(e)}
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                try:
+                    message = await _read_message(reader)
+                except asyncio.IncompleteReadError:
+                    break
+                response = await loop.run_in_executor(self._executor, self._handle_safely, message)
+                writer.write(_encode(response))
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve_forever(self) -> None:
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+        server = await asyncio.start_unix_server(self._serve_connection, path=self.socket_path)
+        print(f"✅ 검색 서버 시작: {self.socket_path}")
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    from app.config import get_settings
+    from app.services import rag_service
+
+    settings = get_settings()
+    if not settings.rag_server_socket:
+        raise SystemExit("RAG_SERVER_SOCKET이 설정되지 않았습니다.")
+
+    # 이 프로세스가 모델/인덱스를 직접 보유 (자기 자신에게 요청을 보내지 않도록)
+    rag_service.disable_retrieval_server()
+    # 모든 워커의 쿼리 임베딩을 마이크로 배치로 처리
+    rag_service.enable_embedding_batching()
+
+    # 모델/인덱스 미리 로드
+    print("⏳ 임베딩 모델 및 인덱스 로드 중...")
+    rag_service.get_vectorstore()
+    if rag_service.resolve_search_mode() == "hybrid":
+        rag_service.get_bm25_index()
+    rag_service.embed_query("워밍업")
+
+    asyncio.run(RetrievalServer(settings.rag_server_socket).serve_forever())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+규칙 기반 스캔 사전 분석
+
+성분 정규화 사전 + DUR 규칙 테이블 + 복용 스케줄만으로 LLM 없이 계산할 수 있는 것:
+- duplicate: 스캔한 약과 복용 중인 약의 공통 성분
+- interaction: 정규 성분 ID 쌍이 DUR 병용금기에 있는 경우
+- timing: 복용 중인 약끼리 성분 중복/병용금기이면서 같은 시간에 복용하는 경우
+- 스캔한 약 성분의 연령금기/임부금기/노인주의 (사용자 나이/임신 여부를 모르므로 안내만)
+
+위 세 위험 유형이 하나도 없고 판정 불가 요소(성분 미상, 병용금기 성분끼리 하나로 합쳐진 성분 ID,
+지병, 규칙 테이블 없음)도 없으면 GPT-4o 호출 없이 MedicationAnalysisResponse 형식의 결과를 바로 만든다.
+무언가 발견되면 LLM이 설명하도록 발견 내용을 프롬프트에 확정 사실로 넣는다.
+"""
+from itertools import combinations
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from app.services.dur_rules import RESTRICTION_LABELS, DurRuleTable, get_dur_rules
+from app.services.ingredient_normalizer import get_ingredient_table, normalize_ingredients
+
+
+class RuleFindings(NamedTuple):
+    duplicates: List[Dict[str, Any]]  # {"medicine", "ingredients"}
+    contraindications: List[Dict[str, Any]]  # {"medicine", "drug_a", "drug_b", "details"}
+    timing_conflicts: List[Dict[str, Any]]  # {"medicines", "times", "reason"}
+    restrictions: List[Dict[str, Any]]  # {"kind", "label", "ingredient", "details"}
+    unknown_medicines: List[str]  # 성분을 알 수 없거나 규칙으로 판정할 수 없어 판정하지 못한 약
+    rules_available: bool
+
+    @property
+    def has_risks(self) -> bool:
+        return bool(self.duplicates or self.contraindications or self.timing_conflicts)
+
+
+def _contraindicated_pairs(rules: DurRuleTable, ids_a: List[str], ids_b: List[str]) -> List[tuple]:
+    pairs = []
+    for a in ids_a:
+        for b in ids_b:
+            if a == b:  # 합쳐진 쌍은 is_ambiguous로 판정 불가 처리 (성분 중복으로는 잡힘)
+                continue
+            details = rules.contraindication(a, b)
+            if details:
+                pairs.append((a, b, details))
+    return pairs
+
+
+def pre_analyze(scanned_med: dict, user_medicines: List[dict]) -> RuleFindings:
+    """스캔한 약 + 복용 중인 약(스케줄 포함) → 규칙 기반 발견 사항"""
+    table = get_ingredient_table()
+    rules = get_dur_rules()
+
+    scanned_ids = normalize_ingredients(scanned_med.get("ingredient") or "")
+    med_ids = {id(med): normalize_ingredients(med.get("ingredient") or "") for med in user_medicines}
+
+    unknown = [scanned_med.get("name") or "촬영한 약"] if not scanned_ids else []
+    unknown += [med.get("name", "알 수 없음") for med in user_medicines if not med_ids[id(med)]]
+
+    # 병용금기인 두 성분이 같은 ID로 합쳐진 약 → 규칙으로 구분할 수 없으므로 판정 불가
+    if rules is not None:
+        if any(rules.is_ambiguous(ingredient_id) for ingredient_id in scanned_ids):
+            unknown.append(scanned_med.get("name") or "촬영한 약")
+        unknown += [
+            med.get("name", "알 수 없음") for med in user_medicines
+            if any(rules.is_ambiguous(ingredient_id) for ingredient_id in med_ids[id(med)])
+        ]
+
+    duplicates, contraindications, timing_conflicts, restrictions = [], [], [], []
+
+    # 스캔한 약 ↔ 복용 중인 약
+    for med in user_medicines:
+        ids = med_ids[id(med)]
+        shared = [ingredient_id for ingredient_id in scanned_ids if ingredient_id in ids]
+        if shared:
+            duplicates.append({
+                "medicine": med.get("name", "알 수 없음"),
+                "ingredients": [table.display_name(ingredient_id) for ingredient_id in shared],
+            })
+        if rules is not None:
+            for a, b, details in _contraindicated_pairs(rules, scanned_ids, ids):
+                contraindications.append({
+                    "medicine": med.get("name", "알 수 없음"),
+                    "drug_a": table.display_name(a),
+                    "drug_b": table.display_name(b),
+                    "details": details,
+                })
+
+    # 복용 중인 약끼리: 같은 시간에 복용하는 성분 중복/병용금기
+    for med_a, med_b in combinations(user_medicines, 2):
+        times_a = {s.get("time") for s in med_a.get("schedules") or [] if s.get("time")}
+        times_b = {s.get("time") for s in med_b.get("schedules") or [] if s.get("time")}
+        overlap = sorted(times_a & times_b)
+        if not overlap:
+            continue
+
+        ids_a, ids_b = med_ids[id(med_a)], med_ids[id(med_b)]
+        reason = None
+        shared = [ingredient_id for ingredient_id in ids_a if ingredient_id in ids_b]
+        if shared:
+            reason = f"성분 중복 ({', '.join(table.display_name(i) for i in shared)})"
+        elif rules is not None:
+            pairs = _contraindicated_pairs(rules, ids_a, ids_b)
+            if pairs:
+                a, b, _ = pairs[0]
+                reason = f"병용금기 ({table.display_name(a)} + {table.display_name(b)})"
+        if reason:
+            timing_conflicts.append({
+                "medicines": [med_a.get("name", "알 수 없음"), med_b.get("name", "알 수 없음")],
+                "times": overlap,
+                "reason": reason,
+            })
+
+    # 스캔한 약 성분의 사용 제한
+    if rules is not None:
+        for ingredient_id in scanned_ids:
+            for kind, details in rules.restrictions_for(ingredient_id).items():
+                restrictions.append({
+                    "kind": kind,
+                    "label": RESTRICTION_LABELS[kind],
+                    "ingredient": table.display_name(ingredient_id),
+                    "details": details,
+                })
+
+    return RuleFindings(
+        duplicates, contraindications, timing_conflicts, restrictions, unknown, rules_available=rules is not None
+    )
+
+
+def can_skip_llm(findings: RuleFindings, medical_conditions: Optional[List[str]] = None) -> bool:
+    """
+    LLM 없이 규칙 기반 결과로 충분한지
+
+    지병이 있으면 약-질환 적합성은 규칙으로 판단할 수 없으므로 LLM을 사용한다.
+    """
+    return (
+        findings.rules_available
+        and not findings.unknown_medicines
+        and not findings.has_risks
+        and not medical_conditions
+    )
+
+
+def findings_context(findings: RuleFindings) -> str:
+    """LLM 프롬프트에 넣을 규칙 기반 확정 사항"""
+    lines = []
+    for item in findings.duplicates:
+        lines.append(f"- [duplicate] {item['medicine']}: {', '.join(item['ingredients'])}")
+    for item in findings.contraindications:
+        lines.append(f"- [interaction] {item['medicine']}: {item['drug_a']} + {item['drug_b']} 병용금기 - {item['details'][0]}")
+    for item in findings.timing_conflicts:
+        lines.append(f"- [timing] {' / '.join(item['medicines'])}: {', '.join(item['times'])}에 함께 복용, {item['reason']}")
+    if not lines:
+        return ""
+    return "\n\n**규칙 기반 확정 사항 (성분 사전/DUR 기준, 반드시 해당 type의 riskItems로 반영):**\n" + "\n".join(lines)
+
+
+def build_rule_based_result(scanned_med: dict, user_medicines: List[dict], findings: RuleFindings) -> Dict[str, Any]:
+    """위험 요소가 없는 경우의 분석 결과 (analyze_with_ai 결과와 같은 형식)"""
+    name = scanned_med.get("name") or "촬영한 약"
+
+    if user_medicines:
+        summary = f"**{name}**은(는) 현재 복용 중인 약과 **성분 중복이나 병용금기가 확인되지 않았습니다**."
+    else:
+        summary = f"현재 복용 중인 다른 약이 없어 **{name}**을(를) 함께 복용할 때의 위험 요소는 없습니다."
+
+    warnings = []
+    sections = [{
+        "icon": "time",
+        "title": "복용 안내",
+        "content": "• 제품 설명서의 **용법·용량**을 지켜 복용하세요.\n• 복용 후 이상 반응이 나타나면 복용을 중단하고 약사와 상담하세요.",
+    }]
+
+    if findings.restrictions:
+        summary += " 다만 일부 대상에게는 **사용 주의**가 필요합니다."
+        lines = []
+        for item in findings.restrictions:
+            warnings.append(f"{item['ingredient']}: {item['label']} 성분입니다.")
+            lines.append(f"• **{item['label']}** ({item['ingredient']}): {item['details'][0]}")
+        sections.append({
+            "icon": "alert-circle",
+            "title": "주의 대상",
+            "content": "\n".join(lines),
+        })
+
+    return {
+        "overallRiskScore": 1 if findings.restrictions else 0,
+        "riskLevel": "low",
+        "riskItems": [],
+        "warnings": warnings,
+        "summary": summary,
+        "sections": sections,
+    }
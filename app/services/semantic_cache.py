@@ -0,0 +1,160 @@
+"""
+챗봇 시맨틱 답변 캐시 (opt-in: CHAT_SEMANTIC_CACHE_ENABLED)
+
+챗봇 질문의 상당수는 같은 FAQ를 다르게 표현한 것이다 ("타이레놀 하루 최대 몇 알?" / "타이레놀 최대 복용량").
+RAG 검색에 쓰는 다국어 임베딩 모델로 질문을 임베딩하고, 이전 답변 중 코사인 유사도가 임계값 이상인
+질문의 답변을 GPT-4o 호출 없이 돌려준다.
+
+- 대상: 첫 질문(대화 이력 없음) + 사용자 정보(복용 약/지병) 없음 → 답변이 사용자와 무관한 경우만
+- 저장소: 메모리 (임베딩 행렬 1개에 행렬-벡터 곱 1회로 최근접 검색), LRU + TTL 제거
+- DUR 인덱스 버전이 바뀌면 이전 버전 답변은 사용하지 않음 (RAG 컨텍스트가 달라짐)
+- 통계: 히트율, 절약한 토큰 수 (/metrics)
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import get_settings
+
+settings = get_settings()
+
+
+class _Entry:
+    __slots__ = ("question", "answer", "metadata", "version", "expires_at")
+
+    def __init__(self, question: str, answer: str, metadata: Dict[str, Any], version: Any, expires_at: float):
+        self.question = question
+        self.answer = answer
+        self.metadata = metadata
+        self.version = version
+        self.expires_at = expires_at
+
+
+class SemanticAnswerCache:
+    """정규화 임베딩 기반 근사 질문 → 답변 캐시 (스레드 안전)"""
+
+    def __init__(self, threshold: float = 0.95, max_entries: int = 1000, ttl_seconds: float = 86400):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()  # 오래 사용 안 한 순서
+        self._vectors: Dict[int, np.ndarray] = {}
+        self._next_id = 0
+
+        # 최근접 검색용 행렬 (항목이 바뀌면 다시 쌓음)
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_ids: List[int] = []
+
+        self._hits = 0
+        self._misses = 0
+        self._stores = 0
+        self._evictions = 0
+        self._tokens_saved = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, entry_id: int) -> None:
+        del self._entries[entry_id]
+        del self._vectors[entry_id]
+        self._matrix = None
+
+    def _evict_stale(self, version: Any) -> None:
+        """만료/다른 버전 항목 제거 (최근접 항목 하나만 확인하면 그 뒤에 가려진 유효 항목을 놓침)"""
+        now = time.monotonic()
+        stale = [i for i, entry in self._entries.items() if entry.expires_at <= now or entry.version != version]
+        for entry_id in stale:
+            self._remove(entry_id)
+        self._evictions += len(stale)
+
+    def _nearest(self, vector: np.ndarray) -> Tuple[Optional[int], float]:
+        if not self._entries:
+            return None, 0.0
+        if self._matrix is None:
+            self._matrix_ids = list(self._vectors)
+            self._matrix = np.stack([self._vectors[i] for i in self._matrix_ids])
+        scores = self._matrix @ vector
+        best = int(np.argmax(scores))
+        return self._matrix_ids[best], float(scores[best])
+
+    def lookup(self, embedding: List[float], version: Any = None) -> Optional[Tuple[str, Dict[str, Any], float]]:
+        """가장 가까운 질문의 (답변, 원래 메타데이터, 유사도) - 임계값 미만/만료/다른 버전이면 None"""
+        vector = np.asarray(embedding, dtype=np.float32)
+        with self._lock:
+            self._evict_stale(version)
+            entry_id, score = self._nearest(vector)
+            entry = self._entries.get(entry_id) if entry_id is not None else None
+
+            if entry is None or score < self.threshold:
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(entry_id)
+            self._hits += 1
+            self._tokens_saved += entry.metadata.get("tokens_used") or 0
+            return entry.answer, entry.metadata, score
+
+    def store(self, question: str, embedding: List[float], answer: str, metadata: Dict[str, Any], version: Any = None) -> None:
+        """답변 저장 (임계값 이상으로 가까운 기존 질문은 교체, 최대 개수 초과 시 LRU 제거)"""
+        vector = np.asarray(embedding, dtype=np.float32)
+        with self._lock:
+            self._evict_stale(version)
+            entry_id, score = self._nearest(vector)
+            if entry_id is not None and score >= self.threshold:
+                self._remove(entry_id)
+
+            self._next_id += 1
+            self._entries[self._next_id] = _Entry(
+                question, answer, metadata, version, time.monotonic() + self.ttl_seconds
+            )
+            self._vectors[self._next_id] = vector
+            self._matrix = None
+            self._stores += 1
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "threshold": self.threshold,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "stores": self._stores,
+                "evictions": self._evictions,
+                "tokens_saved": self._tokens_saved,
+            }
+
+
+_cache: Optional[SemanticAnswerCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_answer_cache() -> Optional[SemanticAnswerCache]:
+    """챗봇 답변 캐시 (싱글톤, 비활성화 시 None)"""
+    global _cache
+    if not settings.chat_semantic_cache_enabled:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = SemanticAnswerCache(
+                threshold=settings.chat_semantic_cache_threshold,
+                max_entries=settings.chat_semantic_cache_max_entries,
+                ttl_seconds=settings.chat_semantic_cache_ttl_seconds,
+            )
+    return _cache
+
+
+def get_answer_cache_stats() -> Optional[Dict[str, Any]]:
+    cache = get_answer_cache()
+    return cache.stats() if cache is not None else None
@@ -0,0 +1,301 @@
+"""
+주요 라우트 쿼리 실행 계획(EXPLAIN) 확인 스크립트
+
+라우트가 실행하는 조회와 같은 모양의 쿼리를 EXPLAIN (ANALYZE, BUFFERS)로 실행하여
+복합 인덱스(alembic 3f9c2a7d1b04)를 사용하는지 확인합니다. 인덱스를 쓰지 않는 쿼리가 있으면 종료 코드 1.
+
+- 작은 테이블에서는 플래너가 인덱스 대신 순차 스캔을 고르므로 --seed로 대량 데이터를 만든 뒤 확인
+  (시드 데이터는 explain-seed-* 사용자에 속하며 --cleanup으로 삭제)
+- 확인 대상 사용자는 시드 사용자 중 하나 (시드가 없으면 --user-id)
+
+사용법:
+    alembic upgrade head
+    python scripts/explain_hot_queries.py --seed --users 5000
+    python scripts/explain_hot_queries.py              # 이미 시드된 데이터로 다시 확인
+    python scripts/explain_hot_queries.py --verbose    # 실행 계획 전체 출력
+    python scripts/explain_hot_queries.py --cleanup
+"""
+import argparse
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+# 프로젝트 루트를 파이썬 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import inspect, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import Select
+
+from app.database import engine
+from app.models.chat_history import ChatHistory
+from app.models.medicine import Medicine
+from app.models.schedule import Schedule
+
+SEED_PREFIX = "explain-seed-"
+
+INDEX_NODE_TYPES = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+
+class HotQuery(NamedTuple):
+    name: str
+    route: str
+    index: str
+    table: str
+    build: Callable[[dict], Select]  # 대상(사용자/세션/약 ID) → 라우트와 같은 모양의 쿼리
+
+
+# 라우트 쿼리와 같은 조건/정렬 (라우트의 조회 조건을 바꾸면 함께 갱신)
+HOT_QUERIES = [
+    HotQuery(
+        "대화 이력 (세션)",
+        "POST /chat, /chat/stream",
+        "ix_chat_histories_user_session_created",
+        "chat_histories",
+        lambda target: select(ChatHistory).where(
+            ChatHistory.user_id == target["user_id"],
+            ChatHistory.session_id == target["session_id"],
+        ).order_by(ChatHistory.created_at, ChatHistory.id),
+    ),
+    HotQuery(
+        "복용 중인 약 목록",
+        "GET /medicines, POST /chat, /analysis/scan",
+        "ix_medicines_user_active",
+        "medicines",
+        lambda target: select(Medicine).where(
+            Medicine.user_id == target["user_id"],
+            Medicine.is_active == True,
+        ),
+    ),
+    HotQuery(
+        "오늘의 스케줄",
+        "GET /schedules/today",
+        "ix_schedules_user_active_dates",
+        "schedules",
+        lambda target: select(Schedule).where(
+            Schedule.user_id == target["user_id"],
+            Schedule.is_active == True,
+            Schedule.start_date <= target["now"],
+            Schedule.end_date >= target["now"],
+        ),
+    ),
+    HotQuery(
+        "약별 스케줄 (selectinload)",
+        "POST /analysis/scan, /analysis/scan/batch",
+        "ix_schedules_medicine_id",
+        "schedules",
+        lambda target: select(Schedule).where(
+            Schedule.medicine_id.in_(target["medicine_ids"]),
+            Schedule.is_active == True,
+        ),
+    ),
+]
+
+
+# ============================================================
+# 시드 데이터
+# ============================================================
+
+SEED_STATEMENTS = [
+    ("users", """
+        INSERT INTO users (email, username, hashed_password, is_active, is_superuser, created_at, updated_at)
+        SELECT CAST(:prefix AS text) || g || '@seed.local', CAST(:prefix AS text) || g, '-', true, false, now(), now()
+        FROM generate_series(1, :users) AS g
+    """),
+    # 사용자당 약 N개 (5개 중 1개는 삭제된 약)
+    ("medicines", """
+        INSERT INTO medicines (user_id, name, ingredient, amount, is_active, created_at, updated_at)
+        SELECT u.id, '시드약 ' || m, '시드성분 ' || (m % 50), '100mg', m % 5 <> 0, now(), now()
+        FROM users u CROSS JOIN generate_series(1, :medicines) AS m
+        WHERE u.email LIKE CAST(:prefix AS text) || '%'
+    """),
+    # 약당 스케줄 3개 (1개는 삭제된 스케줄), 복용 기간은 약마다 다르게 (일부만 오늘 포함)
+    ("schedules", """
+        INSERT INTO schedules (user_id, medicine_id, medicine_name, dose_count, dose_time,
+                               start_date, end_date, is_active, created_at, updated_at)
+        SELECT m.user_id, m.id, m.name, 1, make_time(8 + 6 * s, 0, 0),
+               now() - make_interval(days => m.id % 60),
+               now() + make_interval(days => m.id % 60 - 30),
+               s <> 2, now(), now()
+        FROM medicines m
+        JOIN users u ON u.id = m.user_id
+        CROSS JOIN generate_series(0, 2) AS s
+        WHERE u.email LIKE CAST(:prefix AS text) || '%'
+    """),
+    # 사용자당 세션 N개 × 메시지 M개
+    ("chat_histories", """
+        INSERT INTO chat_histories (user_id, role, content, session_id, created_at)
+        SELECT u.id,
+               (CASE WHEN n % 2 = 1 THEN 'USER' ELSE 'ASSISTANT' END)::messagerole,
+               '시드 메시지 ' || n,
+               CAST(:prefix AS text) || u.id || '-' || s,
+               now() - make_interval(mins => :messages - n)
+        FROM users u
+        CROSS JOIN generate_series(1, :sessions) AS s
+        CROSS JOIN generate_series(1, :messages) AS n
+        WHERE u.email LIKE CAST(:prefix AS text) || '%'
+    """),
+]
+
+
+def seed(conn: Connection, users: int, medicines: int, sessions: int, messages: int) -> None:
+    existing = conn.execute(
+        text("SELECT count(*) FROM users WHERE email LIKE CAST(:prefix AS text) || '%'"), {"prefix": SEED_PREFIX}
+    ).scalar()
+    if existing:
+        print(f"⚠️  시드 사용자 {existing}명이 이미 있습니다. 다시 만들려면 --cleanup 후 실행하세요.")
+        return
+
+    params = {"prefix": SEED_PREFIX, "users": users, "medicines": medicines, "sessions": sessions, "messages": messages}
+    for table, statement in SEED_STATEMENTS:
+        started = datetime.now()
+        rows = conn.execute(text(statement), params).rowcount
+        print(f"  {table}: {rows:,}행 ({(datetime.now() - started).total_seconds():.1f}초)")
+
+
+def cleanup(conn: Connection) -> None:
+    params = {"prefix": SEED_PREFIX}
+    seed_users = "SELECT id FROM users WHERE email LIKE CAST(:prefix AS text) || '%'"
+    for table in ("chat_histories", "schedules", "medicines"):
+        rows = conn.execute(text(f"DELETE FROM {table} WHERE user_id IN ({seed_users})"), params).rowcount
+        print(f"  {table}: {rows:,}행 삭제")
+    rows = conn.execute(text("DELETE FROM users WHERE email LIKE CAST(:prefix AS text) || '%'"), params).rowcount
+    print(f"  users: {rows:,}행 삭제")
+
+
+# ============================================================
+# EXPLAIN
+# ============================================================
+
+def pick_target(conn: Connection, user_id: Optional[int]) -> Optional[dict]:
+    """확인 대상 사용자 (기본: 시드 사용자 중 가운데) + 세션 + 활성 약 ID"""
+    if user_id is None:
+        user_id = conn.execute(text(
+            "SELECT id FROM users WHERE email LIKE CAST(:prefix AS text) || '%' ORDER BY id "
+            "OFFSET (SELECT count(*) / 2 FROM users WHERE email LIKE CAST(:prefix AS text) || '%') LIMIT 1"
+        ), {"prefix": SEED_PREFIX}).scalar()
+        if user_id is None:
+            return None
+
+    session_id = conn.execute(
+        select(ChatHistory.session_id).where(ChatHistory.user_id == user_id).limit(1)
+    ).scalar()
+    medicine_ids = conn.execute(
+        select(Medicine.id).where(Medicine.user_id == user_id, Medicine.is_active == True)
+    ).scalars().all()
+    return {
+        "user_id": user_id,
+        "session_id": session_id or "",
+        "medicine_ids": medicine_ids or [0],
+        "now": datetime.now(),
+    }
+
+
+def plan_nodes(plan: dict) -> List[dict]:
+    nodes = [plan]
+    for child in plan.get("Plans", []):
+        nodes.extend(plan_nodes(child))
+    return nodes
+
+
+def explain(conn: Connection, statement: Select) -> dict:
+    compiled = statement.compile(conn, compile_kwargs={"render_postcompile": True})
+    row = conn.exec_driver_sql(
+        "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + str(compiled), compiled.params
+    ).scalar()
+    result = row if isinstance(row, list) else json.loads(row)
+    return result[0]
+
+
+def check_query(conn: Connection, query: HotQuery, target: dict, verbose: bool) -> bool:
+    result = explain(conn, query.build(target))
+    nodes = plan_nodes(result["Plan"])
+    index_nodes = [node for node in nodes if node.get("Node Type") in INDEX_NODE_TYPES]
+    used = {node.get("Index Name") for node in index_nodes}
+    ok = query.index in used
+
+    scans = ", ".join(
+        f"{node['Node Type']}" + (f" ({node['Index Name']})" if node.get("Index Name") else "")
+        for node in nodes if "Scan" in node.get("Node Type", "")
+    )
+    print(f"\n{'✅' if ok else '❌'} {query.name} [{query.route}]")
+    print(f"   기대 인덱스: {query.index}")
+    print(f"   스캔: {scans}")
+    print(f"   실행 시간: {result.get('Execution Time', 0):.3f}ms, 계획 시간: {result.get('Planning Time', 0):.3f}ms")
+    if verbose or not ok:
+        print(json.dumps(result["Plan"], ensure_ascii=False, indent=2))
+    return ok
+
+
+def missing_indexes(conn: Connection) -> List[str]:
+    inspector = inspect(conn)
+    existing: Dict[str, set] = {}
+    for table in {query.table for query in HOT_QUERIES}:
+        existing[table] = {index["name"] for index in inspector.get_indexes(table)}
+    return [query.index for query in HOT_QUERIES if query.index not in existing[query.table]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="주요 라우트 쿼리 인덱스 사용 확인 (EXPLAIN)")
+    parser.add_argument("--seed", action="store_true", help="대량 시드 데이터 생성 후 확인")
+    parser.add_argument("--users", type=int, default=5000, help="시드 사용자 수")
+    parser.add_argument("--medicines", type=int, default=20, help="시드 사용자당 약 수")
+    parser.add_argument("--sessions", type=int, default=5, help="시드 사용자당 대화 세션 수")
+    parser.add_argument("--messages", type=int, default=40, help="세션당 메시지 수")
+    parser.add_argument("--user-id", type=int, help="확인 대상 사용자 (기본: 시드 사용자)")
+    parser.add_argument("--cleanup", action="store_true", help="시드 데이터 삭제 후 종료")
+    parser.add_argument("--verbose", action="store_true", help="실행 계획 전체 출력")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("주요 라우트 쿼리 실행 계획 확인")
+    print("=" * 70)
+
+    if engine.dialect.name != "postgresql":
+        print(f"❌ PostgreSQL 전용입니다 (현재: {engine.dialect.name})")
+        sys.exit(1)
+
+    if args.cleanup:
+        print("\n🧹 시드 데이터 삭제")
+        with engine.begin() as conn:
+            cleanup(conn)
+        return
+
+    with engine.begin() as conn:
+        missing = missing_indexes(conn)
+        if missing:
+            print(f"\n⚠️  인덱스 없음: {', '.join(missing)} → alembic upgrade head")
+
+        if args.seed:
+            print(f"\n🌱 시드 데이터 생성 (사용자 {args.users:,}명 × 약 {args.medicines}개, "
+                  f"세션 {args.sessions}개 × 메시지 {args.messages}개)")
+            seed(conn, args.users, args.medicines, args.sessions, args.messages)
+
+    # 통계 갱신 (플래너가 시드 데이터 분포를 알도록)
+    with engine.begin() as conn:
+        for table in sorted({query.table for query in HOT_QUERIES}):
+            conn.execute(text(f"ANALYZE {table}"))
+
+    with engine.connect() as conn:
+        target = pick_target(conn, args.user_id)
+        if target is None:
+            print("\n❌ 확인할 사용자가 없습니다. --seed 또는 --user-id를 지정하세요.")
+            sys.exit(1)
+        print(f"\n대상: user_id={target['user_id']}, session_id={target['session_id']}, "
+              f"활성 약 {len(target['medicine_ids'])}개")
+
+        results = [check_query(conn, query, target, args.verbose) for query in HOT_QUERIES]
+
+    failed = results.count(False)
+    print("\n" + "=" * 70)
+    if failed:
+        print(f"❌ {failed}개 쿼리가 기대 인덱스를 사용하지 않습니다")
+        sys.exit(1)
+    print(f"✅ {len(results)}개 쿼리 모두 인덱스 사용")
+
+
+if __name__ == "__main__":
+    main()
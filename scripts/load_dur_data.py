@@ -2,231 +2,1111 @@
 DUR(의약품안전사용서비스) CSV 데이터를 ChromaDB에 로드하는 스크립트
 
 UC-KR 인코딩 CSV → UTF-8 읽기 → 임베딩 생성 → ChromaDB 저장
+
+사용법:
+    # 파이프라인 모드 (기본): 전체 데이터를 스트리밍 + 배치 + 멀티프로세스로 적재
+    # 새 버전 컬렉션(dur_safety_v{N})에 적재한 뒤 활성 버전 포인터를 교체 (blue/green)
+    # 내용 해시 기반 증분 적재 - 바뀌지 않은 행은 활성 버전의 임베딩을 복사, 바뀐 행만 임베딩
+    # 중단 시 같은 새 버전에 이어서 재개, 교체 후 오래된 버전 정리 (--keep-versions)
+    python scripts/load_dur_data.py --batch-size 256 --workers 4
+    # 적재 후 하이브리드 검색용 BM25 인덱스(data/dur_bm25/v{N})도 함께 생성 (--no-bm25로 생략)
+
+    # 적재 후 NumPy 인덱스(data/dur_index/v{N})로 내보내기 (RAG_BACKEND=numpy 용)
+    python scripts/load_dur_data.py --export-numpy --export-dtype float16
+    python scripts/load_dur_data.py --export-only   # 적재 없이 활성 버전 내보내기만
+
+    # 이전 버전으로 되돌리기 (인덱스 파일이 남아 있는 버전만 가능)
+    python scripts/load_dur_data.py --activate 3
+
+    # 레거시 모드: 전체 문서를 메모리에 올린 뒤 Chroma.from_documents 한 번으로 저장
+    python scripts/load_dur_data.py --legacy
 """
+import argparse
 import csv
+import hashlib
+import json
+import math
 import sys
 import os
+import shutil
+import tempfile
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
 from pathlib import Path
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional
 
 # 프로젝트 루트를 파이썬 경로에 추가
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_community.vectorstores import Chroma
 from langchain.schema import Document
 from tqdm import tqdm
 
-# ChromaDB 저장 경로
-CHROMA_DB_PATH = project_root / "data" / "chroma_db"
+from app.services.dur_versions import (
+    CHROMA_DB_PATH,
+    DurIndexVersion,
+    parse_collection_version,
+    read_active_version,
+    write_active_version,
+)
+from app.services.ingredient_normalizer import (
+    IngredientTable,
+    IngredientTableBuilder,
+    clean_ingredient,
+    split_ingredients,
+)
 
 # CSV 파일 경로
 CSV_DIR = project_root / "data" / "rag" / "raw"
 
+# AI Hub 의약품 데이터 경로 (성분 정규화 사전의 한글/영문 표기 연결에 사용)
+AIHUB_DATA_PATH = project_root / "data" / "aihub"
+
+# 파이프라인 모드 진행 상황 체크포인트 (중단 시 재개용)
+CHECKPOINT_PATH = project_root / "data" / "dur_ingest_checkpoint.json"
+
+# NumPy 브루트포스 인덱스(app/services/numpy_index.py)와 BM25 어휘 인덱스(app/services/bm25_index.py)는
+# 버전별 경로(DurIndexVersion.numpy_index_path / bm25_index_path)에 저장
+
+# 활성 버전 교체 후 남겨 둘 최근 버전 수 (활성 버전 포함, 롤백 및 진행 중인 검색용)
+DEFAULT_KEEP_VERSIONS = 2
+
 # 무료 임베딩 모델 (HuggingFace)
 # paraphrase-multilingual-MiniLM-L12-v2: 한국어 지원, 빠름, 무료
-embeddings = HuggingFaceEmbeddings(
-    model_name="sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2",
-    model_kwargs={'device': 'cpu'},
-    encode_kwargs={'normalize_embeddings': True}
-)
+EMBEDDING_MODEL_NAME = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
 
+# 레거시 모드에서만 적용되는 병용금기 건수 제한
+LEGACY_CONTRAINDICATION_LIMIT = 5000
 
-def load_contraindication_csv(file_path: Path) -> list[Document]:
-    """병용금기 CSV 로드"""
-    documents = []
-    
-    print(f"📄 {file_path.name} 로드 중...")
-    
-    with open(file_path, 'r', encoding='cp949') as f:
-        reader = csv.DictReader(f)
-        
-        for row in tqdm(reader, desc="병용금기 데이터 처리"):
-            # 임베딩용 텍스트 생성
-            content = f"""
+# 임베딩 모델 (프로세스별 지연 로딩 - 워커 프로세스에서도 각자 한 번만 로드)
+_embeddings = None
+
+
+def get_embeddings():
+    """임베딩 모델 가져오기 (프로세스별 싱글톤)"""
+    global _embeddings
+    if _embeddings is None:
+        from langchain_community.embeddings import HuggingFaceEmbeddings
+        _embeddings = HuggingFaceEmbeddings(
+            model_name=EMBEDDING_MODEL_NAME,
+            model_kwargs={'device': 'cpu'},
+            encode_kwargs={'normalize_embeddings': True}
+        )
+    return _embeddings
+
+
+def build_contraindication_document(row: dict) -> Document:
+    """병용금기 CSV 행 → Document"""
+    # 임베딩용 텍스트 생성
+    content = f"""
 [병용금기]
 약물 A: {row['성분명A']} ({row['제품명A']})
 약물 B: {row['성분명B']} ({row['제품명B']})
 상세정보: {row['상세정보']}
 고시일자: {row['고시일자']}
 """
-            
-            metadata = {
-                "type": "contraindication",  # 병용금기
-                "drug_a": row['성분명A'],
-                "drug_b": row['성분명B'],
-                "product_a": row['제품명A'],
-                "product_b": row['제품명B'],
-                "detail": row['상세정보'],
-                "date": row['고시일자']
-            }
-            
-            documents.append(Document(
-                page_content=content,
-                metadata=metadata
-            ))
-    
-    return documents
 
+    metadata = {
+        "type": "contraindication",  # 병용금기
+        "drug_a": row['성분명A'],
+        "drug_b": row['성분명B'],
+        "product_a": row['제품명A'],
+        "product_b": row['제품명B'],
+        "detail": row['상세정보'],
+        "date": row['고시일자']
+    }
 
-def load_age_contraindication_csv(file_path: Path) -> list[Document]:
-    """연령금기 CSV 로드"""
-    documents = []
-    
-    print(f"📄 {file_path.name} 로드 중...")
-    
-    with open(file_path, 'r', encoding='cp949') as f:
-        reader = csv.DictReader(f)
-        
-        for row in tqdm(reader, desc="연령금기 데이터 처리"):
-            content = f"""
+    return Document(page_content=content, metadata=metadata)
+
+
+def build_age_contraindication_document(row: dict) -> Document:
+    """연령금기 CSV 행 → Document"""
+    content = f"""
 [연령금기]
 성분명: {row['성분명']}
 제품명: {row['제품명']}
 금기연령: {row.get('금기연령', row.get('제한연령', 'N/A'))}
 상세정보: {row.get('상세정보', row.get('주의내용', ''))}
 """
-            
-            metadata = {
-                "type": "age_contraindication",  # 연령금기
-                "drug": row['성분명'],
-                "product": row['제품명'],
-                "age_restriction": row.get('금기연령', row.get('제한연령', '')),
-                "detail": row.get('상세정보', row.get('주의내용', ''))
-            }
-            
-            documents.append(Document(
-                page_content=content,
-                metadata=metadata
-            ))
-    
-    return documents
 
+    metadata = {
+        "type": "age_contraindication",  # 연령금기
+        "drug": row['성분명'],
+        "product": row['제품명'],
+        "age_restriction": row.get('금기연령', row.get('제한연령', '')),
+        "detail": row.get('상세정보', row.get('주의내용', ''))
+    }
 
-def load_pregnancy_contraindication_csv(file_path: Path) -> list[Document]:
-    """임부금기 CSV 로드"""
-    documents = []
-    
-    print(f"📄 {file_path.name} 로드 중...")
-    
-    with open(file_path, 'r', encoding='cp949') as f:
-        reader = csv.DictReader(f)
-        
-        for row in tqdm(reader, desc="임부금기 데이터 처리"):
-            content = f"""
+    return Document(page_content=content, metadata=metadata)
+
+
+def build_pregnancy_contraindication_document(row: dict) -> Document:
+    """임부금기 CSV 행 → Document"""
+    content = f"""
 [임부금기]
 성분명: {row['성분명']}
 제품명: {row['제품명']}
 금기구분: {row.get('금기구분', '임부금기')}
 상세정보: {row.get('상세정보', row.get('주의내용', ''))}
 """
-            
-            metadata = {
-                "type": "pregnancy_contraindication",  # 임부금기
-                "drug": row['성분명'],
-                "product": row['제품명'],
-                "restriction_type": row.get('금기구분', '임부금기'),
-                "detail": row.get('상세정보', row.get('주의내용', ''))
-            }
-            
-            documents.append(Document(
-                page_content=content,
-                metadata=metadata
-            ))
-    
-    return documents
 
+    metadata = {
+        "type": "pregnancy_contraindication",  # 임부금기
+        "drug": row['성분명'],
+        "product": row['제품명'],
+        "restriction_type": row.get('금기구분', '임부금기'),
+        "detail": row.get('상세정보', row.get('주의내용', ''))
+    }
 
-def load_elderly_caution_csv(file_path: Path) -> list[Document]:
-    """노인주의 CSV 로드"""
-    documents = []
-    
-    print(f"📄 {file_path.name} 로드 중...")
-    
-    with open(file_path, 'r', encoding='cp949') as f:
-        reader = csv.DictReader(f)
-        
-        for row in tqdm(reader, desc="노인주의 데이터 처리"):
-            content = f"""
+    return Document(page_content=content, metadata=metadata)
+
+
+def build_elderly_caution_document(row: dict) -> Document:
+    """노인주의 CSV 행 → Document"""
+    content = f"""
 [노인주의]
 성분명: {row['성분명']}
 제품명: {row['제품명']}
 상세정보: {row.get('상세정보', row.get('주의내용', ''))}
 """
-            
-            metadata = {
-                "type": "elderly_caution",  # 노인주의
-                "drug": row['성분명'],
-                "product": row['제품명'],
-                "detail": row.get('상세정보', row.get('주의내용', ''))
-            }
-            
-            documents.append(Document(
-                page_content=content,
-                metadata=metadata
-            ))
-    
-    return documents
 
+    metadata = {
+        "type": "elderly_caution",  # 노인주의
+        "drug": row['성분명'],
+        "product": row['제품명'],
+        "detail": row.get('상세정보', row.get('주의내용', ''))
+    }
+
+    return Document(page_content=content, metadata=metadata)
+
+
+class DurSource(NamedTuple):
+    """DUR CSV 소스 정의"""
+    key: str  # 문서 ID 접두어
+    label: str  # 로그 출력용 이름
+    file_name: str
+    build_document: Callable[[dict], Document]
+    ingredient_fields: tuple[str, ...]  # 그룹 키로 쓰는 성분 메타데이터 필드
+    product_columns: dict[str, str]  # 제품명 메타데이터 필드 → CSV 컬럼 (그룹 내 집계 대상, ingredient_fields와 같은 순서)
+    date_column: Optional[str] = None  # 그룹 내 최신 값으로 집계할 날짜 컬럼
+    ingredient_columns: tuple[tuple[str, str], ...] = (("성분명", "성분코드"),)  # (성분명, 성분코드) CSV 컬럼 - 성분 사전용
+
+
+# 문서 metadata["type"] 값 목록
+DOCUMENT_TYPES = [
+    "contraindication",
+    "pregnancy_contraindication",
+    "age_contraindication",
+    "elderly_caution",
+]
+
+# 적재 순서 = 중요도 순서 (병용금기가 가장 중요)
+DUR_SOURCES = [
+    DurSource(
+        "contraindication", "병용금기",
+        "의약품안전사용서비스(DUR)_병용금기 품목리스트 2025.6.csv",
+        build_contraindication_document,
+        ("drug_a", "drug_b"),
+        {"product_a": "제품명A", "product_b": "제품명B"},
+        "고시일자",
+        (("성분명A", "성분코드A"), ("성분명B", "성분코드B")),
+    ),
+    DurSource(
+        "pregnancy", "임부금기",
+        "의약품안전사용서비스(DUR)_임부금기 품목리스트 2025.6.csv",
+        build_pregnancy_contraindication_document,
+        ("drug",),
+        {"product": "제품명"},
+    ),
+    DurSource(
+        "age", "연령금기",
+        "의약품안전사용서비스(DUR)_연령금기 품목리스트 2025.6.csv",
+        build_age_contraindication_document,
+        ("drug",),
+        {"product": "제품명"},
+    ),
+    DurSource(
+        "elderly", "노인주의",
+        "의약품안전사용서비스(DUR)_노인주의 품목리스트 2025.6.csv",
+        build_elderly_caution_document,
+        ("drug",),
+        {"product": "제품명"},
+    ),
+    DurSource(
+        "elderly_nsaid", "노인주의(해열진통소염제)",
+        "의약품안전사용서비스(DUR)_노인주의(해열진통소염제) 품목리스트 2025.6.csv",
+        build_elderly_caution_document,
+        ("drug",),
+        {"product": "제품명"},
+    ),
+]
+
+
+def iter_csv_rows(file_path: Path) -> Iterator[dict]:
+    """CSV 행을 한 줄씩 스트리밍 (cp949)"""
+    with open(file_path, 'r', encoding='cp949') as f:
+        yield from csv.DictReader(f)
+
+
+def _load_csv(file_path: Path, label: str, build_document: Callable[[dict], Document]) -> list[Document]:
+    print(f"📄 {file_path.name} 로드 중...")
+    return [
+        build_document(row)
+        for row in tqdm(iter_csv_rows(file_path), desc=f"{label} 데이터 처리")
+    ]
+
+
+def load_contraindication_csv(file_path: Path) -> list[Document]:
+    """병용금기 CSV 로드"""
+    return _load_csv(file_path, "병용금기", build_contraindication_document)
+
+
+def load_age_contraindication_csv(file_path: Path) -> list[Document]:
+    """연령금기 CSV 로드"""
+    return _load_csv(file_path, "연령금기", build_age_contraindication_document)
+
+
+def load_pregnancy_contraindication_csv(file_path: Path) -> list[Document]:
+    """임부금기 CSV 로드"""
+    return _load_csv(file_path, "임부금기", build_pregnancy_contraindication_document)
+
+
+def load_elderly_caution_csv(file_path: Path) -> list[Document]:
+    """노인주의 CSV 로드"""
+    return _load_csv(file_path, "노인주의", build_elderly_caution_document)
+
+
+# ============================================================
+# 파이프라인 모드: 스트리밍 → 배치 임베딩(멀티프로세스) → 청크 단위 upsert
+# ============================================================
+
+class DurRecord(NamedTuple):
+    """ChromaDB에 저장할 레코드 1건"""
+    id: str  # "{소스 키}-{내용 해시}" - 내용이 같으면 항상 같은 ID
+    text: str
+    metadata: dict
+    seq: int  # 전체 스트림 내 순번 (체크포인트 기준)
+
+
+def content_hash(text: str, metadata: dict) -> str:
+    """문서 내용 + 메타데이터 기반 안정적 해시"""
+    payload = json.dumps({"text": text, "metadata": metadata}, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+# ----- 중복 제거 (그룹핑) -----
+# 병용금기/임부금기 CSV는 제품 단위 행이라 같은 성분 조합 + 같은 상세정보가 수백 번 반복됨
+# → (type, 정규화된 성분, 상세정보 등 나머지 필드) 기준으로 묶어 문서 1건으로 저장, 제품명은 메타데이터에 집계
+
+# 본문(임베딩 텍스트)에 노출할 제품명 수 - 나머지는 "외 N개"로 요약
+CONTENT_PRODUCT_LIMIT = 3
+
+# 그룹핑 파티션 1개에 해당하는 원본 CSV 크기 - 이보다 큰 파일은 임시 파일로 나눠 파티션별로 그룹핑
+DEDUP_PARTITION_BYTES = 64 * 1024 * 1024
+
+
+def ingredient_ids(source: DurSource, doc: Document, table: Optional[IngredientTable] = None) -> tuple:
+    """문서의 성분 필드별 정규 성분 ID (source.ingredient_fields 순서)"""
+    normalize = table.normalize if table is not None else clean_ingredient
+    return tuple(normalize(doc.metadata[field]) for field in source.ingredient_fields)
+
+
+def group_key(source: DurSource, doc: Document, table: Optional[IngredientTable] = None) -> tuple:
+    """중복 판정 키: (type, 정규 성분 ID, 제품명/날짜를 제외한 나머지 메타데이터)"""
+    metadata = doc.metadata
+    ingredients = ingredient_ids(source, doc, table)
+    if len(ingredients) == 2:
+        ingredients = tuple(sorted(ingredients))  # A+B == B+A
+
+    excluded = set(source.ingredient_fields) | set(source.product_columns) | {"type", "date"}
+    rest = tuple(
+        (field, " ".join(str(value).split()))
+        for field, value in sorted(metadata.items())
+        if field not in excluded
+    )
+    return metadata["type"], ingredients, rest
+
+
+def summarize_products(names: list[str]) -> str:
+    """본문용 제품명 요약 (예: "타이레놀정, 게보린정, 펜잘정 외 12개")"""
+    summary = ", ".join(names[:CONTENT_PRODUCT_LIMIT])
+    if len(names) > CONTENT_PRODUCT_LIMIT:
+        summary += f" 외 {len(names) - CONTENT_PRODUCT_LIMIT}개"
+    return summary
+
+
+def _group_rows(
+    source: DurSource,
+    rows: Iterable[dict],
+    stats: dict,
+    table: Optional[IngredientTable] = None,
+) -> Iterator[Document]:
+    """행 목록을 그룹핑하여 중복 제거된 Document 생성 (메모리는 그룹 수에 비례)"""
+    groups: dict[tuple, dict] = {}
+
+    for row in rows:
+        doc = source.build_document(row)
+        stats["rows"] += 1
+
+        ingredients = ingredient_ids(source, doc, table)
+        group = groups.setdefault(group_key(source, doc, table), {
+            "row": row,
+            "ingredients": ingredients,  # 문서에 쓰는 A/B 방향 (첫 행 기준)
+            "row_count": 0,
+            "products": {field: {} for field in source.product_columns},
+            "date": "",
+        })
+        group["row_count"] += 1
+
+        # B/A 방향으로 적힌 행은 제품명도 바꿔서 집계 (product_a ↔ product_b, 성분 필드와 같은 순서)
+        fields = list(source.product_columns)
+        if len(ingredients) == 2 and ingredients != group["ingredients"] and ingredients[::-1] == group["ingredients"]:
+            fields.reverse()
+        for field, target in zip(source.product_columns, fields):
+            if doc.metadata[field]:
+                group["products"][target][doc.metadata[field]] = None  # 순서 유지 + 중복 제거
+        if source.date_column:
+            group["date"] = max(group["date"], row.get(source.date_column) or "")
+
+    for group in groups.values():
+        row = dict(group["row"])
+        products = {field: list(names) for field, names in group["products"].items()}
+        for field, column in source.product_columns.items():
+            row[column] = summarize_products(products[field])
+        if source.date_column:
+            row[source.date_column] = group["date"]
+
+        doc = source.build_document(row)
+        for field in source.product_columns:
+            doc.metadata[field] = "|".join(products[field])
+        doc.metadata["row_count"] = group["row_count"]
+        yield doc
+
+
+def _iter_jsonl(path: Path) -> Iterator[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def iter_grouped_documents(
+    source: DurSource,
+    file_path: Path,
+    stats: dict,
+    table: Optional[IngredientTable] = None,
+) -> Iterator[Document]:
+    """
+    CSV 한 파일을 그룹핑하여 중복 제거된 Document 생성
+
+    같은 그룹의 행이 파일 곳곳에 흩어져 있어 그룹을 다 모으기 전에는 문서를 내보낼 수 없다.
+    파일이 DEDUP_PARTITION_BYTES보다 크면 그룹 키 해시로 행을 임시 파일(파티션)에 나눠 쓴 뒤
+    파티션별로 그룹핑 → 메모리는 파티션 1개(원본 약 DEDUP_PARTITION_BYTES 분량)의 그룹 수로 제한된다.
+    같은 그룹은 항상 같은 파티션에 들어가므로 중복 제거 결과는 같고, 문서 순서도 실행마다 같다 (체크포인트 재개).
+    """
+    partitions = max(1, math.ceil(file_path.stat().st_size / DEDUP_PARTITION_BYTES))
+    if partitions == 1:
+        yield from _group_rows(source, iter_csv_rows(file_path), stats, table)
+        return
+
+    with tempfile.TemporaryDirectory(prefix="dur-dedup-") as tmp_dir:
+        paths = [Path(tmp_dir) / f"part-{index}.jsonl" for index in range(partitions)]
+        files = [open(path, "w", encoding="utf-8") for path in paths]
+        try:
+            for row in iter_csv_rows(file_path):
+                key = group_key(source, source.build_document(row), table)
+                digest = hashlib.sha256(repr(key).encode("utf-8")).digest()
+                partition = int.from_bytes(digest[:4], "big") % partitions
+                files[partition].write(json.dumps(row, ensure_ascii=False) + "\n")
+        finally:
+            for f in files:
+                f.close()
+
+        for path in paths:
+            yield from _group_rows(source, _iter_jsonl(path), stats, table)
+            path.unlink()
+
+
+def iter_dur_records(
+    dedup: bool = True,
+    stats: Optional[dict] = None,
+    table: Optional[IngredientTable] = None,
+) -> Iterator[DurRecord]:
+    """
+    모든 DUR CSV를 읽어 레코드 생성
+
+    - dedup=True: 파일 단위로 그룹핑하여 중복 행을 문서 1건으로 병합 (성분은 table로 정규화,
+      큰 파일은 파티션으로 나눠 그룹핑 - iter_grouped_documents)
+    - dedup=False: 행 단위로 스트리밍 (행 1개 = 문서 1개)
+    """
+    if stats is None:
+        stats = {}
+    stats.setdefault("rows", 0)
+    stats.setdefault("documents", 0)
+
+    seq = 0
+    for source in DUR_SOURCES:
+        file_path = CSV_DIR / source.file_name
+        if not file_path.exists():
+            print(f"⚠️  {source.label} 파일 없음: {file_path.name}")
+            continue
+
+        print(f"📄 {source.label}: {file_path.name}")
+        if dedup:
+            documents = iter_grouped_documents(source, file_path, stats, table)
+        else:
+            documents = (source.build_document(row) for row in iter_csv_rows(file_path))
+
+        for doc in documents:
+            if not dedup:
+                stats["rows"] += 1
+            stats["documents"] += 1
+            yield DurRecord(
+                id=f"{source.key}-{content_hash(doc.page_content, doc.metadata)}",
+                text=doc.page_content,
+                metadata=doc.metadata,
+                seq=seq,
+            )
+            seq += 1
+
+
+def iter_batches(records: Iterator[DurRecord], batch_size: int) -> Iterator[list[DurRecord]]:
+    """레코드 스트림을 batch_size 단위 리스트로 분할"""
+    while True:
+        batch = list(islice(records, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+# ----- 증분 적재 / 체크포인트 -----
+
+def ingredient_table_hash(table: IngredientTable) -> str:
+    """성분 정규화 사전 내용 해시 (AI Hub 데이터/정규화 규칙이 바뀌면 달라짐)"""
+    data = json.dumps({"aliases": table.aliases, "names": table.names}, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def source_fingerprint(dedup: bool, table: IngredientTable) -> str:
+    """
+    CSV 파일 구성(이름, 크기, 수정 시각) + 성분 정규화 사전 + 적재 옵션 지문 - 체크포인트 유효성 확인용
+
+    병합 그룹과 행 순서(seq)가 성분 사전에 따라 달라지므로 사전이 바뀌면 이어서 적재하지 않는다.
+    """
+    parts = [
+        f"dedup={dedup}",
+        f"partition={DEDUP_PARTITION_BYTES if dedup else 0}",
+        f"ingredients={ingredient_table_hash(table)}",
+    ]
+    for source in DUR_SOURCES:
+        file_path = CSV_DIR / source.file_name
+        if file_path.exists():
+            stat = file_path.stat()
+            parts.append(f"{source.file_name}:{stat.st_size}:{stat.st_mtime_ns}")
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def load_checkpoint(fingerprint: str) -> tuple[Optional[int], int]:
+    """체크포인트에서 (적재 중이던 버전, 재개할 스트림 순번) 조회 (없거나 CSV가 바뀌었으면 (None, 0))"""
+    if not CHECKPOINT_PATH.exists():
+        return None, 0
+    try:
+        checkpoint = json.loads(CHECKPOINT_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None, 0
+    if checkpoint.get("fingerprint") != fingerprint or "version" not in checkpoint:
+        print("⚠️  CSV가 변경되어 기존 체크포인트를 무시합니다.")
+        return None, 0
+    return int(checkpoint["version"]), int(checkpoint.get("next_seq", 0))
+
+
+def save_checkpoint(fingerprint: str, version: int, next_seq: int) -> None:
+    """체크포인트 저장 (임시 파일 → rename으로 원자적 교체)"""
+    CHECKPOINT_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = CHECKPOINT_PATH.with_suffix(".tmp")
+    tmp_path.write_text(
+        json.dumps({"fingerprint": fingerprint, "version": version, "next_seq": next_seq}),
+        encoding="utf-8",
+    )
+    os.replace(tmp_path, CHECKPOINT_PATH)
+
+
+def clear_checkpoint() -> None:
+    if CHECKPOINT_PATH.exists():
+        CHECKPOINT_PATH.unlink()
+
+
+def fetch_existing_ids(collection, page_size: int = 10000) -> set[str]:
+    """컬렉션에 이미 저장된 문서 ID 전체 조회 (페이지 단위)"""
+    existing_ids = set()
+    offset = 0
+    while True:
+        page = collection.get(include=[], limit=page_size, offset=offset)
+        if not page["ids"]:
+            return existing_ids
+        existing_ids.update(page["ids"])
+        offset += len(page["ids"])
+
+
+class _CopyBuffer:
+    """활성 버전에서 변경 없는 행의 임베딩을 새 버전 컬렉션으로 chunk_size 단위 복사"""
+
+    def __init__(self, source, target, chunk_size: int):
+        self.source = source
+        self.target = target
+        self.chunk_size = chunk_size
+        self.ids: list[str] = []
+        self.copied = 0
+
+    def add(self, record_id: str) -> None:
+        self.ids.append(record_id)
+        if len(self.ids) >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.ids:
+            return
+        page = self.source.get(ids=self.ids, include=["embeddings", "documents", "metadatas"])
+        self.target.upsert(
+            ids=page["ids"],
+            embeddings=page["embeddings"],
+            documents=page["documents"],
+            metadatas=page["metadatas"],
+        )
+        self.copied += len(page["ids"])
+        self.ids = []
+
+
+def iter_pending_records(
+    records: Iterator[DurRecord],
+    target_ids: set[str],
+    active_ids: set[str],
+    seen_ids: set[str],
+    resume_from: int,
+    copy_buffer: Optional[_CopyBuffer],
+    stats: dict,
+) -> Iterator[DurRecord]:
+    """
+    임베딩이 필요한 레코드만 통과
+
+    - 같은 실행에서 이미 나온 ID(완전 동일 행) → 건너뜀
+    - 체크포인트 이전 순번 / 새 버전에 이미 저장된 행 → 건너뜀 (중단 후 재개)
+    - 활성 버전에 같은 해시로 저장된 행 → 임베딩 없이 복사
+    - 모든 ID는 seen_ids에 기록 (활성 버전 대비 사라진 행 집계에 사용)
+    """
+    for record in records:
+        if record.id in seen_ids:
+            stats["duplicate"] += 1
+            continue
+        seen_ids.add(record.id)
+
+        if record.seq < resume_from or record.id in target_ids:
+            stats["resumed"] += 1
+            continue
+
+        if record.id in active_ids:
+            copy_buffer.add(record.id)
+            stats["unchanged"] += 1
+            continue
+
+        yield record
+
+
+# ----- 성분 정규화 사전 -----
+
+def build_ingredient_table() -> IngredientTable:
+    """
+    DUR CSV + AI Hub 데이터로 성분 정규화 사전 생성 (저장은 save_ingredient_table)
+
+    - DUR 성분명: 대표 표기 후보, 같은 성분코드의 표기끼리 연결
+    - AI Hub dl_material / dl_material_en: 단일 성분 제품의 한글/영문 표기끼리 연결
+    """
+    from app.utils.aihub_loader import AIHubDataLoader
+
+    builder = IngredientTableBuilder()
+
+    for source in DUR_SOURCES:
+        file_path = CSV_DIR / source.file_name
+        if not file_path.exists():
+            continue
+        for row in iter_csv_rows(file_path):
+            for name_column, code_column in source.ingredient_columns:
+                key = builder.add(row.get(name_column) or "", preferred=True)
+                code = (row.get(code_column) or "").strip()
+                if code:
+                    builder.link(key, f"code:{code}")
+
+    aihub = AIHubDataLoader(str(AIHUB_DATA_PATH))
+    if aihub.load_data():
+        for med in aihub.medicine_data:
+            names_ko = split_ingredients(med.get("dl_material") or "")
+            names_en = split_ingredients(med.get("dl_material_en") or "")
+            keys_ko = [builder.add(name) for name in names_ko]
+            keys_en = [builder.add(name) for name in names_en]
+            # 한글/영문 목록의 순서가 같다는 보장이 없으므로 단일 성분 제품만 연결
+            # (위치로 연결하면 순서가 어긋난 제품 하나가 union-find로 사전 전체에 퍼짐)
+            if len(keys_ko) == len(keys_en) == 1:
+                builder.link(keys_ko[0], keys_en[0])
+
+    return builder.build()
+
+
+def save_ingredient_table(table: IngredientTable, target: DurIndexVersion) -> None:
+    """성분 정규화 사전을 버전별 경로에 저장"""
+    table.save(target.ingredient_table_path)
+    print(f"✅ 성분 정규화 사전 저장 완료: {target.ingredient_table_path} "
+          f"(성분 {len(table)}개, 표기 {len(table.aliases)}개)")
+
+
+# ----- 버전 관리 -----
+
+def list_versions(client) -> list[int]:
+    """저장된 버전 컬렉션 번호 목록 (오름차순)"""
+    versions = []
+    for collection in client.list_collections():
+        name = collection if isinstance(collection, str) else collection.name
+        version = parse_collection_version(name)
+        if version is not None:
+            versions.append(version)
+    return sorted(versions)
+
+
+def get_collection_or_none(client, name: str):
+    try:
+        return client.get_collection(name)
+    except Exception:
+        return None
+
+
+def activate_version(version: int) -> None:
+    """활성 버전 포인터 교체 - rag_service는 다음 검색부터 새 버전을 사용"""
+    write_active_version(version)
+    print(f"🔀 활성 버전 교체: {DurIndexVersion(version).collection_name}")
+
+
+def garbage_collect_versions(keep: int) -> None:
+    """
+    오래된 버전 정리: 활성 버전 이하의 최근 keep개만 남기고 컬렉션 + NumPy/BM25 인덱스 삭제
+
+    활성 버전보다 새로운 버전(중단된 적재)은 재개할 수 있도록 남겨 둔다.
+    """
+    import chromadb
+
+    active = read_active_version()
+    if active.version is None:
+        return
+
+    client = chromadb.PersistentClient(path=str(CHROMA_DB_PATH))
+    older = [v for v in list_versions(client) if v <= active.version]
+    for version in older[:-max(1, keep)]:
+        old = DurIndexVersion(version)
+        client.delete_collection(old.collection_name)
+        shutil.rmtree(old.numpy_index_path, ignore_errors=True)
+        shutil.rmtree(old.bm25_index_path.parent, ignore_errors=True)
+        shutil.rmtree(old.ingredient_table_path.parent, ignore_errors=True)
+        shutil.rmtree(old.dur_rules_path.parent, ignore_errors=True)
+        print(f"🗑️  이전 버전 삭제: {old.collection_name}")
+
+
+# ----- 임베딩 워커 -----
+
+class _SerialExecutor:
+    """workers <= 1 일 때 사용하는 동기 실행기 (ProcessPoolExecutor와 같은 인터페이스)"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def submit(self, fn, *args) -> Future:
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+def _init_embedding_worker(torch_threads: int) -> None:
+    """워커 프로세스 초기화: 스레드 수 제한 후 모델 로드"""
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+    get_embeddings()
+
+
+def _embed_texts(texts: list[str]) -> list[list[float]]:
+    """텍스트 배치 임베딩 (워커 프로세스에서 실행)"""
+    return get_embeddings().embed_documents(texts)
+
+
+def _upsert_batch(collection, batch: list[DurRecord], embeddings: list[list[float]], chunk_size: int) -> None:
+    """임베딩 완료된 배치를 chunk_size 단위로 ChromaDB에 upsert"""
+    for start in range(0, len(batch), chunk_size):
+        chunk = batch[start:start + chunk_size]
+        collection.upsert(
+            ids=[r.id for r in chunk],
+            embeddings=embeddings[start:start + chunk_size],
+            documents=[r.text for r in chunk],
+            metadatas=[r.metadata for r in chunk],
+        )
+
+
+def run_pipeline(
+    batch_size: int,
+    workers: int,
+    upsert_chunk_size: int,
+    resume: bool = True,
+    dedup: bool = True,
+) -> int:
+    """
+    전체 DUR 데이터를 제한된 메모리로 새 버전 컬렉션에 적재하고 버전 번호 반환
+
+    - 서비스 중인 활성 버전은 건드리지 않음 (교체는 activate_version)
+    - CSV는 행 단위로 스트리밍 (전체 문서를 메모리에 올리지 않음)
+    - dedup=True면 같은 성분 조합 + 같은 상세정보 행을 문서 1건으로 병합
+    - 문서 ID = 내용 해시 → 활성 버전에 같은 해시가 있으면 임베딩 대신 복사
+    - batch_size 단위로 워커 프로세스에 임베딩 분배
+    - 진행 중인 배치는 최대 workers * 2개로 제한 (메모리 상한)
+    - 완료된 배치는 제출 순서대로 upsert 후 체크포인트 기록 → 중단 시 같은 버전에 이어서 재개
+    """
+    import chromadb
+
+    client = chromadb.PersistentClient(path=str(CHROMA_DB_PATH))
+
+    active = read_active_version()
+    active_collection = get_collection_or_none(client, active.collection_name)
+
+    table = build_ingredient_table()
+    fingerprint = source_fingerprint(dedup, table)
+    version, resume_from = load_checkpoint(fingerprint) if resume else (None, 0)
+    if version is not None and version in list_versions(client) and (active.version is None or version > active.version):
+        print(f"🔁 체크포인트에서 재개: v{version}, {resume_from}번째 행부터")
+    else:
+        version, resume_from = max(list_versions(client) + [active.version or 0]) + 1, 0
+    target = DurIndexVersion(version)
+    collection = client.get_or_create_collection(target.collection_name)
+    save_ingredient_table(table, target)
+
+    active_ids = fetch_existing_ids(active_collection) if active_collection is not None else set()
+    target_ids = fetch_existing_ids(collection)
+    print(f"📦 활성 버전: {active.collection_name} ({len(active_ids)}건) → 새 버전: {target.collection_name}")
+
+    seen_ids: set[str] = set()
+    stats = {"rows": 0, "documents": 0, "embedded": 0, "unchanged": 0, "resumed": 0, "duplicate": 0}
+    copy_buffer = _CopyBuffer(active_collection, collection, upsert_chunk_size) if active_collection is not None else None
+
+    records = iter_pending_records(
+        iter_dur_records(dedup, stats, table), target_ids, active_ids, seen_ids, resume_from, copy_buffer, stats,
+    )
+    batches = iter_batches(records, batch_size)
+    progress = tqdm(desc="임베딩/저장", unit="건")
+
+    if workers <= 1:
+        executor = _SerialExecutor()
+    else:
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_embedding_worker,
+            initargs=(max(1, (os.cpu_count() or 1) // workers),),
+        )
+    max_in_flight = max(1, workers * 2)
+
+    with executor as pool:
+        pending = deque()
+
+        def flush_oldest():
+            batch, future = pending.popleft()
+            _upsert_batch(collection, batch, future.result(), upsert_chunk_size)
+            # 체크포인트 이전 순번의 복사 대상도 모두 새 버전에 반영된 뒤 기록
+            if copy_buffer is not None:
+                copy_buffer.flush()
+            save_checkpoint(fingerprint, version, batch[-1].seq + 1)
+            stats["embedded"] += len(batch)
+            progress.update(len(batch))
+
+        for batch in batches:
+            pending.append((batch, pool.submit(_embed_texts, [r.text for r in batch])))
+            if len(pending) >= max_in_flight:
+                flush_oldest()
+
+        while pending:
+            flush_oldest()
+
+    if copy_buffer is not None:
+        copy_buffer.flush()
+    progress.close()
+
+    # 전체 패스 완료 → 체크포인트 제거
+    clear_checkpoint()
+    removed = len(active_ids - seen_ids)
+
+    print(f"\n✅ ChromaDB 저장 완료!")
+    print(f"   저장 경로: {CHROMA_DB_PATH} ({target.collection_name})")
+    if dedup and stats["rows"]:
+        reduction = 1 - stats["documents"] / stats["rows"]
+        print(f"   중복 제거: 원본 {stats['rows']}행 → 문서 {stats['documents']}건 "
+              f"(인덱스 크기 {reduction:.1%} 감소)")
+    print(f"   신규/변경 임베딩: {stats['embedded']}건")
+    print(f"   변경 없음(활성 버전에서 복사): {stats['unchanged']}건")
+    if stats["resumed"]:
+        print(f"   이전 실행에서 저장됨: {stats['resumed']}건")
+    print(f"   중복 행: {stats['duplicate']}건")
+    print(f"   활성 버전 대비 사라진 행: {removed}건")
+    print(f"   총 문서 수: {collection.count()}")
+    return version
+
+
+# ============================================================
+# BM25 어휘 인덱스 생성: ChromaDB 문서 전체 → data/dur_bm25/v{N}/bm25.json
+# ============================================================
+
+def build_bm25_index(target: DurIndexVersion, page_size: int = 5000) -> None:
+    """버전 컬렉션의 page_content로 BM25 역색인 생성 (하이브리드 검색용)"""
+    import chromadb
+    from app.services.bm25_index import BM25Index
+
+    client = chromadb.PersistentClient(path=str(CHROMA_DB_PATH))
+    collection = client.get_collection(target.collection_name)
+
+    ids, documents, metadatas = [], [], []
+    offset = 0
+    while True:
+        page = collection.get(include=["documents", "metadatas"], limit=page_size, offset=offset)
+        if not page["ids"]:
+            break
+        ids.extend(page["ids"])
+        documents.extend(page["documents"])
+        metadatas.extend(page["metadatas"])
+        offset += len(page["ids"])
+
+    index = BM25Index.build(ids, documents, metadatas)
+    index.save(target.bm25_index_path)
+    print(f"✅ BM25 인덱스 저장 완료: {target.bm25_index_path} ({len(index)}건, 어휘 {len(index.postings)}개)")
+
+
+def build_dur_rules(target: DurIndexVersion, page_size: int = 5000) -> None:
+    """버전 컬렉션의 메타데이터를 정규 성분 ID로 묶어 DUR 규칙 테이블 생성 (규칙 기반 스캔 분석용)"""
+    import chromadb
+    from app.services.dur_rules import DurRuleTable
+
+    client = chromadb.PersistentClient(path=str(CHROMA_DB_PATH))
+    collection = client.get_collection(target.collection_name)
+
+    metadatas = []
+    offset = 0
+    while True:
+        page = collection.get(include=["metadatas"], limit=page_size, offset=offset)
+        if not page["ids"]:
+            break
+        metadatas.extend(page["metadatas"])
+        offset += len(page["ids"])
+
+    if target.ingredient_table_path.exists():
+        table = IngredientTable.load(target.ingredient_table_path)
+    else:
+        table = IngredientTable({}, {})
+
+    rules = DurRuleTable.build(metadatas, table)
+    rules.save(target.dur_rules_path)
+    restriction_count = sum(len(ids) for ids in rules.restrictions.values())
+    print(f"✅ DUR 규칙 테이블 저장 완료: {target.dur_rules_path} "
+          f"(병용금기 쌍 {len(rules.contraindications)}개, 사용 제한 성분 {restriction_count}개)")
+
+
+# ============================================================
+# NumPy 인덱스 내보내기: ChromaDB → vectors.npy + metadata.json
+# ============================================================
+
+def export_numpy_index(target: DurIndexVersion, dtype: str = "float32", page_size: int = 5000) -> None:
+    """
+    버전 컬렉션을 NumPy 브루트포스 인덱스로 내보내기
+
+    - 행을 type별로 연속 배치하여 type 필터를 행 범위(type_ranges)로 처리
+    - 임베딩은 open_memmap으로 페이지 단위 기록 (전체 행렬을 메모리에 올리지 않음)
+    - 임시 파일에 쓴 뒤 rename하여 읽는 쪽이 반쯤 쓰인 파일을 보지 않도록 함
+    """
+    import chromadb
+    import numpy as np
+
+    client = chromadb.PersistentClient(path=str(CHROMA_DB_PATH))
+    collection = client.get_collection(target.collection_name)
+    index_path = target.numpy_index_path
+
+    total = collection.count()
+    if total == 0:
+        print("⚠️  내보낼 문서가 없습니다.")
+        return
+
+    dim = len(collection.get(limit=1, include=["embeddings"])["embeddings"][0])
+
+    index_path.mkdir(parents=True, exist_ok=True)
+    vectors_path = index_path / "vectors.npy"
+    metadata_path = index_path / "metadata.json"
+    tmp_vectors_path = index_path / "vectors.tmp.npy"
+    tmp_metadata_path = index_path / "metadata.tmp.json"
+
+    vectors = np.lib.format.open_memmap(tmp_vectors_path, mode="w+", dtype=dtype, shape=(total, dim))
+    ids, documents, metadatas = [], [], []
+    type_ranges = {}
+
+    print(f"📤 NumPy 인덱스 내보내기: {total}건, dim={dim}, dtype={dtype}")
+
+    for doc_type in DOCUMENT_TYPES:
+        start = len(ids)
+        offset = 0
+        while True:
+            page = collection.get(
+                where={"type": doc_type},
+                include=["embeddings", "documents", "metadatas"],
+                limit=page_size,
+                offset=offset,
+            )
+            if not page["ids"]:
+                break
+            row = len(ids)
+            vectors[row:row + len(page["ids"])] = np.asarray(page["embeddings"], dtype=dtype)
+            ids.extend(page["ids"])
+            documents.extend(page["documents"])
+            metadatas.extend(page["metadatas"])
+            offset += len(page["ids"])
+        type_ranges[doc_type] = [start, len(ids)]
+        print(f"   {doc_type}: {len(ids) - start}건 (행 {start}~{len(ids)})")
+
+    if len(ids) != total:
+        raise RuntimeError(f"type이 없는 문서가 있습니다: {total - len(ids)}건 (DOCUMENT_TYPES 확인 필요)")
+
+    vectors.flush()
+    del vectors
+
+    with open(tmp_metadata_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "dim": dim,
+            "dtype": dtype,
+            "type_ranges": type_ranges,
+            "ids": ids,
+            "documents": documents,
+            "metadatas": metadatas,
+        }, f, ensure_ascii=False)
+
+    os.replace(tmp_vectors_path, vectors_path)
+    os.replace(tmp_metadata_path, metadata_path)
+
+    print(f"✅ NumPy 인덱스 저장 완료: {index_path}")
+
+
+def run_legacy() -> int:
+    """레거시 모드: 전체 문서를 모은 뒤 Chroma.from_documents 한 번으로 새 버전 컬렉션에 저장"""
+    import chromadb
+    from langchain_community.vectorstores import Chroma
+
+    client = chromadb.PersistentClient(path=str(CHROMA_DB_PATH))
+    version = max(list_versions(client) + [read_active_version().version or 0]) + 1
+    target = DurIndexVersion(version)
+    save_ingredient_table(build_ingredient_table(), target)
 
-def main():
-    print("=" * 70)
-    print("DUR 데이터 ChromaDB 로드 시작")
-    print("=" * 70)
-    
     all_documents = []
-    
-    # 1. 병용금기 (가장 중요)
-    contraindication_file = CSV_DIR / "의약품안전사용서비스(DUR)_병용금기 품목리스트 2025.6.csv"
-    if contraindication_file.exists():
-        docs = load_contraindication_csv(contraindication_file)
-        print(f"✅ 병용금기: {len(docs)}건 로드")
-        all_documents.extend(docs[:5000])  # 처음 5,000건만 (무료 모델, 빠른 처리)
-    
-    # 2. 임부금기
-    pregnancy_file = CSV_DIR / "의약품안전사용서비스(DUR)_임부금기 품목리스트 2025.6.csv"
-    if pregnancy_file.exists():
-        docs = load_pregnancy_contraindication_csv(pregnancy_file)
-        print(f"✅ 임부금기: {len(docs)}건 로드")
-        all_documents.extend(docs)
-    
-    # 3. 연령금기
-    age_file = CSV_DIR / "의약품안전사용서비스(DUR)_연령금기 품목리스트 2025.6.csv"
-    if age_file.exists():
-        docs = load_age_contraindication_csv(age_file)
-        print(f"✅ 연령금기: {len(docs)}건 로드")
-        all_documents.extend(docs)
-    
-    # 4. 노인주의
-    elderly_file = CSV_DIR / "의약품안전사용서비스(DUR)_노인주의 품목리스트 2025.6.csv"
-    if elderly_file.exists():
-        docs = load_elderly_caution_csv(elderly_file)
-        print(f"✅ 노인주의: {len(docs)}건 로드")
-        all_documents.extend(docs)
-    
-    # 5. 노인주의(해열진통소염제)
-    elderly_nsaid_file = CSV_DIR / "의약품안전사용서비스(DUR)_노인주의(해열진통소염제) 품목리스트 2025.6.csv"
-    if elderly_nsaid_file.exists():
-        docs = load_elderly_caution_csv(elderly_nsaid_file)
-        print(f"✅ 노인주의(해열진통소염제): {len(docs)}건 로드")
+
+    for source in DUR_SOURCES:
+        file_path = CSV_DIR / source.file_name
+        if not file_path.exists():
+            continue
+        docs = _load_csv(file_path, source.label, source.build_document)
+        print(f"✅ {source.label}: {len(docs)}건 로드")
+        if source.key == "contraindication":
+            docs = docs[:LEGACY_CONTRAINDICATION_LIMIT]  # 처음 5,000건만 (무료 모델, 빠른 처리)
         all_documents.extend(docs)
-    
+
     print(f"\n📊 총 {len(all_documents)}건의 문서를 ChromaDB에 저장합니다...")
     print("⚠️  무료 HuggingFace 모델로 임베딩을 생성합니다. 시간이 걸릴 수 있습니다.")
-    
-    # ChromaDB에 저장
+
+    vectorstore = Chroma.from_documents(
+        documents=all_documents,
+        embedding=get_embeddings(),
+        persist_directory=str(CHROMA_DB_PATH),
+        collection_name=target.collection_name
+    )
+
+    print(f"\n✅ ChromaDB 저장 완료!")
+    print(f"   저장 경로: {CHROMA_DB_PATH} ({target.collection_name})")
+    print(f"   총 문서 수: {vectorstore._collection.count()}")
+    return version
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="DUR CSV → ChromaDB 적재")
+    parser.add_argument("--legacy", action="store_true",
+                        help="레거시 모드 (병용금기 5,000건 제한, 단일 from_documents 호출)")
+    parser.add_argument("--batch-size", type=int, default=256,
+                        help="워커 1회 임베딩 배치 크기 (기본: 256)")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="임베딩 워커 프로세스 수 (기본: CPU 코어 수 / 2)")
+    parser.add_argument("--upsert-chunk-size", type=int, default=1000,
+                        help="ChromaDB upsert 1회당 레코드 수 (기본: 1000)")
+    parser.add_argument("--no-dedup", action="store_true",
+                        help="중복 제거(그룹핑) 없이 행 1개 = 문서 1개로 적재")
+    parser.add_argument("--no-bm25", action="store_true",
+                        help="적재 후 BM25 어휘 인덱스(data/dur_bm25/v{N}) 생성 건너뛰기")
+    parser.add_argument("--export-numpy", action="store_true",
+                        help="적재 후 NumPy 브루트포스 인덱스(data/dur_index/v{N})로 내보내기")
+    parser.add_argument("--export-only", action="store_true",
+                        help="적재 없이 활성 버전을 NumPy 인덱스로 내보내기만 수행")
+    parser.add_argument("--export-dtype", choices=["float32", "float16"], default="float32",
+                        help="NumPy 인덱스 저장 dtype (기본: float32)")
+    parser.add_argument("--no-resume", action="store_true",
+                        help="체크포인트를 무시하고 새 버전을 처음부터 적재")
+    parser.add_argument("--no-activate", action="store_true",
+                        help="새 버전을 적재만 하고 활성 버전으로 교체하지 않음")
+    parser.add_argument("--activate", type=int, metavar="VERSION",
+                        help="적재 없이 지정한 버전을 활성 버전으로 교체 (롤백)")
+    parser.add_argument("--keep-versions", type=int, default=DEFAULT_KEEP_VERSIONS,
+                        help=f"교체 후 남겨 둘 최근 버전 수 (활성 버전 포함, 기본: {DEFAULT_KEEP_VERSIONS})")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    print("=" * 70)
+    print("DUR 데이터 ChromaDB 로드 시작")
+    print("=" * 70)
+
     try:
-        vectorstore = Chroma.from_documents(
-            documents=all_documents,
-            embedding=embeddings,
-            persist_directory=str(CHROMA_DB_PATH),
-            collection_name="dur_safety"
-        )
-        
-        print(f"\n✅ ChromaDB 저장 완료!")
-        print(f"   저장 경로: {CHROMA_DB_PATH}")
-        print(f"   총 문서 수: {vectorstore._collection.count()}")
-        
+        if args.activate is not None:
+            activate_version(args.activate)
+            return
+
+        if args.export_only:
+            active = read_active_version()
+            export_numpy_index(active, args.export_dtype)
+            return
+
+        if args.legacy:
+            version = run_legacy()
+        else:
+            print(f"⚙️  파이프라인 모드: batch={args.batch_size}, workers={args.workers}, "
+                  f"upsert_chunk={args.upsert_chunk_size}")
+            version = run_pipeline(
+                args.batch_size,
+                args.workers,
+                args.upsert_chunk_size,
+                resume=not args.no_resume,
+                dedup=not args.no_dedup,
+            )
+        target = DurIndexVersion(version)
+
+        # 버전별 인덱스를 모두 만든 뒤에 교체 → 서비스는 항상 완성된 버전만 봄
+        if not args.no_bm25:
+            build_bm25_index(target)
+
+        build_dur_rules(target)
+
+        if args.export_numpy:
+            export_numpy_index(target, args.export_dtype)
+
+        if not args.no_activate:
+            activate_version(version)
+            garbage_collect_versions(args.keep_versions)
     except Exception as e:
         print(f"\n❌ ChromaDB 저장 실패: {e}")
         raise
@@ -0,0 +1,343 @@
+"""
+OpenAI 호환 스텁 서버 (부하 테스트용)
+
+실제 OpenAI로 /chat/, /chat/stream, /analysis/scan 부하 테스트를 하면 비용이 들고,
+실제 API의 지연 시간 편차에 우리 쪽 병목(DB, RAG, 스케줄러, 연결 풀)이 가려진다.
+이 서버는 chat-completions API만 흉내 내어 설정한 지연 분포/토큰 수로 응답한다.
+
+- POST /v1/chat/completions
+  - stream=true: SSE chat.completion.chunk (stream_options.include_usage면 마지막에 usage 청크) + [DONE]
+  - response_format={"type": "json_object"}: MedicationAnalysisResponse 형식의 고정 JSON (--analysis-fixture로 교체)
+    일괄 스캔 분석 프롬프트("촬영 번호의 위험성을 각각 분석해주세요: 1, 2")면 {"items": [번호마다 고정 JSON]}
+  - 그 외: 한국어 더미 텍스트 (completion 토큰 수만큼)
+- 지연: 첫 토큰까지 --latency 분포 + 출력 토큰당 --token-interval-ms (비스트리밍은 합계만큼 기다린 뒤 응답)
+- 오류 주입: --error-rate (500), --rate-limit-rate (429 + Retry-After)
+- GET /stats: 요청 수/오류 수/응답 토큰 합 (부하 테스트 결과 확인용)
+
+실행:
+    python scripts/openai_stub_server.py --port 8100 --latency lognormal --latency-ms 600 --latency-spread-ms 300
+
+앱 .env:
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1
+    OPENAI_API_KEY=stub
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import random
+import re
+import time
+import uuid
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal")
+
+# 일괄 스캔 분석 요청의 촬영 번호 목록 (app/routes/analysis.py analyze_batch_with_ai)
+BATCH_TARGETS_PATTERN = re.compile(r"촬영 번호의 위험성을 각각 분석해주세요: ([\d, ]+)")
+
+# 텍스트 응답 토큰 (1개 = 1토큰으로 계산)
+TEXT_TOKENS = [
+    "복용", " 중인", " 약", "과", " 함께", " 드실", " 때는", " 성분", "이", " 겹치지", " 않는지",
+    " 확인", "하세요", ".", " 증상", "이", " 계속", "되면", " 약사", "와", " 상담", "하세요", ".\n",
+]
+
+# MedicationAnalysisResponse 형식 (scannedMedication 제외 - 앱이 채움)
+DEFAULT_ANALYSIS_FIXTURES: List[Dict[str, Any]] = [
+    {
+        "overallRiskScore": 1,
+        "riskLevel": "low",
+        "riskItems": [],
+        "warnings": [],
+        "summary": "현재 복용 중인 약과 **함께 복용해도 큰 문제가 없습니다**.",
+        "sections": [
+            {"icon": "time", "title": "복용 방법", "content": "• 제품 설명서의 **용법·용량**을 지켜 복용하세요."},
+        ],
+    },
+    {
+        "overallRiskScore": 5,
+        "riskLevel": "medium",
+        "riskItems": [
+            {
+                "id": "timing-1",
+                "type": "timing",
+                "severity": "medium",
+                "title": "복용 시간 조정 필요",
+                "description": "같은 시간에 복용하면 위장 자극이 커질 수 있습니다.",
+                "percentage": 50,
+            }
+        ],
+        "warnings": ["복용 간격을 2시간 이상 두세요."],
+        "summary": "**복용 시간을 나누면** 함께 복용할 수 있습니다.",
+        "sections": [
+            {"icon": "time", "title": "복용 시간", "content": "• 아침 약과 **2시간 간격**을 두세요.\n• 식후에 복용하세요."},
+            {"icon": "alert-circle", "title": "주의사항", "content": "• 속쓰림이 있으면 약사와 상담하세요."},
+        ],
+    },
+    {
+        "overallRiskScore": 8,
+        "riskLevel": "high",
+        "riskItems": [
+            {
+                "id": "duplicate-1",
+                "type": "duplicate",
+                "severity": "high",
+                "title": "아세트아미노펜 성분 중복",
+                "description": "두 약 모두 아세트아미노펜을 포함해 하루 최대 용량을 넘을 수 있습니다.",
+                "percentage": 85,
+            }
+        ],
+        "warnings": ["아세트아미노펜 하루 최대 4,000mg을 넘기지 마세요."],
+        "summary": "**성분이 중복**되어 함께 복용하면 안 됩니다.",
+        "sections": [
+            {"icon": "alert-circle", "title": "주의사항", "content": "• 둘 중 **한 가지만** 복용하세요."},
+            {"icon": "swap-horizontal", "title": "대체 방안", "content": "• 다른 성분의 진통제를 약사와 상담하세요."},
+        ],
+    },
+]
+
+
+def estimate_tokens(text: str) -> int:
+    """토큰 수 근사 (영문 4자당 1토큰, 비ASCII 1자당 1토큰)"""
+    if not text:
+        return 0
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return ascii_chars // 4 + 1 + (len(text) - ascii_chars)
+
+
+def prompt_tokens(messages: List[dict]) -> int:
+    total = 0
+    for message in messages:
+        content = message.get("content") or ""
+        if isinstance(content, list):  # 멀티모달 content 파트
+            content = " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+        total += estimate_tokens(content) + 4
+    return total
+
+
+class StubBehavior:
+    """지연/토큰 수/오류 주입 설정 + 통계"""
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.random = random.Random(args.seed)
+        self.fixtures = load_fixtures(args.analysis_fixture)
+
+        self.requests = 0
+        self.streams = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.completion_tokens = 0
+        self.started_at = time.time()
+
+    def first_token_delay(self) -> float:
+        """첫 토큰까지 지연 (초)"""
+        mean = self.args.latency_ms
+        spread = self.args.latency_spread_ms
+        dist = self.args.latency
+        if dist == "uniform":
+            ms = self.random.uniform(mean - spread, mean + spread)
+        elif dist == "normal":
+            ms = self.random.gauss(mean, spread)
+        elif dist == "lognormal":
+            # latency_ms = 중앙값, spread ≈ 표준편차가 되도록 sigma 결정 (꼬리가 긴 실제 API 분포)
+            sigma = math.sqrt(math.log(1 + (spread / mean) ** 2)) if mean > 0 else 0.0
+            ms = mean * self.random.lognormvariate(0.0, sigma)
+        else:
+            ms = mean
+        return max(ms, 0.0) / 1000
+
+    def completion_token_count(self, max_tokens: Optional[int]) -> int:
+        count = self.args.completion_tokens + self.random.randint(
+            -self.args.completion_tokens_spread, self.args.completion_tokens_spread
+        )
+        count = max(count, 1)
+        return min(count, max_tokens) if max_tokens else count
+
+    def injected_error(self) -> Optional[JSONResponse]:
+        roll = self.random.random()
+        if roll < self.args.rate_limit_rate:
+            self.rate_limited += 1
+            return JSONResponse(
+                {"error": {"message": "Rate limit reached (stub)", "type": "requests", "code": "rate_limit_exceeded"}},
+                status_code=429,
+                headers={"retry-after": str(self.args.retry_after_seconds)},
+            )
+        if roll < self.args.rate_limit_rate + self.args.error_rate:
+            self.errors += 1
+            return JSONResponse(
+                {"error": {"message": "Internal server error (stub)", "type": "server_error", "code": None}},
+                status_code=500,
+            )
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "streams": self.streams,
+            "errors": self.errors,
+            "rate_limited": self.rate_limited,
+            "completion_tokens": self.completion_tokens,
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+        }
+
+
+def load_fixtures(path: Optional[str]) -> List[Dict[str, Any]]:
+    """분석 JSON 고정 응답 (파일: 객체 1개 또는 객체 배열)"""
+    if not path:
+        return DEFAULT_ANALYSIS_FIXTURES
+    with open(Path(path), "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return data if isinstance(data, list) else [data]
+
+
+def batch_targets(messages: List[dict]) -> Optional[List[int]]:
+    """일괄 스캔 분석 요청이면 분석할 촬영 번호 목록"""
+    content = (messages[-1].get("content") or "") if messages else ""
+    match = BATCH_TARGETS_PATTERN.search(content) if isinstance(content, str) else None
+    if match is None:
+        return None
+    return [int(number) for number in re.findall(r"\d+", match.group(1))]
+
+
+def text_pieces(count: int) -> List[str]:
+    return list(itertools.islice(itertools.cycle(TEXT_TOKENS), count))
+
+
+def json_pieces(content: str, size: int = 4) -> List[str]:
+    """JSON 응답 스트리밍/지연 계산용 조각"""
+    return [content[i:i + size] for i in range(0, len(content), size)]
+
+
+def create_app(args: argparse.Namespace) -> FastAPI:
+    app = FastAPI(title="OpenAI stub")
+    behavior = StubBehavior(args)
+    app.state.behavior = behavior
+
+    @app.get("/stats")
+    async def stats():
+        return behavior.stats()
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        behavior.requests += 1
+
+        error = behavior.injected_error()
+        if error is not None:
+            return error
+
+        model = body.get("model") or "gpt-4o"
+        n_prompt = prompt_tokens(body.get("messages") or [])
+        max_tokens = body.get("max_tokens") or body.get("max_completion_tokens")
+
+        if (body.get("response_format") or {}).get("type") == "json_object":
+            targets = batch_targets(body.get("messages") or [])
+            if targets is None:
+                result = behavior.random.choice(behavior.fixtures)
+            else:
+                result = {"items": [{"index": index, **behavior.random.choice(behavior.fixtures)} for index in targets]}
+            content = json.dumps(result, ensure_ascii=False)
+            pieces = json_pieces(content)
+            n_completion = estimate_tokens(content)
+        else:
+            pieces = text_pieces(behavior.completion_token_count(max_tokens))
+            content = "".join(pieces)
+            n_completion = len(pieces)
+
+        completion_id = f"chatcmpl-stub-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        usage = {
+            "prompt_tokens": n_prompt,
+            "completion_tokens": n_completion,
+            "total_tokens": n_prompt + n_completion,
+        }
+        behavior.completion_tokens += n_completion
+        first_token_delay = behavior.first_token_delay()
+        token_interval = args.token_interval_ms / 1000
+
+        if not body.get("stream"):
+            await asyncio.sleep(first_token_delay + token_interval * len(pieces))
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                    "logprobs": None,
+                }],
+                "usage": usage,
+            }
+
+        behavior.streams += 1
+        include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+
+        def chunk(delta: dict, finish_reason: Optional[str] = None, chunk_usage: Optional[dict] = None) -> str:
+            data = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [] if chunk_usage else [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            if include_usage:
+                data["usage"] = chunk_usage
+            return f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+        async def event_stream() -> AsyncIterator[str]:
+            await asyncio.sleep(first_token_delay)
+            yield chunk({"role": "assistant", "content": ""})
+            for i, piece in enumerate(pieces):
+                if i and token_interval:
+                    await asyncio.sleep(token_interval)
+                yield chunk({"content": piece})
+            yield chunk({}, finish_reason="stop")
+            if include_usage:
+                yield chunk({}, chunk_usage=usage)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+    return app
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="OpenAI 호환 스텁 서버 (부하 테스트용)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default="lognormal",
+                        help="첫 토큰까지 지연 분포 (기본: lognormal)")
+    parser.add_argument("--latency-ms", type=float, default=500.0,
+                        help="첫 토큰까지 지연 평균 (lognormal은 중앙값)")
+    parser.add_argument("--latency-spread-ms", type=float, default=200.0,
+                        help="uniform: ±범위, normal/lognormal: 표준편차 (근사)")
+    parser.add_argument("--token-interval-ms", type=float, default=15.0, help="출력 토큰 간 간격")
+    parser.add_argument("--completion-tokens", type=int, default=200, help="텍스트 응답 토큰 수 (max_tokens로 제한)")
+    parser.add_argument("--completion-tokens-spread", type=int, default=50, help="텍스트 응답 토큰 수 ±범위")
+    parser.add_argument("--analysis-fixture", help="json_object 응답으로 쓸 JSON 파일 (객체 또는 객체 배열)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="500 응답 비율 (0~1)")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="429 응답 비율 (0~1)")
+    parser.add_argument("--retry-after-seconds", type=float, default=1.0, help="429 응답의 Retry-After")
+    parser.add_argument("--seed", type=int, help="난수 시드 (재현용)")
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+    print(f"🧪 OpenAI 스텁 서버: http://{args.host}:{args.port}/v1 "
+          f"(지연 {args.latency} {args.latency_ms:.0f}ms ±{args.latency_spread_ms:.0f}ms, "
+          f"토큰 간격 {args.token_interval_ms:.0f}ms)")
+    uvicorn.run(create_app(args), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+DB 라우트 동시성 벤치마크: 처리량 + 이벤트 루프 지연
+
+실행 중인 서버의 DB 조회 라우트(약 목록, 오늘의 스케줄, 전체 스케줄, 지병)에 동시 요청을 보내
+동시성 단계별 처리량(RPS), 지연 시간 p50/p95/p99를 측정하고 결과를 JSON으로 저장합니다.
+부하 중에 /health(DB 없음)를 주기적으로 호출한 지연 시간도 함께 기록합니다.
+동기 DB 호출이 이벤트 루프를 막으면 /health 지연이 DB 왕복 시간만큼 늘어납니다.
+
+동기 세션(변경 전) 커밋과 비동기 세션(변경 후) 커밋에서 각각 서버를 띄워 실행한 뒤 --compare로 비교합니다.
+
+사전 준비:
+    python tests/insert_test_data.py
+    uvicorn app.main:app --port 8000   # 워커 1개 (이벤트 루프 1개 기준으로 비교)
+
+사용법:
+    python tests/bench_db_concurrency.py
+    python tests/bench_db_concurrency.py --concurrency 1 16 64 --requests 2000
+    python tests/bench_db_concurrency.py --compare data/bench/db_bench_20250601_120000.json
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+
+project_root = Path(__file__).parent.parent
+
+API_PREFIX = "/api/v1"
+
+# 이벤트 루프에서 DB를 조회하는 읽기 라우트
+ENDPOINTS = [
+    "/medicines/",
+    "/schedules/today",
+    "/schedules/",
+    "/users/medical-conditions",
+]
+
+HEALTH_PROBE_INTERVAL_S = 0.05
+
+# --compare 회귀 판정 허용 범위
+RPS_DROP_TOLERANCE = 0.10  # 처리량 10% 초과 감소
+P95_GROWTH_TOLERANCE = 0.25  # p95 25% 초과 증가
+
+
+def percentile(values: list, p: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def latency_stats(latencies_ms: list) -> dict:
+    if not latencies_ms:
+        return {"count": 0}
+    return {
+        "count": len(latencies_ms),
+        "p50_ms": round(percentile(latencies_ms, 50), 2),
+        "p95_ms": round(percentile(latencies_ms, 95), 2),
+        "p99_ms": round(percentile(latencies_ms, 99), 2),
+        "mean_ms": round(statistics.mean(latencies_ms), 2),
+        "max_ms": round(max(latencies_ms), 2),
+    }
+
+
+async def probe_health(client: httpx.AsyncClient, stop: asyncio.Event, latencies_ms: list) -> None:
+    """부하가 끝날 때까지 /health 지연 시간 측정"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            await client.get("/health")
+            latencies_ms.append((time.perf_counter() - started) * 1000)
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(HEALTH_PROBE_INTERVAL_S)
+
+
+async def run_level(base_url: str, concurrency: int, total_requests: int, timeout: float) -> dict:
+    """동시 요청 concurrency개로 total_requests건 실행"""
+    limits = httpx.Limits(max_connections=concurrency + 1, max_keepalive_connections=concurrency + 1)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        # 워밍업 (연결 풀, 첫 쿼리)
+        for endpoint in ENDPOINTS:
+            response = await client.get(API_PREFIX + endpoint)
+            response.raise_for_status()
+
+        latencies = {endpoint: [] for endpoint in ENDPOINTS}
+        errors = 0
+        counter = iter(range(total_requests))
+
+        async def worker():
+            nonlocal errors
+            for i in counter:
+                endpoint = ENDPOINTS[i % len(ENDPOINTS)]
+                started = time.perf_counter()
+                try:
+                    response = await client.get(API_PREFIX + endpoint)
+                    response.raise_for_status()
+                    latencies[endpoint].append((time.perf_counter() - started) * 1000)
+                except httpx.HTTPError:
+                    errors += 1
+
+        health_ms: list = []
+        stop = asyncio.Event()
+        probe = asyncio.create_task(probe_health(client, stop, health_ms))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall_s = time.perf_counter() - started
+
+        stop.set()
+        await probe
+
+    all_ms = [ms for values in latencies.values() for ms in values]
+    return {
+        "concurrency": concurrency,
+        "requests": total_requests,
+        "errors": errors,
+        "wall_s": round(wall_s, 3),
+        "rps": round(len(all_ms) / wall_s, 1) if wall_s else 0.0,
+        "latency": latency_stats(all_ms),
+        "endpoints": {endpoint: latency_stats(values) for endpoint, values in latencies.items()},
+        "health": latency_stats(health_ms),
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=project_root, text=True, stderr=subprocess.DEVNULL,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+# ============================================================
+# 결과 출력 / 비교
+# ============================================================
+
+def print_report(report: dict) -> None:
+    print(f"\n서버={report['base_url']}, 요청 수={report['requests']} (단계별)")
+    print(f"  {'동시성':>6}{'RPS':>10}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'health p95':>12}{'오류':>6}")
+    for level in report["levels"]:
+        latency, health = level["latency"], level["health"]
+        print(f"  {level['concurrency']:>6}{level['rps']:>10.1f}{latency.get('p50_ms', 0):>10.2f}"
+              f"{latency.get('p95_ms', 0):>10.2f}{latency.get('p99_ms', 0):>10.2f}"
+              f"{health.get('p95_ms', 0):>12.2f}{level['errors']:>6}")
+
+
+def compare(report: dict, baseline: dict) -> list:
+    """기준 결과 대비 동시성 단계별 변화 출력, 회귀 목록 반환"""
+    regressions = []
+    base_levels = {level["concurrency"]: level for level in baseline.get("levels", [])}
+    print(f"  {'동시성':>6}{'RPS':>22}{'p95(ms)':>24}{'health p95(ms)':>24}")
+    for level in report["levels"]:
+        base = base_levels.get(level["concurrency"])
+        if not base:
+            continue
+        p95, base_p95 = level["latency"].get("p95_ms", 0), base["latency"].get("p95_ms", 0)
+        health, base_health = level["health"].get("p95_ms", 0), base["health"].get("p95_ms", 0)
+        print(f"  {level['concurrency']:>6}{base['rps']:>10.1f} → {level['rps']:<9.1f}"
+              f"{base_p95:>11.2f} → {p95:<10.2f}{base_health:>11.2f} → {health:<10.2f}")
+
+        if base["rps"] > 0 and level["rps"] < base["rps"] * (1 - RPS_DROP_TOLERANCE):
+            regressions.append(f"동시성 {level['concurrency']}: RPS {base['rps']:.1f} → {level['rps']:.1f}")
+        if base_p95 > 0 and p95 > base_p95 * (1 + P95_GROWTH_TOLERANCE):
+            regressions.append(f"동시성 {level['concurrency']}: p95 {base_p95:.2f}ms → {p95:.2f}ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DB 라우트 동시성 벤치마크")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8, 32, 64])
+    parser.add_argument("--requests", type=int, default=1000, help="동시성 단계별 총 요청 수")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--output", type=Path,
+                        default=project_root / "data" / "bench" / f"db_bench_{datetime.now():%Y%m%d_%H%M%S}.json")
+    parser.add_argument("--compare", type=Path, help="비교할 이전 결과 JSON (회귀 시 종료 코드 1)")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("DB 라우트 동시성 벤치마크")
+    print("=" * 70)
+
+    levels = []
+    for concurrency in args.concurrency:
+        print(f"🔄 동시성 {concurrency} 실행 중...")
+        levels.append(asyncio.run(run_level(args.base_url, concurrency, args.requests, args.timeout)))
+
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "base_url": args.base_url,
+        "requests": args.requests,
+        "endpoints": ENDPOINTS,
+        "levels": levels,
+    }
+
+    print_report(report)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"\n💾 결과 저장: {args.output}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        print(f"\n[비교] 기준: {args.compare} ({baseline.get('git_commit') or '커밋 정보 없음'})")
+        regressions = compare(report, baseline)
+        if regressions:
+            for regression in regressions:
+                print(f"  ❌ {regression}")
+            sys.exit(1)
+        print("  ✅ 회귀 없음")
+
+
+if __name__ == "__main__":
+    main()
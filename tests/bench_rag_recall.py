@@ -0,0 +1,342 @@
+"""
+RAG 검색 벤치마크: 지연 시간 + recall@k
+
+고정된 라벨 쿼리 세트(약물 목록, 알려진 병용금기 쌍)를 rag_service 검색 함수에 넣어
+함수별 p50/p95 지연 시간, 처리량, recall@k를 측정하고 결과를 JSON으로 저장합니다.
+백엔드(RAG_BACKEND), k, 중복 제거, 양자화(--export-dtype) 변경 전후 결과를 --compare로 비교할 수 있습니다.
+
+- 정답 판정은 문서 ID가 아닌 성분 기준 (ingredient_normalizer로 정규화 후 비교)
+  → 중복 제거/재적재로 문서 ID가 바뀌어도 같은 라벨로 비교 가능
+- 인덱스에 없는 라벨(해당 월 DUR 데이터에 없는 조합)은 BM25 인덱스 메타데이터로 확인하여 recall에서 제외
+
+사전 준비:
+    python scripts/load_dur_data.py
+
+사용법:
+    python tests/bench_rag_recall.py
+    python tests/bench_rag_recall.py --modes vector hybrid --repeat 20 --concurrency 8
+    python tests/bench_rag_recall.py --compare data/bench/rag_bench_20250601_120000.json
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+# 프로젝트 루트를 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.services import rag_service
+from app.services.ingredient_normalizer import normalize_ingredient
+
+
+# ============================================================
+# 라벨 쿼리 세트
+# ============================================================
+
+# 병용금기: 약물 목록 → 결과에 있어야 하는 성분 쌍
+CONTRAINDICATION_CASES = [
+    {"drugs": ["이트라코나졸", "심바스타틴"], "pairs": [("이트라코나졸", "심바스타틴")]},
+    {"drugs": ["Itraconazole", "Simvastatin"], "pairs": [("이트라코나졸", "심바스타틴")]},
+    {"drugs": ["케토롤락트로메타민", "아스피린"], "pairs": [("케토롤락", "아스피린")]},
+    {"drugs": ["클래리트로마이신", "에르고타민타르타르산염"], "pairs": [("클래리트로마이신", "에르고타민")]},
+    {"drugs": ["케토코나졸", "트리아졸람"], "pairs": [("케토코나졸", "트리아졸람")]},
+    {"drugs": ["실데나필시트르산염", "니트로글리세린"], "pairs": [("실데나필", "니트로글리세린")]},
+    {"drugs": ["아세트아미노펜", "이트라코나졸", "심바스타틴"], "pairs": [("이트라코나졸", "심바스타틴")]},
+    {"drugs": ["클래리트로마이신", "피모지드", "케토코나졸", "트리아졸람"],
+     "pairs": [("클래리트로마이신", "피모지드"), ("케토코나졸", "트리아졸람")]},
+]
+
+# 연령금기 / 임부금기 / 노인주의: 약물 목록 → 결과에 있어야 하는 성분
+AGE_CASES = [
+    {"drugs": ["코데인인산염"], "expected": ["코데인"]},
+    {"drugs": ["트라마돌염산염"], "expected": ["트라마돌"]},
+    {"drugs": ["아세트아미노펜", "코데인"], "expected": ["코데인"]},
+]
+
+PREGNANCY_CASES = [
+    {"drugs": ["이소트레티노인"], "expected": ["이소트레티노인"]},
+    {"drugs": ["피나스테리드"], "expected": ["피나스테리드"]},
+    {"drugs": ["Dutasteride"], "expected": ["두타스테리드"]},
+    {"drugs": ["와파린나트륨"], "expected": ["와파린"]},
+]
+
+ELDERLY_CASES = [
+    {"drugs": ["디아제팜"], "expected": ["디아제팜"]},
+    {"drugs": ["아미트리프틸린염산염"], "expected": ["아미트리프틸린"]},
+    {"drugs": ["디클로페낙나트륨"], "expected": ["디클로페낙"]},
+    {"drugs": ["이부프로펜", "디아제팜"], "expected": ["이부프로펜", "디아제팜"]},
+]
+
+# 챗봇 질문: 상위 k개 안에 (type, 성분)이 모두 일치하는 문서가 있어야 함
+QUESTION_CASES = [
+    {"question": "이트라코나졸이랑 심바스타틴 같이 먹어도 돼?", "type": "contraindication", "ingredients": ["이트라코나졸", "심바스타틴"]},
+    {"question": "케토롤락 먹는 중인데 아스피린 먹어도 되나요?", "type": "contraindication", "ingredients": ["케토롤락", "아스피린"]},
+    {"question": "임신 중에 이소트레티노인 먹으면 안 되나요?", "type": "pregnancy_contraindication", "ingredients": ["이소트레티노인"]},
+    {"question": "아이가 코데인 들어간 기침약 먹어도 되나요?", "type": "age_contraindication", "ingredients": ["코데인"]},
+    {"question": "할머니가 디아제팜 드셔도 괜찮을까요?", "type": "elderly_caution", "ingredients": ["디아제팜"]},
+]
+
+CATEGORY_FUNCTIONS = {
+    "search_contraindications": (rag_service.search_contraindications, CONTRAINDICATION_CASES, "contraindication"),
+    "search_age_restrictions": (rag_service.search_age_restrictions, AGE_CASES, "age_contraindication"),
+    "search_pregnancy_restrictions": (rag_service.search_pregnancy_restrictions, PREGNANCY_CASES, "pregnancy_contraindication"),
+    "search_elderly_cautions": (rag_service.search_elderly_cautions, ELDERLY_CASES, "elderly_caution"),
+}
+
+# 회귀 판정 기준 (--compare)
+RECALL_DROP_TOLERANCE = 0.05  # recall@k 절대값 5%p 이상 하락
+P95_GROWTH_TOLERANCE = 0.25  # p95 25% 이상 증가
+
+
+# ============================================================
+# 정답 판정
+# ============================================================
+
+def result_ingredients(item: dict) -> set:
+    """검색 결과 1건의 정규화된 성분 집합 (병용금기는 A/B 두 성분)"""
+    metadata = item.get("metadata", item)
+    names = [metadata.get("drug_a"), metadata.get("drug_b"), metadata.get("drug")]
+    return {normalize_ingredient(name) for name in names if name}
+
+
+def pair_key(a: str, b: str) -> frozenset:
+    return frozenset({normalize_ingredient(a), normalize_ingredient(b)})
+
+
+def indexed_ingredients() -> dict:
+    """type별 인덱스에 존재하는 성분(조합) 집합 - BM25 인덱스 메타데이터 기준 (없으면 None)"""
+    bm25_index = rag_service.get_bm25_index()
+    if bm25_index is None:
+        return None
+
+    indexed = {}
+    for metadata in bm25_index.metadatas:
+        doc_type = metadata.get("type")
+        if doc_type == "contraindication":
+            indexed.setdefault(doc_type, set()).add(pair_key(metadata.get("drug_a", ""), metadata.get("drug_b", "")))
+        else:
+            indexed.setdefault(doc_type, set()).add(normalize_ingredient(metadata.get("drug", "")))
+    return indexed
+
+
+def expected_labels(case: dict, doc_type: str, indexed) -> tuple:
+    """(인덱스에 있는 라벨 목록, 인덱스에 없어 제외된 라벨 목록)"""
+    if doc_type == "contraindication":
+        labels = [pair_key(a, b) for a, b in case["pairs"]]
+    else:
+        labels = [normalize_ingredient(name) for name in case["expected"]]
+
+    if indexed is None:
+        return labels, []
+    present = indexed.get(doc_type, set())
+    return [label for label in labels if label in present], [label for label in labels if label not in present]
+
+
+def recall_of(results: list, labels: list, doc_type: str) -> float:
+    if doc_type == "contraindication":
+        found = {frozenset(result_ingredients(item)) for item in results}
+    else:
+        found = set().union(*(result_ingredients(item) for item in results)) if results else set()
+    return sum(1 for label in labels if label in found) / len(labels)
+
+
+def question_indexed(case: dict, indexed) -> bool:
+    """질문 라벨의 (type, 성분) 조합이 인덱스에 있는지"""
+    if indexed is None:
+        return True
+    present = indexed.get(case["type"], set())
+    if case["type"] == "contraindication":
+        return pair_key(*case["ingredients"]) in present
+    return all(normalize_ingredient(name) in present for name in case["ingredients"])
+
+
+def question_hit(results: list, case: dict) -> float:
+    expected = {normalize_ingredient(name) for name in case["ingredients"]}
+    return float(any(
+        item.get("type") == case["type"] and expected <= result_ingredients(item)
+        for item in results
+    ))
+
+
+# ============================================================
+# 측정
+# ============================================================
+
+def percentile(values: list, p: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure(calls: list, repeat: int, concurrency: int) -> dict:
+    """calls(인자 없는 함수 목록)를 repeat번 실행하여 지연 시간/처리량 측정, 마지막 결과 반환"""
+    for call in calls:  # 워밍업 (모델/인덱스 로드, 페이지 캐시)
+        call()
+
+    def timed(call):
+        started = time.perf_counter()
+        result = call()
+        return (time.perf_counter() - started) * 1000, result
+
+    jobs = [call for _ in range(repeat) for call in calls]
+    started = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            timings = list(pool.map(timed, jobs))
+    else:
+        timings = [timed(call) for call in jobs]
+    wall_s = time.perf_counter() - started
+
+    latencies_ms = [latency for latency, _ in timings]
+    return {
+        "calls": len(jobs),
+        "p50_ms": round(percentile(latencies_ms, 50), 3),
+        "p95_ms": round(percentile(latencies_ms, 95), 3),
+        "mean_ms": round(statistics.mean(latencies_ms), 3),
+        "throughput_qps": round(len(jobs) / wall_s, 2),
+        "last_results": [result for _, result in timings[-len(calls):]],
+    }
+
+
+def bench_mode(mode: str, k: int, repeat: int, concurrency: int, indexed) -> dict:
+    functions = {}
+
+    for name, (search, cases, doc_type) in CATEGORY_FUNCTIONS.items():
+        calls = [lambda case=case: search(case["drugs"], k=k, mode=mode) for case in cases]
+        stats = measure(calls, repeat, concurrency)
+
+        recalls, skipped = [], 0
+        for case, results in zip(cases, stats.pop("last_results")):
+            labels, missing = expected_labels(case, doc_type, indexed)
+            skipped += len(missing)
+            if labels:
+                recalls.append(recall_of(results, labels, doc_type))
+
+        stats["recall_at_k"] = round(statistics.mean(recalls), 4) if recalls else None
+        stats["labels_skipped"] = skipped
+        functions[name] = stats
+
+    # 통합 검색: 카테고리별 k는 SAFETY_INFO_K 고정 → 지연 시간만 측정
+    calls = [lambda case=case: rag_service.search_all_safety_info(case["drugs"], mode=mode) for case in CONTRAINDICATION_CASES]
+    stats = measure(calls, repeat, concurrency)
+    stats.pop("last_results")
+    functions["search_all_safety_info"] = stats
+
+    calls = [lambda case=case: rag_service.search_by_question(case["question"], k=k, mode=mode) for case in QUESTION_CASES]
+    stats = measure(calls, repeat, concurrency)
+    hits, skipped = [], 0
+    for case, results in zip(QUESTION_CASES, stats.pop("last_results")):
+        if question_indexed(case, indexed):
+            hits.append(question_hit(results, case))
+        else:
+            skipped += 1
+    stats["recall_at_k"] = round(statistics.mean(hits), 4) if hits else None
+    stats["labels_skipped"] = skipped
+    functions["search_by_question"] = stats
+
+    return functions
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=project_root, text=True, stderr=subprocess.DEVNULL,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+# ============================================================
+# 결과 출력 / 비교
+# ============================================================
+
+def print_report(report: dict) -> None:
+    print(f"\n백엔드={report['backend']}, 인덱스={report['index']['collection']}, k={report['k']}, "
+          f"repeat={report['repeat']}, concurrency={report['concurrency']}")
+    for mode, functions in report["modes"].items():
+        print(f"\n[{mode}]")
+        print(f"  {'함수':<32}{'p50(ms)':>10}{'p95(ms)':>10}{'QPS':>10}{'recall@k':>10}")
+        for name, stats in functions.items():
+            recall = stats.get("recall_at_k")
+            recall_text = f"{recall:.1%}" if recall is not None else "-"
+            print(f"  {name:<32}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}"
+                  f"{stats['throughput_qps']:>10.1f}{recall_text:>10}")
+
+
+def compare(report: dict, baseline: dict) -> list:
+    """기준 결과 대비 회귀 목록"""
+    regressions = []
+    for mode, functions in report["modes"].items():
+        for name, stats in functions.items():
+            base = baseline.get("modes", {}).get(mode, {}).get(name)
+            if not base:
+                continue
+
+            if stats.get("recall_at_k") is not None and base.get("recall_at_k") is not None:
+                drop = base["recall_at_k"] - stats["recall_at_k"]
+                if drop > RECALL_DROP_TOLERANCE:
+                    regressions.append(f"{mode}/{name}: recall@k {base['recall_at_k']:.1%} → {stats['recall_at_k']:.1%}")
+
+            if base["p95_ms"] > 0 and stats["p95_ms"] > base["p95_ms"] * (1 + P95_GROWTH_TOLERANCE):
+                regressions.append(f"{mode}/{name}: p95 {base['p95_ms']:.2f}ms → {stats['p95_ms']:.2f}ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RAG 검색 지연 시간 / recall@k 벤치마크")
+    parser.add_argument("--modes", nargs="+", default=list(rag_service.SEARCH_MODES), choices=rag_service.SEARCH_MODES)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=1, help="동시 호출 스레드 수 (1: 순차)")
+    parser.add_argument("--output", type=Path,
+                        default=project_root / "data" / "bench" / f"rag_bench_{datetime.now():%Y%m%d_%H%M%S}.json")
+    parser.add_argument("--compare", type=Path, help="비교할 이전 결과 JSON (회귀 시 종료 코드 1)")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("RAG 검색 벤치마크")
+    print("=" * 70)
+
+    indexed = indexed_ingredients()
+    if indexed is None:
+        print("⚠️  BM25 인덱스가 없어 라벨 존재 여부를 확인하지 않습니다 (모든 라벨을 recall에 포함).")
+
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "backend": rag_service.settings.rag_backend,
+        "index": rag_service.get_index_version(),
+        "k": args.k,
+        "repeat": args.repeat,
+        "concurrency": args.concurrency,
+        "modes": {
+            mode: bench_mode(mode, args.k, args.repeat, args.concurrency, indexed)
+            for mode in args.modes
+        },
+    }
+
+    print_report(report)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"\n💾 결과 저장: {args.output}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressions = compare(report, baseline)
+        print(f"\n[비교] 기준: {args.compare} ({baseline.get('git_commit') or '커밋 정보 없음'})")
+        if regressions:
+            for regression in regressions:
+                print(f"  ❌ {regression}")
+            sys.exit(1)
+        print("  ✅ 회귀 없음")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+벡터 백엔드 벤치마크: ChromaDB vs NumPy 브루트포스
+
+같은 쿼리 임베딩으로 두 백엔드의 검색 지연 시간과 top-k 일치율을 비교합니다.
+(임베딩 계산 시간은 제외하고 순수 검색 시간만 측정)
+
+사전 준비:
+    python scripts/load_dur_data.py --export-numpy
+
+사용법:
+    python tests/bench_vector_backend.py
+    python tests/bench_vector_backend.py --k 5 --repeat 20
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# 프로젝트 루트를 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from langchain_community.vectorstores import Chroma
+from app.services.rag_service import get_embeddings, CHROMA_DB_PATH
+from app.services.dur_versions import read_active_version
+from app.services.numpy_index import NumpyVectorIndex
+
+
+QUERIES = [
+    ("병용금기 아세트아미노펜 이부프로펜", {"type": "contraindication"}),
+    ("병용금기 acetaminophen aspirin", {"type": "contraindication"}),
+    ("임부금기 이소트레티노인", {"type": "pregnancy_contraindication"}),
+    ("연령금기 코데인", {"type": "age_contraindication"}),
+    ("노인주의 디클로페낙", {"type": "elderly_caution"}),
+    ("타이레놀이랑 게보린 같이 먹어도 돼?", None),
+    ("임산부가 먹으면 안 되는 약은 뭐야?", None),
+    ("노인이 주의해야 할 해열제는?", None),
+]
+
+
+def percentile(values: list[float], p: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def bench(name: str, search, query_vectors, k: int, repeat: int) -> list[list[str]]:
+    """각 쿼리를 repeat번 검색하여 지연 시간 출력, 마지막 결과(문서 본문 목록) 반환"""
+    latencies_ms = []
+    last_results = []
+
+    for vector, filter in query_vectors:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            docs = search(vector, k=k, filter=filter)
+            latencies_ms.append((time.perf_counter() - started) * 1000)
+        last_results.append([doc.page_content for doc in docs])
+
+    total_s = sum(latencies_ms) / 1000
+    print(f"\n[{name}]")
+    print(f"  p50: {percentile(latencies_ms, 50):.2f} ms")
+    print(f"  p95: {percentile(latencies_ms, 95):.2f} ms")
+    print(f"  평균: {statistics.mean(latencies_ms):.2f} ms")
+    print(f"  처리량: {len(latencies_ms) / total_s:.1f} 쿼리/초")
+    return last_results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ChromaDB vs NumPy 벡터 검색 벤치마크")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("벡터 백엔드 벤치마크")
+    print("=" * 70)
+
+    active = read_active_version()
+    print(f"활성 버전: {active.collection_name}")
+
+    embeddings = get_embeddings()
+    query_vectors = [(embeddings.embed_query(query), filter) for query, filter in QUERIES]
+
+    # 백엔드 로드 시간
+    started = time.perf_counter()
+    chroma = Chroma(
+        persist_directory=str(CHROMA_DB_PATH),
+        embedding_function=embeddings,
+        collection_name=active.collection_name
+    )
+    print(f"ChromaDB 로드: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    started = time.perf_counter()
+    numpy_index = NumpyVectorIndex(active.numpy_index_path, embeddings)
+    print(f"NumPy 인덱스 로드: {(time.perf_counter() - started) * 1000:.1f} ms "
+          f"({len(numpy_index)}건, dtype={numpy_index.vectors.dtype})")
+
+    # 워밍업 (페이지 캐시, HNSW 로드)
+    for vector, filter in query_vectors:
+        chroma.similarity_search_by_vector(vector, k=args.k, filter=filter)
+        numpy_index.similarity_search_by_vector(vector, k=args.k, filter=filter)
+
+    chroma_results = bench("ChromaDB (HNSW)", chroma.similarity_search_by_vector, query_vectors, args.k, args.repeat)
+    numpy_results = bench("NumPy (brute-force)", numpy_index.similarity_search_by_vector, query_vectors, args.k, args.repeat)
+
+    # top-k 일치율 (브루트포스 = 정확한 결과 기준으로 HNSW 근사 정확도 확인)
+    overlaps = [
+        len(set(c) & set(n)) / max(1, len(n))
+        for c, n in zip(chroma_results, numpy_results)
+    ]
+    print(f"\n[top-{args.k} 일치율] 평균 {statistics.mean(overlaps):.1%}")
+    for (query, _), overlap in zip(QUERIES, overlaps):
+        print(f"  {overlap:.0%}  {query}")
+
+
+if __name__ == "__main__":
+    main()
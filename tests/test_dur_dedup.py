@@ -0,0 +1,86 @@
+"""
+DUR 문서 중복 제거(그룹핑) 테스트
+
+병용금기 CSV에 같은 성분 쌍이 A/B, B/A 방향으로 섞여 있어도 한 문서로 묶이고,
+각 제품명이 자기 성분 쪽(product_a/product_b)에 집계되는지 확인합니다.
+CSV/벡터 DB 없이 행 목록으로 실행됩니다.
+
+사용법:
+    python tests/test_dur_dedup.py
+    pytest tests/test_dur_dedup.py
+"""
+import sys
+from pathlib import Path
+
+# 프로젝트 루트/스크립트 폴더를 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "scripts"))
+
+from load_dur_data import DUR_SOURCES, _group_rows
+
+CONTRAINDICATION = next(source for source in DUR_SOURCES if source.key == "contraindication")
+
+
+def contraindication_row(drug_a: str, product_a: str, drug_b: str, product_b: str, date: str = "20250601") -> dict:
+    return {
+        "성분명A": drug_a, "성분코드A": "", "제품명A": product_a,
+        "성분명B": drug_b, "성분코드B": "", "제품명B": product_b,
+        "상세정보": "병용 시 출혈 위험 증가", "고시일자": date,
+    }
+
+
+def test_reversed_rows_keep_products_with_their_ingredient():
+    """A/B 행과 B/A 행을 묶어도 제품명이 같은 성분 쪽에 남음"""
+    rows = [
+        contraindication_row("와파린나트륨", "쿠마딘정", "아스피린", "아스피린정"),
+        contraindication_row("아스피린", "아스피린프로텍트정", "와파린나트륨", "와파린정"),
+    ]
+    stats = {"rows": 0}
+    docs = list(_group_rows(CONTRAINDICATION, rows, stats))
+
+    assert len(docs) == 1, docs
+    metadata = docs[0].metadata
+    assert (metadata["drug_a"], metadata["drug_b"]) == ("와파린나트륨", "아스피린")
+    assert metadata["product_a"] == "쿠마딘정|와파린정", metadata
+    assert metadata["product_b"] == "아스피린정|아스피린프로텍트정", metadata
+    assert metadata["row_count"] == 2
+    assert "약물 A: 와파린나트륨 (쿠마딘정, 와파린정)" in docs[0].page_content, docs[0].page_content
+    print(f"  product_a={metadata['product_a']}, product_b={metadata['product_b']}")
+
+
+def test_same_orientation_rows_merged():
+    """같은 방향의 중복 행은 제품명만 집계, 고시일자는 최신 값"""
+    rows = [
+        contraindication_row("와파린나트륨", "쿠마딘정", "아스피린", "아스피린정", "20240101"),
+        contraindication_row("와파린나트륨", "와파린정", "아스피린", "아스피린정", "20250601"),
+    ]
+    docs = list(_group_rows(CONTRAINDICATION, rows, {"rows": 0}))
+
+    assert len(docs) == 1, docs
+    assert docs[0].metadata["product_a"] == "쿠마딘정|와파린정"
+    assert docs[0].metadata["product_b"] == "아스피린정"
+    assert docs[0].metadata["date"] == "20250601"
+    print(f"  문서 {len(docs)}건, 고시일자 {docs[0].metadata['date']}")
+
+
+def main():
+    print("=" * 70)
+    print("DUR 문서 중복 제거 테스트")
+    print("=" * 70)
+
+    try:
+        print("\n1. A/B, B/A 방향이 섞인 행")
+        test_reversed_rows_keep_products_with_their_ingredient()
+
+        print("\n2. 같은 방향의 중복 행")
+        test_same_orientation_rows_merged()
+
+        print("\n✅ 모든 테스트 통과")
+    except AssertionError as e:
+        print(f"\n❌ 테스트 실패: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+성분명 정규화 테스트
+
+염/수화물 표기는 같은 성분으로 묶고, 염 자체가 성분인 경우(염화칼륨, 탄산칼슘, Magnesium Oxide)는
+음이온(염화, 탄산, chloride, oxide)만 남지 않아 서로 다른 성분으로 유지되는지 확인합니다.
+"졸"/"롤"로 끝나지만 활성 성분이 아닌 표기(글리세롤, 이미다졸)는 염 표기를 떼지 않습니다.
+DB/벡터 인덱스 없이 실행됩니다.
+
+사용법:
+    python tests/test_ingredient_normalizer.py
+    pytest tests/test_ingredient_normalizer.py
+"""
+import sys
+from pathlib import Path
+
+# 프로젝트 루트를 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.services.ingredient_normalizer import IngredientTableBuilder, clean_ingredient
+
+# 염 자체가 성분인 표기 (한글, 영문)
+MINERAL_SALTS = [
+    ("염화칼륨", "Potassium Chloride"),
+    ("염화나트륨", "Sodium Chloride"),
+    ("염화칼슘", "Calcium Chloride"),
+    ("탄산칼슘", "Calcium Carbonate"),
+    ("탄산마그네슘", "Magnesium Carbonate"),
+    ("산화마그네슘", "Magnesium Oxide"),
+]
+
+BARE_ANIONS = {"염화", "탄산", "산화", "chloride", "carbonate", "oxide"}
+
+
+def test_salt_forms_of_active_moiety_merged():
+    """활성 성분의 염/수화물 표기는 같은 키"""
+    cases = [
+        ["Loxoprofen Sodium Hydrate", "loxoprofen"],
+        ["록소프로펜나트륨수화물", "록소프로펜"],
+        ["Amlodipine Besylate", "amlodipine"],
+        ["암로디핀베실산염", "암로디핀"],
+        ["Losartan Potassium", "losartan"],
+        ["메트포르민염산염", "메트포르민"],
+        ["카페인무수물", "카페인"],
+        ["오메프라졸마그네슘", "오메프라졸"],
+        ["프로프라놀롤염산염", "프로프라놀롤"],
+        ["메토프롤롤타르타르산염", "메토프롤롤"],
+        ["라베탈롤염산염", "라베탈롤"],
+    ]
+    for names in cases:
+        keys = {clean_ingredient(name) for name in names}
+        assert len(keys) == 1, (names, keys)
+        print(f"  {' / '.join(names)} → {keys.pop()}")
+
+
+def test_salt_not_stripped_from_non_drug_ending():
+    """"졸"/"롤"로 끝나지만 활성 성분 어간이 아닌 표기는 염 표기를 떼지 않음"""
+    cases = [
+        ("글리세롤인산염", "글리세롤"),
+        ("콜레스테롤황산염", "콜레스테롤"),
+        ("이미다졸염산염", "이미다졸"),
+        ("벤졸나트륨", "벤졸"),
+    ]
+    for salt, base in cases:
+        assert clean_ingredient(salt) != clean_ingredient(base), (salt, base)
+        print(f"  {salt} → {clean_ingredient(salt)}")
+
+
+def test_mineral_salts_not_reduced_to_anion():
+    """염 자체가 성분이면 양이온을 떼지 않음"""
+    for names in MINERAL_SALTS:
+        for name in names:
+            key = clean_ingredient(name)
+            assert key not in BARE_ANIONS, (name, key)
+    keys_ko = [clean_ingredient(ko) for ko, _ in MINERAL_SALTS]
+    keys_en = [clean_ingredient(en) for _, en in MINERAL_SALTS]
+    assert len(set(keys_ko)) == len(MINERAL_SALTS), keys_ko
+    assert len(set(keys_en)) == len(MINERAL_SALTS), keys_en
+    print(f"  {keys_ko}")
+    print(f"  {keys_en}")
+
+
+def test_mineral_salts_stay_distinct_in_table():
+    """한글↔영문을 연결해도 염화칼륨/염화나트륨/염화칼슘 등이 한 성분으로 합쳐지지 않음"""
+    builder = IngredientTableBuilder()
+    for ko, en in MINERAL_SALTS:
+        builder.link(builder.add(ko, preferred=True), builder.add(en))
+    table = builder.build()
+
+    ids = [table.normalize(ko) for ko, _ in MINERAL_SALTS]
+    assert len(set(ids)) == len(MINERAL_SALTS), ids
+    for ko, en in MINERAL_SALTS:
+        assert table.normalize(ko) == table.normalize(en), (ko, en)
+    assert table.normalize("염화칼륨") != table.normalize("Sodium Chloride")
+    assert table.normalize("탄산칼슘") != table.normalize("탄산마그네슘")
+    print(f"  성분 {len(table)}개: {ids}")
+
+
+def main():
+    print("=" * 70)
+    print("성분명 정규화 테스트")
+    print("=" * 70)
+
+    try:
+        print("\n1. 활성 성분의 염/수화물 표기 통합")
+        test_salt_forms_of_active_moiety_merged()
+
+        print("\n2. 활성 성분 어간이 아닌 표기는 염 표기 유지")
+        test_salt_not_stripped_from_non_drug_ending()
+
+        print("\n3. 염 자체가 성분인 표기 유지")
+        test_mineral_salts_not_reduced_to_anion()
+
+        print("\n4. 성분 사전에서 서로 다른 성분으로 유지")
+        test_mineral_salts_stay_distinct_in_table()
+
+        print("\n✅ 모든 테스트 통과")
+    except AssertionError as e:
+        print(f"\n❌ 테스트 실패: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
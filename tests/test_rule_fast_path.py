@@ -0,0 +1,108 @@
+"""
+규칙 기반 분석 빠른 경로(LLM 생략) 테스트
+
+DUR 병용금기 두 성분이 정규화로 같은 성분 ID로 합쳐지면 규칙 테이블이 그 쌍을 버리지 않고,
+해당 성분이 들어간 약은 판정 불가로 처리되어 LLM 분석으로 넘어가는지 확인합니다.
+활성 DUR 버전 대신 테스트용 성분 사전/규칙 테이블을 사용하며 DB/벡터 인덱스 없이 실행됩니다.
+
+사용법:
+    python tests/test_rule_fast_path.py
+    pytest tests/test_rule_fast_path.py
+"""
+import sys
+from pathlib import Path
+
+# 프로젝트 루트를 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.services import ingredient_normalizer, rule_analysis
+from app.services.dur_rules import DurRuleTable
+from app.services.ingredient_normalizer import IngredientTable
+
+# "성분가"와 "성분나"는 DUR에서 병용금기이지만 사전에서 같은 성분 ID("x")로 합쳐짐
+TABLE = IngredientTable(
+    aliases={"성분가": "x", "성분나": "x", "성분다": "y", "성분라": "z"},
+    names={"x": "성분가", "y": "성분다", "z": "성분라"},
+)
+DUR_METADATAS = [
+    {"type": "contraindication", "drug_a": "성분가", "drug_b": "성분나", "detail": "병용 시 위험"},
+    {"type": "contraindication", "drug_a": "성분다", "drug_b": "성분라", "detail": "병용 시 위험"},
+]
+
+
+def analyze(scanned_med: dict, user_medicines: list) -> rule_analysis.RuleFindings:
+    """테스트용 사전/규칙 테이블로 pre_analyze 실행"""
+    rules = DurRuleTable.build(DUR_METADATAS, TABLE)
+    original = ingredient_normalizer.get_ingredient_table, rule_analysis.get_ingredient_table, rule_analysis.get_dur_rules
+    ingredient_normalizer.get_ingredient_table = rule_analysis.get_ingredient_table = lambda: TABLE
+    rule_analysis.get_dur_rules = lambda: rules
+    try:
+        return rule_analysis.pre_analyze(scanned_med, user_medicines)
+    finally:
+        ingredient_normalizer.get_ingredient_table, rule_analysis.get_ingredient_table, rule_analysis.get_dur_rules = original
+
+
+def test_collapsed_pair_recorded():
+    """같은 ID로 합쳐진 병용금기 쌍도 규칙 테이블에 남음"""
+    rules = DurRuleTable.build(DUR_METADATAS, TABLE)
+    assert rules.is_ambiguous("x")
+    assert not rules.is_ambiguous("y")
+    assert rules.contraindication("y", "z") == ["병용 시 위험"]
+    print(f"  병용금기 {len(rules.contraindications)}쌍, 합쳐진 성분: x")
+
+
+def test_collapsed_pair_skips_fast_path():
+    """합쳐진 성분이 들어간 약은 판정 불가 → LLM 사용"""
+    findings = analyze({"name": "테스트약A", "ingredient": "성분가"}, [])
+    assert findings.unknown_medicines == ["테스트약A"], findings
+    assert not findings.contraindications
+    assert not rule_analysis.can_skip_llm(findings)
+
+    findings = analyze(
+        {"name": "테스트약C", "ingredient": "성분라"},
+        [{"name": "복용약B", "ingredient": "성분나", "schedules": []}],
+    )
+    assert findings.unknown_medicines == ["복용약B"], findings
+    assert not rule_analysis.can_skip_llm(findings)
+    print(f"  판정 불가: {findings.unknown_medicines} → LLM 분석")
+
+
+def test_distinct_pair_still_fast():
+    """합쳐지지 않은 성분은 기존대로 규칙 기반 판정"""
+    findings = analyze(
+        {"name": "테스트약C", "ingredient": "성분다"},
+        [{"name": "복용약D", "ingredient": "성분라", "schedules": []}],
+    )
+    assert [(item["drug_a"], item["drug_b"]) for item in findings.contraindications] == [("성분다", "성분라")]
+    assert not rule_analysis.can_skip_llm(findings)
+
+    findings = analyze({"name": "테스트약C", "ingredient": "성분다"}, [])
+    assert not findings.unknown_medicines and not findings.has_risks
+    assert rule_analysis.can_skip_llm(findings)
+    print("  병용금기 발견 → LLM, 위험 없음 → 규칙 기반 결과")
+
+
+def main():
+    print("=" * 70)
+    print("규칙 기반 분석 빠른 경로 테스트")
+    print("=" * 70)
+
+    try:
+        print("\n1. 합쳐진 병용금기 쌍 기록")
+        test_collapsed_pair_recorded()
+
+        print("\n2. 합쳐진 성분이 있으면 빠른 경로 사용 안 함")
+        test_collapsed_pair_skips_fast_path()
+
+        print("\n3. 합쳐지지 않은 성분은 규칙 기반 판정")
+        test_distinct_pair_still_fast()
+
+        print("\n✅ 모든 테스트 통과")
+    except AssertionError as e:
+        print(f"\n❌ 테스트 실패: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+스캔 분석 사용자 컨텍스트 조회 쿼리 수 테스트
+
+load_user_context가 약마다 스케줄을 따로 조회(N+1)하지 않는지, 삭제된 약/스케줄을 제외하는지 확인합니다.
+설정된 DB에 임시 사용자와 약/스케줄을 만들어 확인한 뒤 삭제합니다.
+
+사용법:
+    python tests/test_scan_query_count.py
+    pytest tests/test_scan_query_count.py
+"""
+import asyncio
+import sys
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from pathlib import Path
+
+# 프로젝트 루트를 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import event
+
+from app.database import AsyncSessionLocal, SessionLocal, async_engine
+from app.models.medicine import Medicine
+from app.models.schedule import Schedule
+from app.models.user import User
+from app.routes.analysis import load_user_context
+
+# 사용자 1 + 약 1 + 스케줄 1 (selectinload)
+EXPECTED_QUERIES = 3
+
+
+@contextmanager
+def count_queries():
+    """블록 안에서 비동기 엔진이 실행한 SQL 문 목록"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+def create_test_user(active_medicines: int, inactive_medicines: int = 0) -> int:
+    """임시 사용자 생성: 활성 약마다 활성 스케줄 2개 + 삭제된 스케줄 1개, 삭제된 약마다 스케줄 1개"""
+    suffix = uuid.uuid4().hex[:8]
+    today = datetime.now()
+    db = SessionLocal()
+    try:
+        user = User(
+            email=f"query-count-{suffix}@test.local",
+            username=f"query-count-{suffix}",
+            hashed_password="-",
+            medical_conditions=["고혈압"],
+        )
+        db.add(user)
+        db.flush()
+
+        for index in range(active_medicines + inactive_medicines):
+            active = index < active_medicines
+            medicine = Medicine(
+                user_id=user.id,
+                name=f"{'테스트약' if active else '삭제된약'} {index}",
+                ingredient="아세트아미노펜",
+                amount="500mg",
+                is_active=active,
+            )
+            db.add(medicine)
+            db.flush()
+
+            dose_times = [(time(8, 0), True), (time(20, 0), True), (time(13, 0), False)] if active else [(time(8, 0), True)]
+            for dose_time, schedule_active in dose_times:
+                db.add(Schedule(
+                    user_id=user.id,
+                    medicine_id=medicine.id,
+                    medicine_name=medicine.name,
+                    dose_count=1,
+                    dose_time=dose_time,
+                    start_date=today,
+                    end_date=today + timedelta(days=7),
+                    is_active=schedule_active,
+                ))
+
+        db.commit()
+        return user.id
+    finally:
+        db.close()
+
+
+def delete_test_user(user_id: int) -> None:
+    db = SessionLocal()
+    try:
+        db.query(Schedule).filter(Schedule.user_id == user_id).delete(synchronize_session=False)
+        db.query(Medicine).filter(Medicine.user_id == user_id).delete(synchronize_session=False)
+        db.query(User).filter(User.id == user_id).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+async def load_with_query_count(user_id: int):
+    try:
+        async with AsyncSessionLocal() as db:
+            with count_queries() as statements:
+                result = await load_user_context(db, user_id)
+    finally:
+        # asyncio.run마다 이벤트 루프가 달라지므로 풀의 연결을 닫음
+        await async_engine.dispose()
+    return result, statements
+
+
+def test_query_count_does_not_grow_with_medicines():
+    """약 개수와 관계없이 쿼리 수 고정"""
+    counts = {}
+    for medicines in (1, 10):
+        user_id = create_test_user(active_medicines=medicines)
+        try:
+            (_, user_medicines), statements = asyncio.run(load_with_query_count(user_id))
+        finally:
+            delete_test_user(user_id)
+
+        assert len(user_medicines) == medicines
+        counts[medicines] = len(statements)
+        print(f"  약 {medicines}개: 쿼리 {len(statements)}회")
+
+    assert counts[1] == counts[10] == EXPECTED_QUERIES, counts
+
+
+def test_inactive_medicines_and_schedules_excluded():
+    """삭제된 약/스케줄은 결과(LLM 프롬프트)에서 제외"""
+    user_id = create_test_user(active_medicines=2, inactive_medicines=3)
+    try:
+        (conditions, user_medicines), statements = asyncio.run(load_with_query_count(user_id))
+    finally:
+        delete_test_user(user_id)
+
+    assert conditions == ["고혈압"]
+    assert [med["name"] for med in user_medicines] == ["테스트약 0", "테스트약 1"]
+    for med in user_medicines:
+        assert [s["time"] for s in med["schedules"]] == ["08:00", "20:00"], med["schedules"]
+    assert len(statements) == EXPECTED_QUERIES
+    print(f"  활성 약 {len(user_medicines)}개, 스케줄 {[len(med['schedules']) for med in user_medicines]}")
+
+
+def main():
+    print("=" * 70)
+    print("스캔 분석 사용자 컨텍스트 쿼리 수 테스트")
+    print("=" * 70)
+
+    try:
+        print("\n1. 약 개수별 쿼리 수")
+        test_query_count_does_not_grow_with_medicines()
+
+        print("\n2. 삭제된 약/스케줄 제외")
+        test_inactive_medicines_and_schedules_excluded()
+
+        print("\n✅ 모든 테스트 통과")
+    except AssertionError as e:
+        print(f"\n❌ 테스트 실패: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()